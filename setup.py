@@ -6,10 +6,13 @@ setup(
     packages=find_packages(where="src"),
     install_requires=[
         "pandas",
+        "ijson",
         "python-dotenv",
         "psycopg[binary]",
+        "psycopg-pool",
     ],
     extras_require={
-        "dev": ["pytest"],
+        "dev": ["pytest", "pytest-benchmark"],
+        "arrow": ["pyarrow"],
     },
 ) 
\ No newline at end of file
@@ -1,45 +1,114 @@
 """
 Main entry point for the toast-exports-etl package.
 Can be run with: python -m toast_exports
+Backfill a date range with: python -m toast_exports backfill --from 2024-01-01 --to 2024-12-31 --workers 4
 """
+import argparse
+import asyncio
 import logging
-import psycopg
-from toast_exports.config import DB_URL
-from toast_exports.db.create_tables import create_tables
-from toast_exports.file_processors.menu_processor import insert_menus_into_db
-from toast_exports.file_processors.orders_processor import process_orders
-from toast_exports.file_processors.time_entries_processor import process_time_entries
-
-def main():
+from datetime import date
+from pathlib import Path
+from toast_exports.config import (
+    CURRENT_DATA_DIR, SAMPLE_DATA_DIR, BACKFILL_WORKERS, PIPELINE_CONCURRENCY, RUN_REPORT_PATH,
+    PROMETHEUS_TEXTFILE_PATH, LOG_FORMAT, make_pool,
+)
+from toast_exports.backfill import run_backfill, write_backfill_report
+from toast_exports.db.dimension_cache import DimensionCache
+from toast_exports.db.migrations import ensure_schema
+from toast_exports.logs import configure_logging
+from toast_exports.metrics import RunMetrics
+from toast_exports.orchestrator import run_export_concurrent
+
+def run_options(with_defaults=True):
+    """
+    Return a parent parser with the options shared by the default command and backfill.
+
+    The backfill copy is built without defaults, so an option given before
+    the subcommand is not reset by the subcommand's own default.
+    """
+    def default(value):
+        return value if with_defaults else argparse.SUPPRESS
+
+    options = argparse.ArgumentParser(add_help=False)
+    options.add_argument('--force', action='store_true', default=default(False),
+                         help="reload files even if the load manifest says they are unchanged")
+    options.add_argument('--async-commit', action='store_true', default=default(False),
+                         help="load with synchronous_commit=off: faster, but a crash can lose the last few loads")
+    options.add_argument('--report', type=Path, default=default(RUN_REPORT_PATH),
+                         help=f"JSON run report path (default {RUN_REPORT_PATH})")
+    options.add_argument('--log-format', choices=['text', 'json'], default=default(LOG_FORMAT),
+                         help=f"log output format (default {LOG_FORMAT})")
+    return options
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='toast_exports', description="Load Toast nightly exports into PostgreSQL",
+                                     parents=[run_options()])
+    parser.add_argument('--prometheus-textfile', type=Path, default=PROMETHEUS_TEXTFILE_PATH or None,
+                        help="also write the run metrics as a Prometheus textfile")
+    subparsers = parser.add_subparsers(dest='command')
+
+    backfill_parser = subparsers.add_parser('backfill', help="load every dated export directory in a date range",
+                                            parents=[run_options(with_defaults=False)])
+    backfill_parser.add_argument('--from', dest='start', type=date.fromisoformat, required=True,
+                                 help="first export date, YYYY-MM-DD")
+    backfill_parser.add_argument('--to', dest='end', type=date.fromisoformat, required=True,
+                                 help="last export date, YYYY-MM-DD")
+    backfill_parser.add_argument('--workers', type=int, default=BACKFILL_WORKERS,
+                                 help=f"worker processes (default {BACKFILL_WORKERS})")
+    backfill_parser.add_argument('--root', type=Path, default=SAMPLE_DATA_DIR,
+                                 help=f"directory containing YYYYMMDD export directories (default {SAMPLE_DATA_DIR})")
+    backfill_parser.add_argument('--defer-indexes', action='store_true',
+                                 help="drop secondary indexes during the backfill and rebuild them afterwards")
+    backfill_parser.add_argument('--concurrent-indexes', action='store_true',
+                                 help="rebuild deferred indexes with CREATE INDEX CONCURRENTLY")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
     # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    configure_logging(log_format=args.log_format)
     logger = logging.getLogger(__name__)
-    
+
+    if args.command == 'backfill':
+        synchronous_commit = 'off' if args.async_commit else None
+        results = run_backfill(args.root, args.start, args.end, args.workers, args.force,
+                               synchronous_commit=synchronous_commit, defer_indexes=args.defer_indexes,
+                               concurrent_indexes=args.concurrent_indexes)
+        write_backfill_report(results, args.report)
+        if any(result['error'] for result in results):
+            raise SystemExit(1)
+        return
+
+    metrics = RunMetrics(CURRENT_DATA_DIR)
     try:
         logger.info("Connecting to database...")
-        with psycopg.connect(DB_URL) as conn:
-            # Create tables if they don't exist
-            logger.info("Creating tables...")
-            create_tables(conn)
-            
-            # Process data
-            logger.info("Processing menu data...")
-            insert_menus_into_db(conn)
-            
-            logger.info("Processing orders data...")
-            process_orders(conn)
-            
-            logger.info("Processing time entries data...")
-            process_time_entries(conn)
-            
-            logger.info("All processing completed successfully!")
-            
+        synchronous_commit = 'off' if args.async_commit else None
+        with make_pool(bulk=True, synchronous_commit=synchronous_commit, max_size=PIPELINE_CONCURRENCY) as pool:
+            with pool.connection() as conn:
+                # Apply any pending schema migrations
+                ensure_schema(conn)
+
+                # Share dimension ids across processors
+                cache = DimensionCache()
+                cache.warm(conn)
+
+            # Process data, running independent stages on their own connections
+            asyncio.run(run_export_concurrent(pool, CURRENT_DATA_DIR, cache, args.force, metrics=metrics))
+
+        cache.log_stats()
+        logger.info("All processing completed successfully!")
+        metrics.finish('ok')
+
     except Exception as e:
-        logger.error(f"Error in main process: {str(e)}")
+        logger.error("Error in main process: %s", e)
+        metrics.finish('failed')
         raise
 
+    finally:
+        metrics.write_report(args.report)
+        if args.prometheus_textfile:
+            metrics.write_prometheus(args.prometheus_textfile)
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,195 @@
+"""
+Parallel backfill of dated Toast export directories.
+
+Toast writes each nightly export to a directory named for the business date
+(YYYYMMDD). The backfill finds every such directory in a date range and
+loads them in a process pool. Each worker keeps a one-connection pool, so
+its connection stays warm between days and is replaced if it breaks.
+
+With defer_indexes, secondary indexes are dropped before the first day is
+loaded and rebuilt once after the last (see db.indexes).
+"""
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from multiprocessing.util import Finalize
+from pathlib import Path
+from toast_exports.config import DB_URL, make_pool
+from toast_exports.db.dimension_cache import DimensionCache
+from toast_exports.db.indexes import deferred_indexes
+from toast_exports.db.migrations import ensure_schema
+from toast_exports.metrics import write_atomically
+from toast_exports.pipeline import run_export, parse_export_date
+
+logger = logging.getLogger(__name__)
+
+# Per-worker state, set up once by _init_worker in each pool process
+_worker_pool = None
+_worker_cache = None
+
+def find_export_dirs(root, start=None, end=None):
+    """
+    Find export directories named YYYYMMDD under root, within an inclusive date range.
+
+    Parameters:
+    - root: directory containing the dated export directories
+    - start: first export date to include, or None for no lower bound
+    - end: last export date to include, or None for no upper bound
+
+    Returns:
+    - list: (export date, directory path) tuples sorted by date
+    """
+    export_dirs = []
+    for path in Path(root).iterdir():
+        export_date = parse_export_date(path)
+        if not path.is_dir() or export_date is None:
+            continue
+        if (start is None or export_date >= start) and (end is None or export_date <= end):
+            export_dirs.append((export_date, path))
+    return sorted(export_dirs)
+
+def _init_worker(db_url, synchronous_commit=None):
+    """
+    Open the worker's connection pool and warm its dimension cache.
+    """
+    global _worker_pool, _worker_cache
+    _worker_pool = make_pool(bulk=True, synchronous_commit=synchronous_commit, min_size=1, max_size=1, db_url=db_url)
+    _worker_pool.open(wait=True)
+    Finalize(None, _worker_pool.close, exitpriority=10)
+    _worker_cache = DimensionCache()
+    with _worker_pool.connection() as conn:
+        _worker_cache.warm(conn)
+
+def _load_export(export_date, data_dir, force=False):
+    """
+    Load one export directory on the worker's connection and time it.
+
+    Files already recorded in the load manifest with the same content hash
+    are skipped unless force is set.
+
+    Returns:
+    - dict: per-day result used for the throughput summary
+    """
+    data_dir = Path(data_dir)
+    bytes_read = sum(path.stat().st_size for path in data_dir.iterdir() if path.is_file())
+    start = time.perf_counter()
+    result = {
+        'export_date': export_date,
+        'inserted': 0,
+        'skipped': 0,
+        'errors': 0,
+        'bytes': bytes_read,
+        'error': None,
+    }
+    with _worker_pool.connection() as conn:
+        try:
+            stages = run_export(conn, data_dir, _worker_cache, force)
+            for inserted_count, skipped_count, error_count in stages.values():
+                result['inserted'] += inserted_count
+                result['skipped'] += skipped_count
+                result['errors'] += error_count
+        except Exception as e:
+            logger.error("Error loading export %s: %s", export_date, e, extra={'export_date': export_date})
+            conn.rollback()
+            _worker_cache.invalidate()
+            result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def run_backfill(root, start, end, workers, force=False, db_url=DB_URL, synchronous_commit=None,
+                 defer_indexes=False, concurrent_indexes=False):
+    """
+    Load every export directory between start and end in parallel.
+
+    The schema is migrated once up front so workers never race on DDL.
+
+    Parameters:
+    - root: directory containing the dated export directories
+    - start: first export date (inclusive)
+    - end: last export date (inclusive)
+    - workers: number of worker processes
+    - force: reload files even if the load manifest says they are unchanged
+    - db_url: database connection string
+    - synchronous_commit: override synchronous_commit for the load sessions, e.g. 'off'
+    - defer_indexes: drop secondary indexes during the load and rebuild them afterwards
+    - concurrent_indexes: rebuild deferred indexes with CREATE INDEX CONCURRENTLY
+
+    Returns:
+    - list: per-day result dicts sorted by export date
+    """
+    export_dirs = find_export_dirs(root, start, end)
+    if not export_dirs:
+        logger.warning("No export directories found in %s between %s and %s", root, start, end)
+        return []
+
+    with make_pool(min_size=1, max_size=1, db_url=db_url) as setup_pool, setup_pool.connection() as conn:
+        ensure_schema(conn)
+
+        workers = max(1, min(workers, len(export_dirs)))
+        logger.info("Backfilling %d exports from %s with %d workers", len(export_dirs), root, workers)
+        results = []
+        started = time.perf_counter()
+        indexes = deferred_indexes(conn, concurrently=concurrent_indexes) if defer_indexes else nullcontext()
+        with indexes, ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(db_url, synchronous_commit)
+        ) as pool:
+            futures = {
+                pool.submit(_load_export, export_date, str(data_dir), force): export_date
+                for export_date, data_dir in export_dirs
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                status = "failed" if result['error'] else "done"
+                logger.info("Export %s %s in %.2fs", result['export_date'], status, result['seconds'])
+
+    results.sort(key=lambda result: result['export_date'])
+    log_throughput_summary(results, time.perf_counter() - started)
+    return results
+
+def write_backfill_report(results, path):
+    """
+    Write the per-day backfill results as a JSON report.
+
+    Parameters:
+    - results: per-day result dicts returned by run_backfill
+    - path: report path
+    """
+    exports = [dict(result, export_date=result['export_date'].isoformat()) for result in results]
+    report = {
+        'status': 'failed' if any(result['error'] for result in results) else 'ok',
+        'inserted': sum(result['inserted'] for result in results),
+        'skipped': sum(result['skipped'] for result in results),
+        'errors': sum(result['errors'] for result in results),
+        'exports': exports,
+    }
+    write_atomically(path, json.dumps(report, indent=2) + '\n')
+    logger.info("Backfill report written to %s", path)
+
+def log_throughput_summary(results, elapsed):
+    """
+    Log one line per export day plus totals for the whole backfill.
+    """
+    logger.info("Backfill summary:")
+    logger.info("%-10s  %9s  %9s  %6s  %8s  %9s  %6s  status",
+                'date', 'inserted', 'skipped', 'errors', 'seconds', 'rows/s', 'MB/s')
+    for result in results:
+        rows = result['inserted'] + result['skipped']
+        seconds = result['seconds'] or float('inf')
+        logger.info(
+            "%-10s  %9d  %9d  %6d  %8.2f  %9.0f  %6.2f  %s",
+            result['export_date'].isoformat(), result['inserted'], result['skipped'], result['errors'],
+            result['seconds'], rows / seconds, result['bytes'] / 1_000_000 / seconds,
+            'failed: ' + result['error'] if result['error'] else 'ok',
+            extra={'export_date': result['export_date'], 'inserted': result['inserted'],
+                   'skipped': result['skipped'], 'error_count': result['errors'], 'seconds': result['seconds']},
+        )
+    total_rows = sum(result['inserted'] + result['skipped'] for result in results)
+    failed = sum(1 for result in results if result['error'])
+    logger.info(
+        "Loaded %d/%d exports, %d rows in %.2fs (%.0f rows/s overall)",
+        len(results) - failed, len(results), total_rows, elapsed, total_rows / elapsed if elapsed else 0,
+        extra={'exports': len(results), 'failed_exports': failed, 'rows': total_rows, 'seconds': elapsed},
+    )
@@ -2,8 +2,11 @@
 Configuration settings for the toast-exports-etl package.
 """
 import os
+from functools import partial
 from pathlib import Path
 from dotenv import load_dotenv
+from psycopg_pool import ConnectionPool
+from toast_exports.metrics import InstrumentedConnection
 
 # Load environment variables from .env file
 load_dotenv()
@@ -18,10 +21,109 @@ DB_PASSWORD = os.getenv('PG_PASSWORD', '')
 # Construct database URL
 DB_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+# Connection pool size
+DB_POOL_MIN_SIZE = int(os.getenv('PG_POOL_MIN_SIZE', '1'))
+DB_POOL_MAX_SIZE = int(os.getenv('PG_POOL_MAX_SIZE', '4'))
+
+# Session settings applied to every pooled connection; empty values keep the server default
+DB_WORK_MEM = os.getenv('PG_WORK_MEM', '64MB')
+DB_STATEMENT_TIMEOUT = os.getenv('PG_STATEMENT_TIMEOUT', '')
+
+# synchronous_commit for bulk load sessions. 'off' commits without waiting for
+# the WAL flush: a crash can lose the last few committed loads, which the load
+# manifest then reloads, but never leaves a partial one.
+DB_BULK_SYNCHRONOUS_COMMIT = os.getenv('PG_BULK_SYNCHRONOUS_COMMIT', 'on')
+
+# Create orders and time_entries as monthly range-partitioned tables. Must
+# match how the database was created, since the orders unique key differs.
+# Partitioned databases have no foreign keys to orders (see db.partitions).
+DB_PARTITIONED = os.getenv('PG_PARTITIONED', '').lower() in ('1', 'true', 'yes', 'on')
+
+# Run report written after every run, and an optional Prometheus textfile
+# (e.g. in the node exporter's textfile collector directory)
+RUN_REPORT_PATH = os.getenv('ETL_RUN_REPORT', 'etl_run_report.json')
+PROMETHEUS_TEXTFILE_PATH = os.getenv('ETL_PROMETHEUS_TEXTFILE', '')
+
+# Logging: level, 'text' or 'json' output, and record ids kept per kind of error
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_ERROR_EXAMPLES = int(os.getenv('LOG_ERROR_EXAMPLES', '5'))
+
 # Sample data configuration
 SAMPLE_DATA_DIR = Path('sample_data')
 CURRENT_DATA_DIR = SAMPLE_DATA_DIR / '20240410'
 
+# Number of export directories loaded in parallel by the backfill command
+BACKFILL_WORKERS = int(os.getenv('BACKFILL_WORKERS', '4'))
+
+# Number of pipeline stages loaded at the same time, each on its own pooled connection
+PIPELINE_CONCURRENCY = int(os.getenv('PIPELINE_CONCURRENCY', '4'))
+
+# Memory budget in MB for one chunk of a streamed CSV file
+CSV_MEMORY_BUDGET_MB = int(os.getenv('CSV_MEMORY_BUDGET_MB', '64'))
+
+# CSV parser: 'c' (pandas' own) or 'pyarrow' (multithreaded, needs the arrow extra)
+CSV_ENGINE = os.getenv('CSV_ENGINE', 'c')
+
 # Ensure sample data directory exists
 SAMPLE_DATA_DIR.mkdir(exist_ok=True)
-CURRENT_DATA_DIR.mkdir(exist_ok=True) 
\ No newline at end of file
+CURRENT_DATA_DIR.mkdir(exist_ok=True)
+
+def session_settings(bulk=False, synchronous_commit=None):
+    """
+    Return the session settings for a pooled connection.
+
+    Parameters:
+    - bulk: True for sessions that run bulk loads
+    - synchronous_commit: override synchronous_commit, e.g. 'off'
+
+    Returns:
+    - dict: setting name -> value
+    """
+    settings = {
+        'work_mem': DB_WORK_MEM,
+        'statement_timeout': DB_STATEMENT_TIMEOUT,
+        'synchronous_commit': synchronous_commit or (DB_BULK_SYNCHRONOUS_COMMIT if bulk else None),
+    }
+    return {name: value for name, value in settings.items() if value}
+
+def configure_session(conn, settings):
+    """
+    Apply session settings to a new connection before the pool hands it out.
+
+    Settings are session level, so they hold for every checkout of the connection.
+    """
+    with conn.cursor() as cursor:
+        for name, value in settings.items():
+            cursor.execute("SELECT set_config(%s, %s, false)", (name, value))
+    conn.commit()
+
+def make_pool(bulk=False, synchronous_commit=None, min_size=None, max_size=None, db_url=DB_URL):
+    """
+    Create a connection pool whose connections carry the configured session settings.
+
+    Connections are InstrumentedConnections, so stages run on them record
+    their statement latencies and commits.
+
+    The pool is created closed; open it with a with block or pool.open().
+
+    Parameters:
+    - bulk: configure the sessions for bulk loads (see DB_BULK_SYNCHRONOUS_COMMIT)
+    - synchronous_commit: override synchronous_commit, e.g. 'off'
+    - min_size: connections kept open (defaults to DB_POOL_MIN_SIZE)
+    - max_size: most connections open at once (defaults to DB_POOL_MAX_SIZE)
+    - db_url: database connection string
+
+    Returns:
+    - psycopg_pool.ConnectionPool
+    """
+    min_size = DB_POOL_MIN_SIZE if min_size is None else min_size
+    max_size = max(min_size, DB_POOL_MAX_SIZE if max_size is None else max_size)
+    return ConnectionPool(
+        db_url,
+        min_size=min_size,
+        max_size=max_size,
+        connection_class=InstrumentedConnection,
+        configure=partial(configure_session, settings=session_settings(bulk, synchronous_commit)),
+        open=False,
+    )
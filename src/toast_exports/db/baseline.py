@@ -0,0 +1,475 @@
+"""
+Frozen DDL of schema version 1, the baseline migration.
+
+This is a snapshot of the tables and indexes as they stood when versioned
+migrations were introduced, and it never changes: a database at version 1
+has exactly this schema, whatever create_tables and db.indexes say today.
+Later schema changes, index additions included, go in new migrations in
+db.migrations.
+
+CREATE ... IF NOT EXISTS also lets the baseline adopt databases created
+before schema_version existed. Whether orders and time_entries are
+partitioned is read from schema_settings, where migrate records it before
+the baseline runs.
+"""
+from toast_exports.db.partitions import schema_partitioned
+
+# DDL fragments that differ between an unpartitioned and a partitioned baseline
+BASELINE_FRAGMENTS = {
+    False: {
+        'order_key': "id",
+        'order_unique_key': "order_id",
+        'order_partitioning': "",
+        'time_entry_key': "id",
+        'time_entry_partitioning': "",
+        'order_reference': """,
+            CONSTRAINT fk_order
+                FOREIGN KEY (order_id)
+                REFERENCES orders (id)
+                ON DELETE CASCADE""",
+    },
+    True: {
+        'order_key': "id, opened_at",
+        'order_unique_key': "order_id, opened_at",
+        'order_partitioning': " PARTITION BY RANGE (opened_at)",
+        'time_entry_key': "id, in_date",
+        'time_entry_partitioning': " PARTITION BY RANGE (in_date)",
+        'order_reference': "",
+    },
+}
+
+# Table DDL in creation order, formatted with BASELINE_FRAGMENTS
+BASELINE_TABLES = [
+    """
+        CREATE TABLE IF NOT EXISTS locations (
+            id SERIAL PRIMARY KEY,
+            location VARCHAR(255) UNIQUE NOT NULL
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id SERIAL PRIMARY KEY,
+            job_id BIGINT UNIQUE NOT NULL,
+            job_guid UUID UNIQUE NOT NULL,
+            job_code VARCHAR(50),
+            job_title VARCHAR(255) NOT NULL
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS employees (
+            id SERIAL PRIMARY KEY,
+            employee_id BIGINT UNIQUE NOT NULL,
+            employee_guid UUID UNIQUE NOT NULL,
+            employee_external_id VARCHAR(50),
+            employee_name VARCHAR(255) UNIQUE NOT NULL
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS employee_name_aliases (
+            alias VARCHAR(255) PRIMARY KEY,
+            employee_id INT NOT NULL,
+            CONSTRAINT fk_employee FOREIGN KEY (employee_id) REFERENCES employees (id) ON DELETE CASCADE
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS menus (
+            guid UUID PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            description TEXT DEFAULT '',
+            id_string VARCHAR(50) NOT NULL,
+            orderable_online BOOLEAN NOT NULL DEFAULT TRUE,
+            orderable_online_status VARCHAR(10) DEFAULT 'YES',
+            visibility VARCHAR(10) DEFAULT 'ALL',
+            start_time BIGINT DEFAULT NULL,
+            end_time BIGINT DEFAULT NULL,
+            start_time_hhmm VARCHAR(5) DEFAULT NULL,
+            end_time_hhmm VARCHAR(5) DEFAULT NULL,
+            start_time_local_standard_time BIGINT DEFAULT NULL,
+            end_time_local_standard_time BIGINT DEFAULT NULL,
+            start_time_hhmm_local_standard_time VARCHAR(5) DEFAULT NULL,
+            end_time_hhmm_local_standard_time VARCHAR(5) DEFAULT NULL,
+            available_all_times BOOLEAN NOT NULL DEFAULT TRUE,
+            available_all_days BOOLEAN NOT NULL DEFAULT TRUE,
+            days_available_bits SMALLINT DEFAULT 127,
+            days_available_string TEXT[] DEFAULT NULL
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS menu_groups (
+            guid UUID PRIMARY KEY,
+            menu_guid UUID NOT NULL,
+            parent_guid UUID,
+            name VARCHAR(255),
+            description TEXT,
+            id_string VARCHAR(50),
+            CONSTRAINT fk_menu FOREIGN KEY (menu_guid) REFERENCES menus (guid) ON DELETE CASCADE,
+            CONSTRAINT fk_parent FOREIGN KEY (parent_guid) REFERENCES menu_groups (guid) ON DELETE CASCADE
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS menu_items (
+            guid UUID PRIMARY KEY,
+            name VARCHAR(255),
+            description TEXT,
+            id_string VARCHAR(50),
+            price NUMERIC(10,2),
+            sku VARCHAR(50),
+            plu VARCHAR(50)
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS modifier_groups (
+            guid UUID PRIMARY KEY,
+            name VARCHAR(255),
+            id_string VARCHAR(50),
+            min_selections INT,
+            max_selections INT
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS menu_group_items (
+            group_guid UUID NOT NULL REFERENCES menu_groups (guid) ON DELETE CASCADE,
+            item_guid UUID NOT NULL REFERENCES menu_items (guid) ON DELETE CASCADE,
+            PRIMARY KEY (group_guid, item_guid)
+        );
+        CREATE TABLE IF NOT EXISTS item_modifier_groups (
+            item_guid UUID NOT NULL REFERENCES menu_items (guid) ON DELETE CASCADE,
+            modifier_group_guid UUID NOT NULL REFERENCES modifier_groups (guid) ON DELETE CASCADE,
+            PRIMARY KEY (item_guid, modifier_group_guid)
+        );
+        CREATE TABLE IF NOT EXISTS modifier_group_options (
+            modifier_group_guid UUID NOT NULL REFERENCES modifier_groups (guid) ON DELETE CASCADE,
+            item_guid UUID NOT NULL REFERENCES menu_items (guid) ON DELETE CASCADE,
+            PRIMARY KEY (modifier_group_guid, item_guid)
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS orders (
+            id SERIAL,
+            location_id INT NOT NULL,
+            order_id BIGINT NOT NULL,
+            order_number VARCHAR(50) NOT NULL,
+            opened_at TIMESTAMP NOT NULL,
+            closed_at TIMESTAMP,
+            paid_at TIMESTAMP,
+            guest_count INT NOT NULL,
+            tab_names TEXT,
+            server_id INT NOT NULL,
+            table_number VARCHAR(50),
+            revenue_center VARCHAR(100),
+            dining_area VARCHAR(100),
+            service_period VARCHAR(50),
+            dining_option VARCHAR(100),
+            discount_amount NUMERIC(10,2) DEFAULT 0,
+            subtotal NUMERIC(10,2) NOT NULL,
+            tax NUMERIC(10,2) NOT NULL,
+            tip NUMERIC(10,2) DEFAULT 0,
+            gratuity NUMERIC(10,2) DEFAULT 0,
+            total NUMERIC(10,2) NOT NULL,
+            is_voided BOOLEAN DEFAULT FALSE,
+            duration_minutes INT,
+            order_source VARCHAR(50),
+            CONSTRAINT fk_location 
+                FOREIGN KEY (location_id) 
+                REFERENCES locations (id) 
+                ON DELETE CASCADE,
+            CONSTRAINT fk_server
+                FOREIGN KEY (server_id)
+                REFERENCES employees (id)
+                ON DELETE CASCADE,
+            PRIMARY KEY ({order_key}),
+            UNIQUE ({order_unique_key})
+        ){order_partitioning};
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS checks (
+            id SERIAL PRIMARY KEY,
+            order_id INT NOT NULL,
+            check_id BIGINT UNIQUE NOT NULL,
+            check_number VARCHAR(50) NOT NULL,
+            customer_id VARCHAR(100),
+            customer_name VARCHAR(255),
+            customer_phone VARCHAR(50),
+            customer_email VARCHAR(255),
+            customer_family VARCHAR(255),
+            location_code VARCHAR(50),
+            opened_date DATE,
+            opened_time TIME,
+            item_description TEXT,
+            table_size INT,
+            discount NUMERIC(10,2) DEFAULT 0,
+            discount_reason VARCHAR(255),
+            tax NUMERIC(10,2) DEFAULT 0,
+            tender VARCHAR(50),
+            total NUMERIC(10,2) NOT NULL,
+            receipt_link TEXT{order_reference},
+            UNIQUE(order_id, check_number)
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS item_selections (
+            id SERIAL PRIMARY KEY,
+            order_id INT NOT NULL,
+            check_id BIGINT NOT NULL,
+            item_selection_id BIGINT UNIQUE NOT NULL,
+            item_id BIGINT,
+            master_id BIGINT,
+            sent_at TIMESTAMP,
+            ordered_at TIMESTAMP,
+            sku VARCHAR(50),
+            plu VARCHAR(50),
+            menu_item VARCHAR(255) NOT NULL,
+            menu_subgroup VARCHAR(255),
+            menu_group VARCHAR(255),
+            menu VARCHAR(255),
+            sales_category VARCHAR(100),
+            gross_price NUMERIC(10,2),
+            discount NUMERIC(10,2) DEFAULT 0,
+            net_price NUMERIC(10,2),
+            quantity NUMERIC(10,3) NOT NULL,
+            tax NUMERIC(10,2) DEFAULT 0,
+            is_voided BOOLEAN DEFAULT FALSE,
+            is_deferred BOOLEAN DEFAULT FALSE,
+            is_tax_exempt BOOLEAN DEFAULT FALSE,
+            tax_inclusion VARCHAR(50),
+            dining_option_tax VARCHAR(50),
+            tab_name VARCHAR(255){order_reference}
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS modifier_selections (
+            id SERIAL PRIMARY KEY,
+            item_selection_id INT NOT NULL,
+            modifier_selection_id BIGINT UNIQUE NOT NULL,
+            modifier_id BIGINT,
+            master_id BIGINT,
+            option_group_id BIGINT,
+            option_group_name VARCHAR(255),
+            sent_at TIMESTAMP,
+            ordered_at TIMESTAMP,
+            sku VARCHAR(50),
+            plu VARCHAR(50),
+            modifier VARCHAR(255) NOT NULL,
+            sales_category VARCHAR(100),
+            gross_price NUMERIC(10,2),
+            discount NUMERIC(10,2) DEFAULT 0,
+            net_price NUMERIC(10,2),
+            quantity NUMERIC(10,3) NOT NULL,
+            is_voided BOOLEAN DEFAULT FALSE,
+            void_reason_id BIGINT,
+            void_reason VARCHAR(255),
+            CONSTRAINT fk_item_selection
+                FOREIGN KEY (item_selection_id)
+                REFERENCES item_selections (id)
+                ON DELETE CASCADE
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS payment_types (
+            id SMALLSERIAL PRIMARY KEY,
+            name VARCHAR(50) UNIQUE NOT NULL
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS payment_statuses (
+            id SMALLSERIAL PRIMARY KEY,
+            name VARCHAR(50) UNIQUE NOT NULL
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS card_types (
+            id SMALLSERIAL PRIMARY KEY,
+            name VARCHAR(50) UNIQUE NOT NULL
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS payments (
+            id SERIAL PRIMARY KEY,
+            payment_id BIGINT UNIQUE NOT NULL,
+            order_id INT NOT NULL,
+            check_id INT,
+            toast_check_id BIGINT NOT NULL,
+            check_number VARCHAR(50),
+            paid_at TIMESTAMP NOT NULL,
+            ordered_at TIMESTAMP,
+            tab_name VARCHAR(255),
+            house_account VARCHAR(50),
+            amount NUMERIC(10,2) NOT NULL,
+            tip NUMERIC(10,2) DEFAULT 0,
+            gratuity NUMERIC(10,2) DEFAULT 0,
+            total NUMERIC(10,2) NOT NULL,
+            swiped_card_amount NUMERIC(10,2) DEFAULT 0,
+            keyed_card_amount NUMERIC(10,2) DEFAULT 0,
+            amount_tendered NUMERIC(10,2),
+            refund_status VARCHAR(20),
+            refunded_at TIMESTAMP,
+            refund_amount NUMERIC(10,2),
+            refund_tip_amount NUMERIC(10,2),
+            void_user VARCHAR(255),
+            void_approver VARCHAR(255),
+            voided_at TIMESTAMP,
+            status_id SMALLINT NOT NULL,
+            type_id SMALLINT NOT NULL,
+            cash_drawer VARCHAR(100),
+            card_type_id SMALLINT,
+            other_type VARCHAR(100),
+            email VARCHAR(255),
+            phone VARCHAR(50),
+            card_last_4 VARCHAR(4),
+            card_fees NUMERIC(10,2),
+            room_info VARCHAR(255),
+            receipt VARCHAR(50),
+            source VARCHAR(50){order_reference},
+            CONSTRAINT fk_check
+                FOREIGN KEY (check_id)
+                REFERENCES checks (id)
+                ON DELETE SET NULL,
+            CONSTRAINT fk_status FOREIGN KEY (status_id) REFERENCES payment_statuses (id),
+            CONSTRAINT fk_type FOREIGN KEY (type_id) REFERENCES payment_types (id),
+            CONSTRAINT fk_card_type FOREIGN KEY (card_type_id) REFERENCES card_types (id)
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS kitchen_timings (
+            id SERIAL PRIMARY KEY,
+            location_id INT NOT NULL,
+            server_id INT,
+            fulfilled_by_id INT,
+            ticket_id BIGINT UNIQUE NOT NULL,
+            check_number VARCHAR(50),
+            table_number VARCHAR(50),
+            check_opened_at TIMESTAMP,
+            station VARCHAR(100),
+            expediter_level SMALLINT,
+            fired_at TIMESTAMP NOT NULL,
+            fulfilled_at TIMESTAMP,
+            fulfillment_seconds INT,
+            CONSTRAINT fk_location FOREIGN KEY (location_id) REFERENCES locations (id) ON DELETE CASCADE,
+            CONSTRAINT fk_server FOREIGN KEY (server_id) REFERENCES employees (id) ON DELETE SET NULL,
+            CONSTRAINT fk_fulfilled_by FOREIGN KEY (fulfilled_by_id) REFERENCES employees (id) ON DELETE SET NULL
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS cash_entries (
+            id SERIAL PRIMARY KEY,
+            location_id INT NOT NULL,
+            employee_id INT,
+            employee_2_id INT,
+            entry_id BIGINT UNIQUE NOT NULL,
+            created_at TIMESTAMP NOT NULL,
+            action VARCHAR(50) NOT NULL,
+            amount NUMERIC(10,2) NOT NULL,
+            cash_drawer VARCHAR(100),
+            payout_reason VARCHAR(255),
+            no_sale_reason VARCHAR(255),
+            comment TEXT,
+            CONSTRAINT fk_location FOREIGN KEY (location_id) REFERENCES locations (id) ON DELETE CASCADE,
+            CONSTRAINT fk_employee FOREIGN KEY (employee_id) REFERENCES employees (id) ON DELETE SET NULL,
+            CONSTRAINT fk_employee_2 FOREIGN KEY (employee_2_id) REFERENCES employees (id) ON DELETE SET NULL
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS cash_drawer_daily_summary (
+            location_id INT NOT NULL,
+            cash_drawer VARCHAR(100) NOT NULL,
+            business_date DATE NOT NULL,
+            payment_total NUMERIC(12,2) NOT NULL DEFAULT 0,
+            payment_count INT NOT NULL DEFAULT 0,
+            payout_total NUMERIC(12,2) NOT NULL DEFAULT 0,
+            payout_count INT NOT NULL DEFAULT 0,
+            no_sale_count INT NOT NULL DEFAULT 0,
+            net_amount NUMERIC(12,2) NOT NULL DEFAULT 0,
+            entry_count INT NOT NULL DEFAULT 0,
+            refreshed_at TIMESTAMP NOT NULL DEFAULT now(),
+            PRIMARY KEY (location_id, cash_drawer, business_date),
+            CONSTRAINT fk_location FOREIGN KEY (location_id) REFERENCES locations (id) ON DELETE CASCADE
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS time_entries (
+            id SERIAL,
+            location_id INT NOT NULL,
+            employee_id INT NOT NULL,
+            job_id INT NOT NULL,
+            in_date TIMESTAMP NOT NULL,
+            out_date TIMESTAMP NOT NULL,
+            auto_clock_out BOOLEAN NOT NULL,
+            total_hours NUMERIC(5, 2) NOT NULL,
+            unpaid_break_time NUMERIC(5, 2),
+            paid_break_time NUMERIC(5, 2),
+            payable_hours NUMERIC(5, 2) NOT NULL,
+            cash_tips_declared NUMERIC(10, 2),
+            non_cash_tips NUMERIC(10, 2),
+            total_gratuity NUMERIC(10, 2),
+            total_tips NUMERIC(10, 2),
+            tips_withheld NUMERIC(10, 2),
+            wage NUMERIC(10, 2) NOT NULL,
+            regular_hours NUMERIC(5, 2),
+            overtime_hours NUMERIC(5, 2),
+            regular_pay NUMERIC(10, 2),
+            overtime_pay NUMERIC(10, 2),
+            total_pay NUMERIC(10, 2) NOT NULL,
+            CONSTRAINT fk_location FOREIGN KEY (location_id) REFERENCES locations (id) ON DELETE CASCADE,
+            CONSTRAINT fk_employee FOREIGN KEY (employee_id) REFERENCES employees (id) ON DELETE CASCADE,
+            CONSTRAINT fk_job FOREIGN KEY (job_id) REFERENCES jobs (id) ON DELETE CASCADE,
+            PRIMARY KEY ({time_entry_key}),
+            UNIQUE(employee_id, in_date)
+        ){time_entry_partitioning};
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS etl_load_manifest (
+            export_date DATE NOT NULL,
+            file_name VARCHAR(255) NOT NULL,
+            content_hash CHAR(64) NOT NULL,
+            file_size BIGINT NOT NULL,
+            row_count INT,
+            loaded_at TIMESTAMP NOT NULL DEFAULT now(),
+            PRIMARY KEY (export_date, file_name)
+        );
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS etl_rejects (
+            id SERIAL PRIMARY KEY,
+            source VARCHAR(255) NOT NULL,
+            record_key VARCHAR(255),
+            record JSONB NOT NULL,
+            error TEXT NOT NULL,
+            rejected_at TIMESTAMP NOT NULL DEFAULT now()
+        );
+    """,
+]
+
+# Secondary indexes of the baseline
+BASELINE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_orders_location_opened ON orders USING btree (location_id, opened_at) INCLUDE (total, guest_count)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_server_opened ON orders USING btree (server_id, opened_at) INCLUDE (total, tip)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_opened_at_brin ON orders USING brin (opened_at)",
+    "CREATE INDEX IF NOT EXISTS idx_checks_order_id ON checks USING btree (order_id)",
+    "CREATE INDEX IF NOT EXISTS idx_item_selections_order_id ON item_selections USING btree (order_id)",
+    "CREATE INDEX IF NOT EXISTS idx_item_selections_check_item ON item_selections USING btree (check_id, item_id)",
+    "CREATE INDEX IF NOT EXISTS idx_item_selections_ordered_at_brin ON item_selections USING brin (ordered_at)",
+    "CREATE INDEX IF NOT EXISTS idx_modifier_selections_item_selection_id ON modifier_selections USING btree (item_selection_id)",
+    "CREATE INDEX IF NOT EXISTS idx_payments_order_id ON payments USING btree (order_id)",
+    "CREATE INDEX IF NOT EXISTS idx_payments_toast_check_id ON payments USING btree (toast_check_id)",
+    "CREATE INDEX IF NOT EXISTS idx_payments_paid_at_brin ON payments USING brin (paid_at)",
+    "CREATE INDEX IF NOT EXISTS idx_kitchen_timings_location_fired ON kitchen_timings USING btree (location_id, fired_at) INCLUDE (station, fulfillment_seconds)",
+    "CREATE INDEX IF NOT EXISTS idx_kitchen_timings_fired_at_brin ON kitchen_timings USING brin (fired_at)",
+    "CREATE INDEX IF NOT EXISTS idx_cash_entries_drawer_day ON cash_entries USING btree (location_id, cash_drawer, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_time_entries_job_in_date ON time_entries USING btree (job_id, in_date) INCLUDE (payable_hours, total_pay)",
+    "CREATE INDEX IF NOT EXISTS idx_time_entries_location_in_date ON time_entries USING btree (location_id, in_date)",
+    "CREATE INDEX IF NOT EXISTS idx_time_entries_in_date_brin ON time_entries USING brin (in_date)",
+]
+
+def baseline_schema(cursor):
+    """
+    Create the version 1 tables and indexes that don't exist yet, without committing.
+
+    Parameters:
+    - cursor: psycopg cursor
+    """
+    fragments = BASELINE_FRAGMENTS[schema_partitioned(cursor)]
+    cursor.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"')
+    for statement in BASELINE_TABLES:
+        cursor.execute(statement.format(**fragments))
+    for statement in BASELINE_INDEXES:
+        cursor.execute(statement)
@@ -0,0 +1,71 @@
+"""
+Helpers for bulk loading data through temporary staging tables.
+
+A bulk load stages rows with COPY into a temp table that only lives for the
+current transaction, then merges the staged rows into the target table with
+a single INSERT ... SELECT statement.
+"""
+import logging
+from psycopg import sql
+from toast_exports.transforms.parsing import normalize_nulls
+
+logger = logging.getLogger(__name__)
+
+def create_staging_table(cur, table, columns):
+    """
+    Create a temporary staging table that is dropped on commit.
+
+    Parameters:
+    - cur: psycopg cursor
+    - table: name of the staging table
+    - columns: list of (column name, SQL type) tuples
+    """
+    cur.execute(
+        sql.SQL("CREATE TEMP TABLE {} ({}) ON COMMIT DROP").format(
+            sql.Identifier(table),
+            sql.SQL(', ').join(
+                sql.SQL("{} {}").format(sql.Identifier(name), sql.SQL(col_type))
+                for name, col_type in columns
+            )
+        )
+    )
+
+def copy_rows(cur, table, columns, rows):
+    """
+    Stream rows into a table with COPY FROM STDIN.
+
+    Parameters:
+    - cur: psycopg cursor
+    - table: name of the table to copy into
+    - columns: list of column names, in the same order as each row
+    - rows: iterable of row tuples
+
+    Returns:
+    - int: number of rows written
+    """
+    row_count = 0
+    statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        sql.Identifier(table),
+        sql.SQL(', ').join(sql.Identifier(name) for name in columns)
+    )
+    with cur.copy(statement) as copy:
+        for row in rows:
+            copy.write_row(row)
+            row_count += 1
+    return row_count
+
+def frame_to_rows(df, columns):
+    """
+    Convert DataFrame columns into COPY-ready tuples of plain Python values.
+
+    NaN and NaT become None so they are written as NULL, and numpy scalars are
+    converted to their Python equivalents.
+
+    Parameters:
+    - df: pandas DataFrame
+    - columns: list of column names to emit, in order
+
+    Returns:
+    - iterator of row tuples
+    """
+    return normalize_nulls(df[columns]).itertuples(index=False, name=None)
@@ -0,0 +1,151 @@
+"""
+In-process cache of dimension surrogate keys shared across file processors.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Dimension name -> query returning (natural key, surrogate id) pairs
+DIMENSION_QUERIES = {
+    'locations': "SELECT location, id FROM locations",
+    'employees': "SELECT employee_name, id FROM employees",
+    'employee_ids': "SELECT employee_id, id FROM employees",
+    'employee_aliases': "SELECT alias, employee_id FROM employee_name_aliases",
+    'jobs': "SELECT job_id, id FROM jobs",
+    'payment_types': "SELECT name, id FROM payment_types",
+    'payment_statuses': "SELECT name, id FROM payment_statuses",
+    'card_types': "SELECT name, id FROM card_types",
+}
+
+class DimensionCache:
+    """
+    Natural key -> surrogate id maps for the dimension tables.
+
+    The cache is warmed with one SELECT per dimension, filled as processors
+    insert new rows, and must be invalidated whenever a transaction that may
+    have inserted dimension rows is rolled back.
+
+    Dimensions:
+    - locations: location name -> locations.id
+    - employees: formatted employee name -> employees.id
+    - employee_ids: Toast employee id -> employees.id
+    - employee_aliases: employee name as spelled in an export -> employees.id
+    - jobs: Toast job id -> jobs.id
+    - payment_types, payment_statuses, card_types: name -> code table id
+    """
+
+    def __init__(self):
+        self._maps = {dimension: {} for dimension in DIMENSION_QUERIES}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def warm(self, conn):
+        """
+        Load every dimension with one SELECT each.
+
+        Parameters:
+        - conn: psycopg connection object
+        """
+        with conn.cursor() as cursor:
+            for dimension, query in DIMENSION_QUERIES.items():
+                cursor.execute(query)
+                self._maps[dimension] = dict(cursor.fetchall())
+        conn.commit()
+        sizes = {dimension: len(ids) for dimension, ids in self._maps.items()}
+        logger.info(
+            "Dimension cache warmed: %s",
+            ", ".join("%d %s" % (size, dimension) for dimension, size in sizes.items()),
+            extra={'cache_sizes': sizes},
+        )
+
+    def get(self, dimension, key):
+        """
+        Return the cached surrogate id for a natural key, or None on a miss.
+        """
+        surrogate_id = self._maps[dimension].get(key)
+        if surrogate_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return surrogate_id
+
+    def put(self, dimension, key, surrogate_id):
+        """
+        Record the surrogate id of a newly inserted or looked up row.
+        """
+        self._maps[dimension][key] = surrogate_id
+
+    def update(self, dimension, ids):
+        """
+        Record a natural key -> surrogate id map.
+        """
+        self._maps[dimension].update(ids)
+
+    def resolve(self, dimension, keys, loader):
+        """
+        Return surrogate ids for keys, loading only the cache misses.
+
+        Parameters:
+        - dimension: dimension name
+        - keys: iterable of distinct natural keys
+        - loader: callable taking a list of missing keys and returning a
+          natural key -> surrogate id map for them
+
+        Returns:
+        - dict: natural key -> surrogate id for every key that could be resolved
+        """
+        ids = {}
+        missing = []
+        for key in keys:
+            surrogate_id = self.get(dimension, key)
+            if surrogate_id is None:
+                missing.append(key)
+            else:
+                ids[key] = surrogate_id
+        if missing:
+            loaded = loader(missing)
+            self.update(dimension, loaded)
+            ids.update(loaded)
+        return ids
+
+    def fork(self):
+        """
+        Return a copy of the cache for a processor running on another connection.
+
+        Ids inserted by that processor stay in the copy until its transaction
+        commits and the copy is merged back, so other connections never see
+        ids they cannot reference yet.
+        """
+        child = DimensionCache()
+        child._maps = {dimension: dict(ids) for dimension, ids in self._maps.items()}
+        return child
+
+    def merge(self, child):
+        """
+        Fold a forked cache's ids and counters back into this cache.
+        """
+        for dimension, ids in child._maps.items():
+            self._maps[dimension].update(ids)
+        self.hits += child.hits
+        self.misses += child.misses
+        self.invalidations += child.invalidations
+
+    def invalidate(self):
+        """
+        Drop every cached id, e.g. after a rollback discarded inserted rows.
+        """
+        self._maps = {dimension: {} for dimension in DIMENSION_QUERIES}
+        self.invalidations += 1
+
+    def log_stats(self):
+        """
+        Log hit/miss counters for the run.
+        """
+        lookups = self.hits + self.misses
+        hit_rate = (self.hits / lookups * 100) if lookups else 0.0
+        logger.info(
+            "Dimension cache: %d hits, %d misses (%.1f%% hit rate), %d invalidations",
+            self.hits, self.misses, hit_rate, self.invalidations,
+            extra={'cache_hits': self.hits, 'cache_misses': self.misses, 'cache_invalidations': self.invalidations},
+        )
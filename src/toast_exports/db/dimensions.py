@@ -0,0 +1,330 @@
+"""
+Set-based resolution of dimension rows (locations, jobs, employees and small
+code tables such as payment types) to surrogate ids.
+
+Each resolver upserts the distinct natural keys it is given in a single
+statement and returns a natural key -> surrogate id map, so the number of
+round trips depends on the number of distinct entities rather than rows.
+
+Resolvers are safe to run from concurrent loaders. Keys are upserted in
+sorted order, keys inserted by a concurrent transaction are looked up again
+once it has committed, and employee upserts, which match on several unique
+keys at once, are serialized with a transaction-level advisory lock.
+
+Employee names are spelled differently from file to file ('Bartender A' in
+OrderDetails, 'A, Bartender' in TimeEntries). employee_name_aliases maps
+every spelling seen so far to employees.id, so a known spelling resolves
+with one indexed lookup and only a new spelling is formatted and matched.
+"""
+import logging
+from psycopg import sql
+from toast_exports.utils.name_formatter import cached_format_name
+
+logger = logging.getLogger(__name__)
+
+def lookup_ids(cursor, table, key_column, keys):
+    """
+    Look up surrogate ids for existing rows by natural key.
+
+    Parameters:
+    - cursor: psycopg cursor
+    - table: dimension table name
+    - key_column: natural key column
+    - keys: iterable of natural key values
+
+    Returns:
+    - dict: natural key -> id
+    """
+    cursor.execute(
+        sql.SQL("SELECT {key}, id FROM {table} WHERE {key} = ANY(%s)").format(
+            key=sql.Identifier(key_column),
+            table=sql.Identifier(table)
+        ),
+        (list(keys),)
+    )
+    return dict(cursor.fetchall())
+
+def lock_dimension(cursor, table):
+    """
+    Serialize upserts into a dimension table until the current transaction ends.
+
+    Parameters:
+    - cursor: psycopg cursor
+    - table: dimension table name, used as the advisory lock key
+    """
+    cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (table,))
+
+def _lookup_missing(cursor, ids, table, key_column, keys):
+    """
+    Fill in keys a concurrent transaction inserted while our upsert was running.
+
+    A row that conflicts with an insert committed by another transaction is
+    skipped by ON CONFLICT DO NOTHING, but is not visible to the snapshot of
+    the upserting statement, so it is looked up again in a new statement.
+    """
+    missing = [key for key in keys if key not in ids]
+    if missing:
+        ids.update(lookup_ids(cursor, table, key_column, missing))
+    return ids
+
+def resolve_locations(cursor, locations):
+    """
+    Insert any new locations and return a location -> locations.id map.
+
+    Parameters:
+    - cursor: psycopg cursor
+    - locations: iterable of distinct location names
+
+    Returns:
+    - dict: location name -> locations.id
+    """
+    locations = sorted(locations)
+    if not locations:
+        return {}
+    cursor.execute(
+        """
+        WITH inserted AS (
+            INSERT INTO locations (location)
+            SELECT unnest(%s::varchar[])
+            ON CONFLICT (location) DO NOTHING
+            RETURNING location, id
+        )
+        SELECT location, id FROM inserted
+        UNION ALL
+        SELECT location, id FROM locations WHERE location = ANY(%s)
+        """,
+        (locations, locations)
+    )
+    return _lookup_missing(cursor, dict(cursor.fetchall()), 'locations', 'location', locations)
+
+def resolve_codes(cursor, table, names):
+    """
+    Insert any new names into a code table and return a name -> id map.
+
+    Code tables hold small enumerations (payment types, statuses, card types)
+    as a SMALLINT id and a unique name, so fact rows store the id instead of
+    repeating the text.
+
+    Parameters:
+    - cursor: psycopg cursor
+    - table: code table name, with id and name columns
+    - names: iterable of distinct names
+
+    Returns:
+    - dict: name -> id
+    """
+    names = sorted(names)
+    if not names:
+        return {}
+    cursor.execute(
+        sql.SQL("""
+            WITH inserted AS (
+                INSERT INTO {table} (name)
+                SELECT unnest(%s::varchar[])
+                ON CONFLICT (name) DO NOTHING
+                RETURNING name, id
+            )
+            SELECT name, id FROM inserted
+            UNION ALL
+            SELECT name, id FROM {table} WHERE name = ANY(%s)
+        """).format(table=sql.Identifier(table)),
+        (names, names)
+    )
+    return _lookup_missing(cursor, dict(cursor.fetchall()), table, 'name', names)
+
+def resolve_employee_names(cursor, employee_names):
+    """
+    Ensure each formatted employee name exists and return a name -> employees.id map.
+
+    Names that are not in employees yet (e.g. servers seen in orders before
+    their time entries) are inserted in one statement as placeholder rows
+    with a generated GUID and the negated surrogate id as employee_id, which
+    keeps employee_id unique; resolve_employees fills them in later.
+
+    Parameters:
+    - cursor: psycopg cursor
+    - employee_names: iterable of distinct formatted employee names
+
+    Returns:
+    - dict: formatted employee name -> employees.id
+    """
+    employee_names = sorted(employee_names)
+    employee_ids = lookup_ids(cursor, 'employees', 'employee_name', employee_names)
+    missing = [employee_name for employee_name in employee_names if employee_name not in employee_ids]
+    if not missing:
+        return employee_ids
+    lock_dimension(cursor, 'employees')
+    cursor.execute(
+        """
+        INSERT INTO employees (id, employee_id, employee_guid, employee_name)
+        SELECT n.id, -n.id, uuid_generate_v4(), n.employee_name
+        FROM (
+            SELECT nextval(pg_get_serial_sequence('employees', 'id')) AS id, employee_name
+            FROM unnest(%s::varchar[]) AS employee_name
+        ) n
+        ON CONFLICT (employee_name) DO NOTHING
+        RETURNING employee_name, id
+        """,
+        (missing,)
+    )
+    employee_ids.update(cursor.fetchall())
+    return _lookup_missing(cursor, employee_ids, 'employees', 'employee_name', missing)
+
+def resolve_employee_aliases(cursor, aliases):
+    """
+    Return a spelling -> employees.id map for employee names as spelled in an export file.
+
+    Spellings already in employee_name_aliases are resolved with one
+    lookup. New spellings are formatted, resolved with resolve_employee_names
+    (creating placeholder employees where needed) and recorded, so the next
+    file that spells a name the same way does not format it again.
+
+    Parameters:
+    - cursor: psycopg cursor
+    - aliases: iterable of distinct employee names as spelled in the file
+
+    Returns:
+    - dict: spelling -> employees.id
+    """
+    aliases = sorted(aliases)
+    if not aliases:
+        return {}
+    cursor.execute(
+        "SELECT alias, employee_id FROM employee_name_aliases WHERE alias = ANY(%s)",
+        (aliases,)
+    )
+    employee_ids = dict(cursor.fetchall())
+    formatted_names = {
+        alias: cached_format_name(alias) for alias in aliases if alias not in employee_ids
+    }
+    formatted_names = {alias: name for alias, name in formatted_names.items() if name}
+    if not formatted_names:
+        return employee_ids
+    name_ids = resolve_employee_names(cursor, set(formatted_names.values()))
+    new_ids = {
+        alias: name_ids[name] for alias, name in formatted_names.items() if name in name_ids
+    }
+    record_employee_aliases(cursor, new_ids)
+    employee_ids.update(new_ids)
+    return employee_ids
+
+def record_employee_aliases(cursor, alias_ids):
+    """
+    Record spellings of employee names in employee_name_aliases.
+
+    Spellings that are already recorded keep their employee.
+
+    Parameters:
+    - cursor: psycopg cursor
+    - alias_ids: dict of spelling -> employees.id
+    """
+    if not alias_ids:
+        return
+    aliases = sorted(alias_ids)
+    cursor.execute(
+        """
+        INSERT INTO employee_name_aliases (alias, employee_id)
+        SELECT * FROM unnest(%s::varchar[], %s::int[])
+        ON CONFLICT (alias) DO NOTHING
+        """,
+        (aliases, [alias_ids[alias] for alias in aliases])
+    )
+
+def resolve_jobs(cursor, jobs):
+    """
+    Insert any new jobs and return a job_id -> jobs.id map.
+
+    Existing jobs are left unchanged.
+
+    Parameters:
+    - cursor: psycopg cursor
+    - jobs: list of (job_id, job_guid, job_code, job_title) tuples, one per distinct job_id
+
+    Returns:
+    - dict: Toast job_id -> jobs.id
+    """
+    if not jobs:
+        return {}
+    jobs = sorted(jobs, key=lambda job: job[0])
+    job_ids, job_guids, job_codes, job_titles = (list(column) for column in zip(*jobs))
+    cursor.execute(
+        """
+        WITH incoming AS (
+            SELECT * FROM unnest(%s::bigint[], %s::uuid[], %s::varchar[], %s::varchar[])
+                AS i(job_id, job_guid, job_code, job_title)
+        ),
+        inserted AS (
+            INSERT INTO jobs (job_id, job_guid, job_code, job_title)
+            SELECT job_id, job_guid, job_code, job_title FROM incoming
+            ON CONFLICT (job_id) DO NOTHING
+            RETURNING job_id, id
+        )
+        SELECT job_id, id FROM inserted
+        UNION ALL
+        SELECT j.job_id, j.id FROM jobs j JOIN incoming i ON i.job_id = j.job_id
+        """,
+        (job_ids, job_guids, job_codes, job_titles)
+    )
+    return _lookup_missing(cursor, dict(cursor.fetchall()), 'jobs', 'job_id', job_ids)
+
+def resolve_employees(cursor, employees):
+    """
+    Upsert employees and return an employee_id -> employees.id map.
+
+    An incoming employee matches an existing row by Toast employee id, GUID
+    or formatted name, so placeholder rows created from order server names
+    are adopted and filled in. Unmatched employees are inserted. The
+    employees advisory lock is held until the caller commits.
+
+    Parameters:
+    - cursor: psycopg cursor
+    - employees: list of (employee_id, employee_guid, employee_external_id, employee_name)
+      tuples, one per distinct employee_id
+
+    Returns:
+    - dict: Toast employee_id -> employees.id
+    """
+    if not employees:
+        return {}
+    employees = sorted(employees, key=lambda employee: employee[0])
+    employee_ids, employee_guids, external_ids, employee_names = (list(column) for column in zip(*employees))
+    lock_dimension(cursor, 'employees')
+    cursor.execute(
+        """
+        WITH incoming AS (
+            SELECT * FROM unnest(%s::bigint[], %s::uuid[], %s::varchar[], %s::varchar[])
+                AS i(employee_id, employee_guid, employee_external_id, employee_name)
+        ),
+        updated AS (
+            UPDATE employees e
+            SET
+                employee_id = i.employee_id,
+                employee_guid = i.employee_guid,
+                employee_external_id = i.employee_external_id,
+                employee_name = i.employee_name
+            FROM incoming i
+            WHERE e.employee_id = i.employee_id
+            OR e.employee_guid = i.employee_guid
+            OR e.employee_name = i.employee_name
+            RETURNING i.employee_id, e.id
+        ),
+        inserted AS (
+            INSERT INTO employees (employee_id, employee_guid, employee_external_id, employee_name)
+            SELECT i.employee_id, i.employee_guid, i.employee_external_id, i.employee_name
+            FROM incoming i
+            WHERE NOT EXISTS (
+                SELECT 1 FROM employees e
+                WHERE e.employee_id = i.employee_id
+                OR e.employee_guid = i.employee_guid
+                OR e.employee_name = i.employee_name
+            )
+            ON CONFLICT DO NOTHING
+            RETURNING employee_id, id
+        )
+        SELECT employee_id, id FROM updated
+        UNION ALL
+        SELECT employee_id, id FROM inserted
+        """,
+        (employee_ids, employee_guids, external_ids, employee_names)
+    )
+    return dict(cursor.fetchall())
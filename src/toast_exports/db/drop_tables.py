@@ -1,6 +1,5 @@
 import logging
-import psycopg
-from toast_exports.config import DB_URL
+from toast_exports.config import make_pool
 
 logger = logging.getLogger(__name__)
 
@@ -13,10 +12,29 @@ def drop_tables(conn):
     - conn: psycopg connection object
     """
     tables = [
+        "schema_version",
+        "etl_rejects",
+        "etl_load_manifest",
         "time_entries",
+        "cash_drawer_daily_summary",
+        "cash_entries",
+        "kitchen_timings",
+        "payments",
+        "card_types",
+        "payment_statuses",
+        "payment_types",
+        "modifier_selections",
+        "item_selections",
         "checks",
         "orders",
+        "modifier_group_options",
+        "item_modifier_groups",
+        "menu_group_items",
+        "modifier_groups",
+        "menu_items",
+        "menu_groups",
         "menus",
+        "employee_name_aliases",
         "employees",
         "jobs",
         "locations"
@@ -27,9 +45,9 @@ def drop_tables(conn):
             try:
                 cursor.execute(f"DROP TABLE IF EXISTS {table} CASCADE;")
                 conn.commit()
-                logger.info(f"Dropped table: {table}")
+                logger.info("Dropped table: %s", table)
             except Exception as e:
-                logger.error(f"Error dropping table {table}: {str(e)}")
+                logger.error("Error dropping table %s: %s", table, e)
                 conn.rollback()
                 raise
 
@@ -40,9 +58,9 @@ if __name__ == "__main__":
     )
     
     try:
-        with psycopg.connect(DB_URL) as conn:
+        with make_pool(min_size=1, max_size=1) as pool, pool.connection() as conn:
             drop_tables(conn)
             logger.info("All tables dropped successfully")
     except Exception as e:
-        logger.error(f"Failed to drop tables: {str(e)}")
+        logger.error("Failed to drop tables: %s", e)
         raise 
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+Catalog of secondary indexes, and deferred index builds for bulk loads.
+
+Primary keys and unique constraints live with their tables in create_tables;
+every other index is listed in INDEXES. B-tree indexes cover the foreign keys
+used by joins and cascading deletes, some with INCLUDE columns so the common
+per-location and per-employee reports are answered from the index alone.
+Timestamp columns get BRIN indexes: rows arrive roughly in business date
+order, so a BRIN index of a few pages prunes date-range scans almost as well
+as a B-tree many times its size. An index added here reaches existing
+databases only through a new migration in db.migrations.
+
+Keeping indexes up to date row by row is the slowest part of a large
+backfill. deferred_indexes drops the catalog indexes the loaders do not read
+themselves and builds them again once the load is done, optionally
+CONCURRENTLY so the tables stay writable while they build.
+"""
+import logging
+from collections import namedtuple
+from contextlib import contextmanager
+from toast_exports.config import DB_PARTITIONED
+from toast_exports.db.partitions import PARTITION_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# A secondary index. Indexes with load_path set are read by the loaders
+# themselves (e.g. to match modifiers to their items) and are never deferred.
+Index = namedtuple('Index', ['name', 'table', 'columns', 'method', 'include', 'load_path'],
+                   defaults=('btree', None, False))
+
+INDEXES = [
+    # Orders: reports by location or server over a date range
+    Index('idx_orders_location_opened', 'orders', ['location_id', 'opened_at'], include=['total', 'guest_count']),
+    Index('idx_orders_server_opened', 'orders', ['server_id', 'opened_at'], include=['total', 'tip']),
+    Index('idx_orders_opened_at_brin', 'orders', ['opened_at'], method='brin'),
+
+    # Checks, item and modifier selections, payments: joins back to their order
+    Index('idx_checks_order_id', 'checks', ['order_id']),
+    Index('idx_item_selections_order_id', 'item_selections', ['order_id']),
+    Index('idx_item_selections_check_item', 'item_selections', ['check_id', 'item_id'], load_path=True),
+    Index('idx_item_selections_ordered_at_brin', 'item_selections', ['ordered_at'], method='brin'),
+    Index('idx_modifier_selections_item_selection_id', 'modifier_selections', ['item_selection_id']),
+    Index('idx_payments_order_id', 'payments', ['order_id']),
+    Index('idx_payments_toast_check_id', 'payments', ['toast_check_id'], load_path=True),
+    Index('idx_payments_paid_at_brin', 'payments', ['paid_at'], method='brin'),
+
+    # Kitchen timings and cash entries
+    Index('idx_kitchen_timings_location_fired', 'kitchen_timings', ['location_id', 'fired_at'],
+          include=['station', 'fulfillment_seconds']),
+    Index('idx_kitchen_timings_fired_at_brin', 'kitchen_timings', ['fired_at'], method='brin'),
+    Index('idx_cash_entries_drawer_day', 'cash_entries', ['location_id', 'cash_drawer', 'created_at'], load_path=True),
+
+    # Time entries: labor cost by job and by location over a date range
+    Index('idx_time_entries_job_in_date', 'time_entries', ['job_id', 'in_date'],
+          include=['payable_hours', 'total_pay']),
+    Index('idx_time_entries_location_in_date', 'time_entries', ['location_id', 'in_date']),
+    Index('idx_time_entries_in_date_brin', 'time_entries', ['in_date'], method='brin'),
+]
+
+def index_sql(index, concurrently=False):
+    """
+    Return the CREATE INDEX IF NOT EXISTS statement for a catalog index.
+    """
+    include = f" INCLUDE ({', '.join(index.include)})" if index.include else ""
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {index.name} "
+        f"ON {index.table} USING {index.method} ({', '.join(index.columns)}){include}"
+    )
+
+def deferrable_indexes(tables=None):
+    """
+    Return the catalog indexes that can be dropped during a bulk load.
+
+    Parameters:
+    - tables: only indexes on these tables (defaults to all)
+    """
+    return [
+        index for index in INDEXES
+        if not index.load_path and (tables is None or index.table in tables)
+    ]
+
+def drop_indexes(conn, indexes):
+    """
+    Drop the given indexes in one transaction.
+
+    Parameters:
+    - conn: psycopg connection object
+    - indexes: list of Index
+    """
+    with conn.cursor() as cursor:
+        try:
+            for index in indexes:
+                cursor.execute(f"DROP INDEX IF EXISTS {index.name}")
+        except Exception as e:
+            logger.error("Error dropping indexes: %s", e)
+            conn.rollback()
+            raise
+    conn.commit()
+    logger.info("Dropped %d indexes", len(indexes))
+
+def invalid_indexes(cursor, indexes):
+    """
+    Return the names of the given indexes that exist but are marked invalid.
+
+    A failed or interrupted CREATE INDEX CONCURRENTLY leaves an invalid
+    index behind, which CREATE INDEX IF NOT EXISTS would then skip.
+
+    Parameters:
+    - cursor: psycopg cursor
+    - indexes: list of Index
+    """
+    cursor.execute(
+        """
+        SELECT c.relname
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE NOT i.indisvalid AND c.relname = ANY(%s)
+        """,
+        ([index.name for index in indexes],)
+    )
+    return {name for name, in cursor.fetchall()}
+
+def create_indexes(conn, indexes=None, concurrently=False):
+    """
+    Create the given catalog indexes if they don't exist.
+
+    Invalid indexes left by an earlier failed concurrent build are dropped
+    and built again. A concurrent build cannot run inside a transaction, so
+    it runs in autocommit mode, one index at a time; if one fails, its
+    invalid leftover is dropped before the error is raised. Partitioned
+    tables cannot be indexed concurrently; their indexes are built normally.
+
+    Parameters:
+    - conn: psycopg connection object
+    - indexes: list of Index (defaults to INDEXES)
+    - concurrently: build with CREATE INDEX CONCURRENTLY
+    """
+    indexes = INDEXES if indexes is None else indexes
+    if concurrently:
+        autocommit = conn.autocommit
+        conn.commit()
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                invalid = invalid_indexes(cursor, indexes)
+                for index in indexes:
+                    partitioned = DB_PARTITIONED and index.table in PARTITION_COLUMNS
+                    _build_index_autocommit(cursor, index, index.name in invalid, concurrently=not partitioned)
+        except Exception as e:
+            logger.error("Error building indexes: %s", e)
+            raise
+        finally:
+            conn.autocommit = autocommit
+        return
+
+    with conn.cursor() as cursor:
+        try:
+            invalid = invalid_indexes(cursor, indexes)
+            for index in indexes:
+                if index.name in invalid:
+                    logger.warning("Rebuilding invalid index %s", index.name)
+                    cursor.execute(f"DROP INDEX IF EXISTS {index.name}")
+                logger.info("Building index %s", index.name)
+                cursor.execute(index_sql(index))
+        except Exception as e:
+            logger.error("Error building indexes: %s", e)
+            conn.rollback()
+            raise
+    conn.commit()
+
+def _build_index_autocommit(cursor, index, invalid, concurrently):
+    """
+    Build one index on an autocommit connection, replacing it if it is invalid.
+
+    A failed concurrent build leaves an invalid index, which is dropped
+    before the error is raised so the next run builds it from scratch.
+    """
+    drop = f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {index.name}"
+    if invalid:
+        logger.warning("Rebuilding invalid index %s", index.name)
+        cursor.execute(drop)
+    logger.info("Building index %s", index.name)
+    try:
+        cursor.execute(index_sql(index, concurrently=concurrently))
+    except Exception:
+        if concurrently:
+            try:
+                cursor.execute(drop)
+            except Exception as e:
+                logger.error("Error dropping invalid index %s: %s", index.name, e)
+        raise
+
+@contextmanager
+def deferred_indexes(conn, tables=None, concurrently=False):
+    """
+    Drop the deferrable catalog indexes for the duration of a bulk load.
+
+    The indexes are built again on exit, even if the load failed, so the
+    schema is never left without them.
+
+    Parameters:
+    - conn: psycopg connection object, used only before and after the load
+    - tables: only defer indexes on these tables (defaults to all)
+    - concurrently: rebuild with CREATE INDEX CONCURRENTLY
+    """
+    indexes = deferrable_indexes(tables)
+    drop_indexes(conn, indexes)
+    try:
+        yield indexes
+    finally:
+        create_indexes(conn, indexes, concurrently=concurrently)
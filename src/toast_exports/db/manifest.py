@@ -0,0 +1,83 @@
+"""
+Load manifest recording which export files have been loaded.
+
+Each file loaded without errors is recorded in etl_load_manifest by
+(export date, file name) with a content hash, so a rerun can skip files
+that have not changed since they were last loaded.
+"""
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def file_fingerprint(path):
+    """
+    Hash a file's contents without reading it into memory at once.
+
+    Parameters:
+    - path: pathlib.Path of the file
+
+    Returns:
+    - tuple: (SHA-256 hex digest, size in bytes)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+def load_manifest(conn, export_date):
+    """
+    Fetch the content hashes recorded for one export date.
+
+    Parameters:
+    - conn: psycopg connection object
+    - export_date: datetime.date of the export
+
+    Returns:
+    - dict: file name -> content hash
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT file_name, content_hash FROM etl_load_manifest WHERE export_date = %s",
+            (export_date,)
+        )
+        manifest = dict(cursor.fetchall())
+    conn.commit()
+    return manifest
+
+def record_load(conn, export_date, file_name, content_hash, file_size, row_count):
+    """
+    Record that a file was loaded, replacing any previous entry for it.
+
+    Parameters:
+    - conn: psycopg connection object
+    - export_date: datetime.date of the export
+    - file_name: name of the loaded file
+    - content_hash: hash returned by file_fingerprint
+    - file_size: size of the file in bytes
+    - row_count: number of rows read from the file
+    """
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute(
+                """
+                INSERT INTO etl_load_manifest (export_date, file_name, content_hash, file_size, row_count, loaded_at)
+                VALUES (%s, %s, %s, %s, %s, now())
+                ON CONFLICT (export_date, file_name) DO UPDATE SET
+                    content_hash = EXCLUDED.content_hash,
+                    file_size = EXCLUDED.file_size,
+                    row_count = EXCLUDED.row_count,
+                    loaded_at = EXCLUDED.loaded_at
+                """,
+                (export_date, file_name, content_hash, file_size, row_count)
+            )
+            conn.commit()
+        except Exception as e:
+            logger.error("Error recording load of %s for %s: %s", file_name, export_date, e)
+            conn.rollback()
+            raise
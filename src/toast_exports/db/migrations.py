@@ -0,0 +1,175 @@
+"""
+Versioned schema migrations.
+
+The schema_version table records each migration applied to the database.
+ensure_schema runs at startup. When the database is current, that costs
+two SELECTs, for the version and the partitioning mode. Otherwise the pending migrations in MIGRATIONS are applied in
+order, each in its own transaction together with its schema_version row,
+so a failed migration leaves the database at the previous version.
+
+Migrations run under a session advisory lock, and the version is read
+again once the lock is held. Parallel workers that start together
+therefore apply each migration exactly once; the rest wait and then find
+the schema current.
+
+The baseline migration is the frozen DDL in db.baseline. Its CREATE ...
+IF NOT EXISTS statements also adopt databases created before
+schema_version existed. Later schema changes (new columns, indexes,
+constraints) are appended as new migrations and never edited once
+released; create_tables and INDEXES are not migrations.
+
+Whether orders and time_entries are partitioned is decided once, when a
+database is first migrated, and recorded in schema_settings: an existing
+orders table keeps its layout, and a new database follows PG_PARTITIONED.
+Migrations read the recorded mode (see db.partitions.schema_partitioned),
+and ensure_schema refuses to run loads with a PG_PARTITIONED that
+disagrees with it.
+"""
+import logging
+from collections import namedtuple
+import psycopg
+from toast_exports.config import DB_PARTITIONED
+from toast_exports.db.baseline import baseline_schema
+from toast_exports.db.partitions import schema_partitioned
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock key serializing migrations across processes
+MIGRATION_LOCK = 'toast_exports_schema_migrations'
+
+# A schema change: apply(cursor) runs inside the migration's transaction
+Migration = namedtuple('Migration', ['version', 'description', 'apply'])
+
+MIGRATIONS = [
+    Migration(1, "baseline schema", baseline_schema),
+]
+
+def schema_version(conn):
+    """
+    Return the database's schema version, or 0 if it has never been migrated.
+
+    Parameters:
+    - conn: psycopg connection object
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT max(version) FROM schema_version")
+            version = cursor.fetchone()[0]
+    except psycopg.errors.UndefinedTable:
+        conn.rollback()
+        return 0
+    conn.commit()
+    return version or 0
+
+def migrate(conn, migrations=None):
+    """
+    Apply every pending migration in version order.
+
+    Parameters:
+    - conn: psycopg connection object
+    - migrations: list of Migration (defaults to MIGRATIONS)
+
+    Returns:
+    - list: versions applied
+    """
+    migrations = sorted(MIGRATIONS if migrations is None else migrations, key=lambda migration: migration.version)
+    applied = []
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(hashtext(%s))", (MIGRATION_LOCK,))
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INT PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at TIMESTAMP NOT NULL DEFAULT now()
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_settings (
+                    name VARCHAR(50) PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+            # An existing orders table keeps its layout; a new database follows DB_PARTITIONED
+            cursor.execute(
+                """
+                INSERT INTO schema_settings (name, value)
+                VALUES ('partitioned', CASE
+                    WHEN to_regclass('orders') IS NULL THEN %s
+                    ELSE (to_regclass('orders') IN (SELECT partrelid FROM pg_partitioned_table))::text
+                END)
+                ON CONFLICT (name) DO NOTHING
+                """,
+                ('true' if DB_PARTITIONED else 'false',)
+            )
+            conn.commit()
+            current = schema_version(conn)
+            for migration in migrations:
+                if migration.version <= current:
+                    continue
+                logger.info("Applying schema migration %s: %s", migration.version, migration.description)
+                try:
+                    migration.apply(cursor)
+                    cursor.execute(
+                        "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                        (migration.version, migration.description)
+                    )
+                    conn.commit()
+                except Exception as e:
+                    logger.error("Error applying schema migration %s: %s", migration.version, e)
+                    conn.rollback()
+                    raise
+                applied.append(migration.version)
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", (MIGRATION_LOCK,))
+            conn.commit()
+    return applied
+
+def check_partitioning(conn):
+    """
+    Check that DB_PARTITIONED matches the partitioning recorded in the database.
+
+    The loaders pick the orders conflict key and create partitions from
+    DB_PARTITIONED, so loading with the other mode would fail.
+
+    Parameters:
+    - conn: psycopg connection object
+
+    Raises:
+    - RuntimeError: if PG_PARTITIONED disagrees with the database
+    """
+    with conn.cursor() as cursor:
+        partitioned = schema_partitioned(cursor)
+    conn.commit()
+    if partitioned != DB_PARTITIONED:
+        raise RuntimeError(
+            f"The database was created {'with' if partitioned else 'without'} partitioning; "
+            f"set PG_PARTITIONED={'true' if partitioned else 'false'} to load it"
+        )
+
+def ensure_schema(conn, migrations=None):
+    """
+    Bring the database schema up to date and check its partitioning mode.
+
+    Parameters:
+    - conn: psycopg connection object
+    - migrations: list of Migration (defaults to MIGRATIONS)
+
+    Returns:
+    - list: versions applied; empty when the schema was already current
+
+    Raises:
+    - RuntimeError: if PG_PARTITIONED disagrees with the database
+    """
+    migrations = MIGRATIONS if migrations is None else migrations
+    latest = max(migration.version for migration in migrations)
+    current = schema_version(conn)
+    if current >= latest:
+        logger.debug("Schema is current at version %s", current)
+        check_partitioning(conn)
+        return []
+    applied = migrate(conn, migrations)
+    if applied:
+        logger.info("Schema migrated from version %s to %s", current, applied[-1])
+    check_partitioning(conn)
+    return applied
@@ -0,0 +1,180 @@
+"""
+Monthly range partitions for the largest fact tables.
+
+With DB_PARTITIONED, create_tables partitions orders by opened_at and
+time_entries by in_date, one partition per calendar month. Loaders create
+the partitions for the months in each batch before staging it, so new
+export dates never need manual DDL. Loads and date-range reports touch
+only the months involved, and an old month can be detached in one cheap
+catalog operation.
+
+Unique keys of a partitioned table must include its partition column, so
+orders are keyed by (order_id, opened_at); an order's opened_at does not
+change between exports. Foreign keys from checks, item selections and
+payments to orders need a unique orders.id, so partitioned databases trade
+them for checks in the loaders:
+
+- item selections and payments are merged with a join to orders, and rows
+  whose order is not loaded are counted as orphans (errors) and left out;
+- checks take their order from payments and item selections, and only
+  parents whose order still exists count.
+
+Nothing cascades from orders, though. Detaching or deleting orders leaves
+their checks, item selections and payments in place; detach_partition
+logs how many rows that orphaned (see count_order_orphans) so they can be
+archived with the detached month.
+"""
+import logging
+from datetime import date
+import pandas as pd
+from psycopg import sql
+from toast_exports.config import DB_PARTITIONED
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> partition column
+PARTITION_COLUMNS = {
+    'orders': 'opened_at',
+    'time_entries': 'in_date',
+}
+
+# Conflict target of the orders merge, matching the orders unique key
+ORDER_KEY = 'order_id, opened_at' if DB_PARTITIONED else 'order_id'
+
+# Tables whose order_id references orders.id, with a foreign key only when
+# orders is not partitioned
+ORDER_CHILD_TABLES = ['checks', 'item_selections', 'payments']
+
+def schema_partitioned(cursor):
+    """
+    Return whether this database partitions orders and time_entries.
+
+    The mode is recorded in schema_settings when the database is first
+    migrated (see db.migrations), so a later run cannot change it by
+    setting PG_PARTITIONED differently.
+    """
+    cursor.execute("SELECT value FROM schema_settings WHERE name = 'partitioned'")
+    row = cursor.fetchone()
+    return row is not None and row[0] == 'true'
+
+def month_start(value):
+    """
+    Return the first day of the month of a date or timestamp.
+    """
+    return date(value.year, value.month, 1)
+
+def next_month(month):
+    """
+    Return the first day of the month after a month start.
+    """
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def partition_name(table, month):
+    """
+    Return the name of a table's partition for a month, e.g. orders_2024_04.
+    """
+    return f"{table}_{month:%Y_%m}"
+
+def ensure_partitions(cursor, table, values):
+    """
+    Create any missing monthly partitions for the given partition column values.
+
+    Partition creation is serialized with a transaction-level advisory lock,
+    so concurrent loaders never race on the same DDL; the caller should
+    commit soon after to release it.
+
+    Parameters:
+    - cursor: psycopg cursor
+    - table: partitioned table name, a PARTITION_COLUMNS key
+    - values: iterable of dates or timestamps; missing values are ignored
+
+    Returns:
+    - list: names of the partitions created
+    """
+    months = sorted({month_start(value) for value in values if pd.notna(value)})
+    if not months:
+        return []
+    cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"{table}_partitions",))
+    cursor.execute(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        """,
+        (table,)
+    )
+    existing = {name for name, in cursor.fetchall()}
+    created = []
+    for month in months:
+        name = partition_name(table, month)
+        if name in existing:
+            continue
+        cursor.execute(
+            sql.SQL("CREATE TABLE {partition} PARTITION OF {table} FOR VALUES FROM ({start}) TO ({end})").format(
+                partition=sql.Identifier(name),
+                table=sql.Identifier(table),
+                start=sql.Literal(month),
+                end=sql.Literal(next_month(month)),
+            )
+        )
+        created.append(name)
+    if created:
+        logger.info("Created partitions: %s", ', '.join(created))
+    return created
+
+def count_order_orphans(cursor):
+    """
+    Count the rows of each ORDER_CHILD_TABLES table whose order is not in orders.
+
+    Parameters:
+    - cursor: psycopg cursor
+
+    Returns:
+    - dict: table name -> orphaned row count, for tables with orphans
+    """
+    orphans = {}
+    for table in ORDER_CHILD_TABLES:
+        cursor.execute(
+            sql.SQL(
+                "SELECT count(*) FROM {table} c WHERE NOT EXISTS (SELECT 1 FROM orders o WHERE o.id = c.order_id)"
+            ).format(table=sql.Identifier(table))
+        )
+        count = cursor.fetchone()[0]
+        if count:
+            orphans[table] = count
+    return orphans
+
+def detach_partition(conn, table, month):
+    """
+    Detach a month's partition, leaving its rows in a standalone table.
+
+    The detached table (e.g. orders_2021_01) can then be archived or dropped
+    without touching the rest of the data. Detaching orders does not cascade
+    to checks, item selections and payments; the rows left without an order
+    are counted and logged.
+
+    Parameters:
+    - conn: psycopg connection object
+    - table: partitioned table name, a PARTITION_COLUMNS key
+    - month: any date in the month to detach
+    """
+    name = partition_name(table, month_start(month))
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute(
+                sql.SQL("ALTER TABLE {table} DETACH PARTITION {partition}").format(
+                    table=sql.Identifier(table),
+                    partition=sql.Identifier(name),
+                )
+            )
+            orphans = count_order_orphans(cursor) if table == 'orders' else {}
+        except Exception as e:
+            logger.error("Error detaching partition %s: %s", name, e)
+            conn.rollback()
+            raise
+    conn.commit()
+    logger.info("Detached partition %s", name)
+    for child_table, count in orphans.items():
+        logger.warning("%d %s rows no longer have an order after detaching %s", count, child_table, name,
+                       extra={'table': child_table, 'orphaned_count': count})
@@ -0,0 +1,41 @@
+"""
+Records that could not be loaded, kept in etl_rejects for later inspection.
+
+Loaders that process a file in one batch send bad records here instead of
+rolling back the whole file.
+"""
+import json
+import logging
+from psycopg.types.json import Jsonb
+
+logger = logging.getLogger(__name__)
+
+def record_rejects(cursor, source, rejects):
+    """
+    Insert rejected records in one batch, in the caller's transaction.
+
+    Parameters:
+    - cursor: psycopg cursor
+    - source: file the records came from
+    - rejects: list of (record key, record dict, error message) tuples
+
+    Returns:
+    - int: number of rejects recorded
+    """
+    if not rejects:
+        return 0
+    cursor.executemany(
+        """
+        INSERT INTO etl_rejects (source, record_key, record, error)
+        VALUES (%s, %s, %s, %s)
+        """,
+        [
+            (source, None if record_key is None else str(record_key), Jsonb(record, dumps=_dumps), error)
+            for record_key, record, error in rejects
+        ]
+    )
+    logger.warning("%d records from %s written to etl_rejects", len(rejects), source)
+    return len(rejects)
+
+def _dumps(record):
+    return json.dumps(record, default=str)
@@ -0,0 +1,212 @@
+import pandas as pd
+import logging
+from pathlib import Path
+from toast_exports.config import CURRENT_DATA_DIR
+from toast_exports.db.bulk import create_staging_table, copy_rows, frame_to_rows
+from toast_exports.db.dimensions import resolve_locations, resolve_employee_aliases
+from toast_exports.logs import ErrorSummary
+from toast_exports.metrics import timed
+from toast_exports.readers import iter_csv_chunks
+from toast_exports.schemas import CASH_ENTRIES_SCHEMA
+from toast_exports.transforms.cash_entries import transform_cash_entries
+
+logger = logging.getLogger(__name__)
+
+CASH_ENTRY_STAGING_TABLE = 'cash_entries_staging'
+
+# Columns staged for the bulk merge, in COPY order, with their staging types
+CASH_ENTRY_STAGING_COLUMNS = [
+    ('location_id', 'INT'),
+    ('employee_id', 'INT'),
+    ('employee_2_id', 'INT'),
+    ('entry_id', 'BIGINT'),
+    ('created_at', 'TIMESTAMP'),
+    ('action', 'VARCHAR(50)'),
+    ('amount', 'NUMERIC(10,2)'),
+    ('cash_drawer', 'VARCHAR(100)'),
+    ('payout_reason', 'VARCHAR(255)'),
+    ('no_sale_reason', 'VARCHAR(255)'),
+    ('comment', 'TEXT'),
+]
+
+# Columns that must be present for an entry to be loaded, with the message reported when missing
+REQUIRED_CASH_ENTRY_COLUMNS = [
+    ('entry_id', "missing or invalid Entry Id"),
+    ('location', "missing Location"),
+    ('created_at', "missing or invalid Created Date"),
+    ('action', "missing Action"),
+    ('amount', "missing or invalid Amount"),
+]
+
+def process_cash_entries(conn, data_dir=None, cache=None, memory_budget_mb=None):
+    """
+    Process cash drawer entries from CSV file and insert into database.
+
+    The per-drawer daily summary is refreshed for the drawers and days each
+    chunk touches, in the same transaction as the entries themselves.
+
+    Parameters:
+    - conn: psycopg connection object
+    - data_dir: export directory containing CashEntries.csv (defaults to CURRENT_DATA_DIR)
+    - cache: optional DimensionCache for location and employee ids
+    - memory_budget_mb: memory budget for one chunk in MB (defaults to CSV_MEMORY_BUDGET_MB)
+
+    Returns:
+    - tuple: (inserted count, skipped count, error count)
+    """
+    sample_data_path = Path(data_dir or CURRENT_DATA_DIR) / 'CashEntries.csv'
+
+    logger.info("Reading cash entries data...")
+    inserted_count = 0
+    skipped_count = 0
+    error_count = 0
+    summary = ErrorSummary('cash entries')
+    for df in iter_csv_chunks(sample_data_path, memory_budget_mb, schema=CASH_ENTRIES_SCHEMA):
+        entries, errors = validate_cash_entries(df)
+        summary.extend(errors)
+        chunk_inserted, chunk_skipped = load_cash_entries_bulk(conn, entries, cache)
+        inserted_count += chunk_inserted
+        skipped_count += chunk_skipped
+        error_count += len(errors)
+
+    summary.log(logger)
+    logger.info("Cash entries processing complete. %d inserted, %d skipped, %d errors", inserted_count, skipped_count, error_count)
+    return inserted_count, skipped_count, error_count
+
+@timed('transform')
+def validate_cash_entries(df):
+    """
+    Transform CashEntries rows and split out rows that cannot be loaded.
+
+    Parameters:
+    - df: CashEntries DataFrame
+
+    Returns:
+    - tuple: (transformed DataFrame of valid entries, list of (entry id, error message))
+    """
+    entries = transform_cash_entries(df)
+    problems = pd.Series('', index=df.index, dtype=object)
+
+    for column, message in REQUIRED_CASH_ENTRY_COLUMNS:
+        problems[entries[column].isna() & (problems == '')] = message
+
+    invalid = problems != ''
+    errors = [
+        (entry_id if pd.notna(entry_id) else 'unknown', message)
+        for entry_id, message in zip(df.loc[invalid, 'Entry Id'], problems[invalid])
+    ]
+    return entries[~invalid], errors
+
+@timed('load')
+def load_cash_entries_bulk(conn, entries, cache=None):
+    """
+    Load validated cash entries with COPY and a single merge statement.
+
+    Locations and employees ('Employee' and 'Employee 2') are resolved and
+    committed first. The entries are then merged with ON CONFLICT (entry_id)
+    DO NOTHING and the drawer summary is refreshed before the commit.
+
+    Parameters:
+    - conn: psycopg connection object
+    - entries: transformed entries returned by validate_cash_entries
+    - cache: optional DimensionCache for location and employee ids
+
+    Returns:
+    - tuple: (inserted count, skipped count)
+    """
+    if entries.empty:
+        return 0, 0
+
+    columns = [name for name, _ in CASH_ENTRY_STAGING_COLUMNS]
+    try:
+        with conn.cursor() as cursor:
+            locations = entries['location'].dropna().unique()
+            employee_names = pd.concat([entries['employee'], entries['employee_2']]).dropna().unique()
+            if cache is None:
+                location_ids = resolve_locations(cursor, locations)
+                employee_ids = resolve_employee_aliases(cursor, employee_names)
+            else:
+                location_ids = cache.resolve('locations', locations, lambda missing: resolve_locations(cursor, missing))
+                employee_ids = cache.resolve('employee_aliases', employee_names, lambda missing: resolve_employee_aliases(cursor, missing))
+            conn.commit()
+
+            staged = entries.assign(
+                location_id=entries['location'].map(location_ids).astype('Int64'),
+                employee_id=entries['employee'].map(employee_ids).astype('Int64'),
+                employee_2_id=entries['employee_2'].map(employee_ids).astype('Int64'),
+            )
+
+            create_staging_table(cursor, CASH_ENTRY_STAGING_TABLE, CASH_ENTRY_STAGING_COLUMNS)
+            staged_count = copy_rows(cursor, CASH_ENTRY_STAGING_TABLE, columns, frame_to_rows(staged, columns))
+
+            column_list = ', '.join(columns)
+            cursor.execute(f"""
+                INSERT INTO cash_entries ({column_list})
+                SELECT {column_list} FROM {CASH_ENTRY_STAGING_TABLE}
+                ON CONFLICT (entry_id) DO NOTHING
+            """)
+            inserted_count = cursor.rowcount
+
+            if inserted_count:
+                refresh_drawer_summary(cursor, CASH_ENTRY_STAGING_TABLE)
+        conn.commit()
+    except Exception as e:
+        logger.error("Error bulk loading cash entries: %s", e)
+        conn.rollback()
+        if cache is not None:
+            cache.invalidate()
+        raise
+
+    return inserted_count, staged_count - inserted_count
+
+def refresh_drawer_summary(cursor, staging_table):
+    """
+    Recompute cash_drawer_daily_summary rows for the drawers and days in a staging table.
+
+    Only the (location, drawer, day) groups present in the staged entries are
+    recomputed from cash_entries, so the refresh cost depends on the size of
+    the load rather than the size of the table, and reloading the same file
+    leaves the summary unchanged.
+
+    Parameters:
+    - cursor: psycopg cursor
+    - staging_table: staging table holding the entries just loaded
+    """
+    cursor.execute(f"""
+        WITH touched AS (
+            SELECT DISTINCT location_id, COALESCE(cash_drawer, '') AS cash_drawer, created_at::date AS business_date
+            FROM {staging_table}
+        )
+        INSERT INTO cash_drawer_daily_summary (
+            location_id, cash_drawer, business_date, payment_total, payment_count,
+            payout_total, payout_count, no_sale_count, net_amount, entry_count, refreshed_at
+        )
+        SELECT
+            e.location_id,
+            COALESCE(e.cash_drawer, ''),
+            e.created_at::date,
+            COALESCE(sum(e.amount) FILTER (WHERE e.action = 'CASH_PAYMENT'), 0),
+            count(*) FILTER (WHERE e.action = 'CASH_PAYMENT'),
+            COALESCE(sum(e.amount) FILTER (WHERE e.action IN ('PAY_OUT', 'TIP_OUT')), 0),
+            count(*) FILTER (WHERE e.action IN ('PAY_OUT', 'TIP_OUT')),
+            count(*) FILTER (WHERE e.action = 'NO_SALE'),
+            sum(e.amount),
+            count(*),
+            now()
+        FROM cash_entries e
+        JOIN touched t
+            ON t.location_id = e.location_id
+            AND t.cash_drawer = COALESCE(e.cash_drawer, '')
+            AND e.created_at >= t.business_date
+            AND e.created_at < t.business_date + 1
+        GROUP BY e.location_id, COALESCE(e.cash_drawer, ''), e.created_at::date
+        ON CONFLICT (location_id, cash_drawer, business_date) DO UPDATE SET
+            payment_total = EXCLUDED.payment_total,
+            payment_count = EXCLUDED.payment_count,
+            payout_total = EXCLUDED.payout_total,
+            payout_count = EXCLUDED.payout_count,
+            no_sale_count = EXCLUDED.no_sale_count,
+            net_amount = EXCLUDED.net_amount,
+            entry_count = EXCLUDED.entry_count,
+            refreshed_at = EXCLUDED.refreshed_at
+    """)
@@ -0,0 +1,283 @@
+import pandas as pd
+import logging
+from pathlib import Path
+from toast_exports.config import CURRENT_DATA_DIR
+from toast_exports.db.bulk import create_staging_table, copy_rows, frame_to_rows
+from toast_exports.logs import ErrorSummary
+from toast_exports.metrics import timed
+from toast_exports.readers import iter_csv_chunks
+from toast_exports.schemas import CHECK_DETAILS_SCHEMA
+from toast_exports.transforms.checks import transform_check_details
+
+logger = logging.getLogger(__name__)
+
+CHECK_STAGING_TABLE = 'checks_staging'
+
+# Columns staged for the bulk merge, in COPY order, with their staging types
+CHECK_STAGING_COLUMNS = [
+    ('order_id', 'INT'),
+    ('check_id', 'BIGINT'),
+    ('check_number', 'VARCHAR(50)'),
+    ('customer_id', 'VARCHAR(100)'),
+    ('customer_name', 'VARCHAR(255)'),
+    ('customer_phone', 'VARCHAR(50)'),
+    ('customer_email', 'VARCHAR(255)'),
+    ('customer_family', 'VARCHAR(255)'),
+    ('location_code', 'VARCHAR(50)'),
+    ('opened_date', 'DATE'),
+    ('opened_time', 'TIME'),
+    ('item_description', 'TEXT'),
+    ('table_size', 'INT'),
+    ('discount', 'NUMERIC(10,2)'),
+    ('discount_reason', 'VARCHAR(255)'),
+    ('tax', 'NUMERIC(10,2)'),
+    ('tender', 'VARCHAR(50)'),
+    ('total', 'NUMERIC(10,2)'),
+    ('receipt_link', 'TEXT'),
+]
+
+# Columns that must be present for a check to be loaded, with the message reported when missing
+REQUIRED_CHECK_COLUMNS = [
+    ('check_id', "missing or invalid Check Id"),
+    ('check_number', "missing Check #"),
+    ('total', "missing or invalid Total"),
+]
+
+def process_checks(conn, data_dir=None, bulk=True, memory_budget_mb=None):
+    """
+    Process checks from CSV file and insert into database.
+
+    CheckDetails.csv has no Order Id, so each check's parent order is taken
+    from the payments and item selections already loaded for the same Toast
+    check id; those stages must run first. Checks with no known parent order
+    are counted as orphaned and reported as errors.
+
+    Parameters:
+    - conn: psycopg connection object
+    - data_dir: export directory containing CheckDetails.csv (defaults to CURRENT_DATA_DIR)
+    - bulk: load through a COPY staging table (default) instead of one INSERT per row
+    - memory_budget_mb: memory budget for one chunk in MB (defaults to CSV_MEMORY_BUDGET_MB)
+
+    Returns:
+    - tuple: (inserted count, skipped count, error count)
+    """
+    sample_data_path = Path(data_dir or CURRENT_DATA_DIR) / 'CheckDetails.csv'
+
+    logger.info("Reading checks data...")
+    inserted_count = 0
+    skipped_count = 0
+    orphaned_count = 0
+    error_count = 0
+    summary = ErrorSummary('checks')
+    for df in iter_csv_chunks(sample_data_path, memory_budget_mb, schema=CHECK_DETAILS_SCHEMA):
+        checks, errors = validate_checks(df)
+        summary.extend(errors)
+        error_count += len(errors)
+
+        with conn.cursor() as cursor:
+            order_ids = resolve_check_orders(cursor, checks['check_id'].unique())
+        conn.commit()
+        checks = checks.assign(order_id=checks['check_id'].map(order_ids).astype('Int64'))
+        orphaned = checks['order_id'].isna()
+        for check_id in checks.loc[orphaned, 'check_id']:
+            summary.add("no order found", check_id)
+        orphaned_count += int(orphaned.sum())
+
+        if bulk:
+            chunk_inserted, chunk_skipped = load_checks_bulk(conn, checks[~orphaned])
+        else:
+            chunk_inserted, chunk_skipped = _process_checks_row_by_row(conn, checks[~orphaned])
+        inserted_count += chunk_inserted
+        skipped_count += chunk_skipped
+
+    summary.log(logger)
+    logger.info(
+        "Checks processing complete. %d inserted, %d skipped, %d orphaned, %d errors",
+        inserted_count, skipped_count, orphaned_count, error_count
+    )
+    return inserted_count, skipped_count, error_count + orphaned_count
+
+@timed('transform')
+def validate_checks(df):
+    """
+    Transform CheckDetails rows and split out rows that cannot be loaded.
+
+    Parameters:
+    - df: CheckDetails DataFrame
+
+    Returns:
+    - tuple: (transformed DataFrame of valid checks, list of (check id, error message))
+    """
+    checks = transform_check_details(df)
+    problems = pd.Series('', index=df.index, dtype=object)
+
+    for column, message in REQUIRED_CHECK_COLUMNS:
+        problems[checks[column].isna() & (problems == '')] = message
+
+    invalid = problems != ''
+    errors = [
+        (check_id if pd.notna(check_id) else 'unknown', message)
+        for check_id, message in zip(df.loc[invalid, 'Check Id'], problems[invalid])
+    ]
+    return checks[~invalid], errors
+
+def resolve_check_orders(cursor, check_ids):
+    """
+    Map Toast check ids to the orders.id of their parent order in one query.
+
+    Payments and item selections both carry the Toast check id alongside the
+    surrogate id of their order, so either one identifies the parent. Only
+    parents whose order still exists count: a partitioned orders table has
+    no foreign key to stop its rows from being detached or deleted.
+
+    Parameters:
+    - cursor: psycopg cursor
+    - check_ids: iterable of distinct Toast check ids
+
+    Returns:
+    - dict: Toast check id -> orders.id for every check with a known parent
+    """
+    check_ids = sorted(int(check_id) for check_id in check_ids)
+    if not check_ids:
+        return {}
+    cursor.execute(
+        """
+        SELECT DISTINCT ON (parents.check_id) parents.check_id, parents.order_id
+        FROM (
+            SELECT toast_check_id AS check_id, order_id FROM payments WHERE toast_check_id = ANY(%s)
+            UNION ALL
+            SELECT check_id, order_id FROM item_selections WHERE check_id = ANY(%s)
+        ) parents
+        JOIN orders o ON o.id = parents.order_id
+        ORDER BY parents.check_id
+        """,
+        (check_ids, check_ids)
+    )
+    return dict(cursor.fetchall())
+
+@timed('load')
+def load_checks_bulk(conn, checks):
+    """
+    Load checks with a known parent order using COPY and a single merge statement.
+
+    Payments loaded before their check have a NULL check_id; those are
+    linked to the newly loaded checks in the same transaction.
+
+    Parameters:
+    - conn: psycopg connection object
+    - checks: transformed checks with an order_id column of orders.id values
+
+    Returns:
+    - tuple: (inserted count, skipped count)
+    """
+    if checks.empty:
+        return 0, 0
+
+    columns = [name for name, _ in CHECK_STAGING_COLUMNS]
+    try:
+        with conn.cursor() as cursor:
+            create_staging_table(cursor, CHECK_STAGING_TABLE, CHECK_STAGING_COLUMNS)
+            staged_count = copy_rows(cursor, CHECK_STAGING_TABLE, columns, frame_to_rows(checks, columns))
+
+            column_list = ', '.join(columns)
+            cursor.execute(f"""
+                INSERT INTO checks ({column_list})
+                SELECT {column_list} FROM {CHECK_STAGING_TABLE}
+                ON CONFLICT (check_id) DO NOTHING
+            """)
+            inserted_count = cursor.rowcount
+
+            cursor.execute(f"""
+                UPDATE payments p
+                SET check_id = c.id
+                FROM checks c
+                JOIN {CHECK_STAGING_TABLE} s ON s.check_id = c.check_id
+                WHERE p.check_id IS NULL AND p.toast_check_id = c.check_id
+            """)
+        conn.commit()
+    except Exception as e:
+        logger.error("Error bulk loading checks: %s", e)
+        conn.rollback()
+        raise
+
+    return inserted_count, staged_count - inserted_count
+
+def _process_checks_row_by_row(conn, checks):
+    """
+    Insert checks one row at a time through import_check, committing after each row.
+
+    Returns:
+    - tuple: (inserted count, skipped count)
+    """
+    inserted_count = 0
+    skipped_count = 0
+    for check in checks.to_dict('records'):
+        try:
+            if import_check(conn, check, check['order_id']):
+                inserted_count += 1
+            else:
+                skipped_count += 1
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return inserted_count, skipped_count
+
+def import_check(conn, check, order_id):
+    """
+    Import a single check associated with an order.
+    Returns True if check was inserted, False if skipped.
+
+    Parameters:
+    - conn: psycopg connection object
+    - check: dict of transformed check columns, as produced by transform_check_details
+    - order_id: orders.id of the parent order
+    """
+    with conn.cursor() as cur:
+        try:
+            # Insert check
+            cur.execute("""
+                INSERT INTO checks (
+                    order_id, check_id, check_number, customer_id, customer_name,
+                    customer_phone, customer_email, customer_family, location_code,
+                    opened_date, opened_time, item_description, table_size,
+                    discount, discount_reason, tax, tender, total, receipt_link
+                ) VALUES (
+                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+                    %s, %s, %s, %s
+                )
+                ON CONFLICT DO NOTHING
+                RETURNING id
+            """, (
+                order_id,
+                check['check_id'],
+                check['check_number'],
+                check['customer_id'],
+                check['customer_name'],
+                check['customer_phone'],
+                check['customer_email'],
+                check['customer_family'],
+                check['location_code'],
+                check['opened_date'],
+                check['opened_time'],
+                check['item_description'],
+                check['table_size'],
+                check['discount'],
+                check['discount_reason'],
+                check['tax'],
+                check['tender'],
+                check['total'],
+                check['receipt_link']
+            ))
+            
+            result = cur.fetchone()
+            if result:
+                logger.debug("Inserted new check: %s", check['check_number'])
+                return True
+            else:
+                logger.debug("Check already exists (skipped): %s", check['check_number'])
+                return False
+
+        except Exception as e:
+            logger.error("Error inserting check %s: %s", check['check_id'], e)
+            raise
@@ -0,0 +1,163 @@
+import pandas as pd
+import logging
+from pathlib import Path
+from toast_exports.config import CURRENT_DATA_DIR
+from toast_exports.db.bulk import create_staging_table, copy_rows, frame_to_rows
+from toast_exports.logs import ErrorSummary
+from toast_exports.metrics import timed
+from toast_exports.readers import iter_csv_chunks
+from toast_exports.schemas import ITEM_SELECTION_DETAILS_SCHEMA
+from toast_exports.transforms.item_selections import transform_item_selections
+
+logger = logging.getLogger(__name__)
+
+ITEM_SELECTION_STAGING_TABLE = 'item_selections_staging'
+
+# Columns staged for the bulk merge, in COPY order, with their staging types.
+# order_id is staged as the Toast order id and swapped for orders.id in the merge.
+ITEM_SELECTION_STAGING_COLUMNS = [
+    ('order_id', 'BIGINT'),
+    ('check_id', 'BIGINT'),
+    ('item_selection_id', 'BIGINT'),
+    ('item_id', 'BIGINT'),
+    ('master_id', 'BIGINT'),
+    ('sent_at', 'TIMESTAMP'),
+    ('ordered_at', 'TIMESTAMP'),
+    ('sku', 'VARCHAR(50)'),
+    ('plu', 'VARCHAR(50)'),
+    ('menu_item', 'VARCHAR(255)'),
+    ('menu_subgroup', 'VARCHAR(255)'),
+    ('menu_group', 'VARCHAR(255)'),
+    ('menu', 'VARCHAR(255)'),
+    ('sales_category', 'VARCHAR(100)'),
+    ('gross_price', 'NUMERIC(10,2)'),
+    ('discount', 'NUMERIC(10,2)'),
+    ('net_price', 'NUMERIC(10,2)'),
+    ('quantity', 'NUMERIC(10,3)'),
+    ('tax', 'NUMERIC(10,2)'),
+    ('is_voided', 'BOOLEAN'),
+    ('is_deferred', 'BOOLEAN'),
+    ('is_tax_exempt', 'BOOLEAN'),
+    ('tax_inclusion', 'VARCHAR(50)'),
+    ('dining_option_tax', 'VARCHAR(50)'),
+    ('tab_name', 'VARCHAR(255)'),
+]
+
+# Columns that must be present for an item selection to be loaded, with the message reported when missing
+REQUIRED_ITEM_SELECTION_COLUMNS = [
+    ('item_selection_id', "missing or invalid Item Selection Id"),
+    ('order_id', "missing or invalid Order Id"),
+    ('check_id', "missing or invalid Check Id"),
+    ('menu_item', "missing Menu Item"),
+    ('quantity', "missing or invalid Qty"),
+]
+
+def process_item_selections(conn, data_dir=None, memory_budget_mb=None):
+    """
+    Process item selections from CSV file and insert into database.
+
+    Orders must be loaded first: each item is attached to its order through
+    a join on the Toast order id, and items whose order is not in the
+    database are reported as errors.
+
+    Parameters:
+    - conn: psycopg connection object
+    - data_dir: export directory containing ItemSelectionDetails.csv (defaults to CURRENT_DATA_DIR)
+    - memory_budget_mb: memory budget for one chunk in MB (defaults to CSV_MEMORY_BUDGET_MB)
+
+    Returns:
+    - tuple: (inserted count, skipped count, error count)
+    """
+    sample_data_path = Path(data_dir or CURRENT_DATA_DIR) / 'ItemSelectionDetails.csv'
+
+    logger.info("Reading item selections data...")
+    inserted_count = 0
+    skipped_count = 0
+    error_count = 0
+    summary = ErrorSummary('item selections')
+    for df in iter_csv_chunks(sample_data_path, memory_budget_mb, schema=ITEM_SELECTION_DETAILS_SCHEMA):
+        items, errors = validate_item_selections(df)
+        summary.extend(errors)
+        chunk_inserted, chunk_skipped, orphaned_count = load_item_selections_bulk(conn, items)
+        inserted_count += chunk_inserted
+        skipped_count += chunk_skipped
+        error_count += len(errors) + orphaned_count
+
+    summary.log(logger)
+    logger.info("Item selections processing complete. %d inserted, %d skipped, %d errors", inserted_count, skipped_count, error_count)
+    return inserted_count, skipped_count, error_count
+
+@timed('transform')
+def validate_item_selections(df):
+    """
+    Transform ItemSelectionDetails rows and split out rows that cannot be loaded.
+
+    Parameters:
+    - df: ItemSelectionDetails DataFrame
+
+    Returns:
+    - tuple: (transformed DataFrame of valid items, list of (item selection id, error message))
+    """
+    items = transform_item_selections(df)
+    problems = pd.Series('', index=df.index, dtype=object)
+
+    for column, message in REQUIRED_ITEM_SELECTION_COLUMNS:
+        problems[items[column].isna() & (problems == '')] = message
+
+    invalid = problems != ''
+    errors = [
+        (item_selection_id if pd.notna(item_selection_id) else 'unknown', message)
+        for item_selection_id, message in zip(df.loc[invalid, 'Item Selection Id'], problems[invalid])
+    ]
+    return items[~invalid], errors
+
+@timed('load')
+def load_item_selections_bulk(conn, items):
+    """
+    Load validated item selections with COPY and a single merge statement.
+
+    Staged rows are joined to orders on the Toast order id to pick up the
+    orders.id surrogate key, then merged with ON CONFLICT
+    (item_selection_id) DO NOTHING.
+
+    Parameters:
+    - conn: psycopg connection object
+    - items: transformed items returned by validate_item_selections
+
+    Returns:
+    - tuple: (inserted count, skipped count, count of items with no matching order)
+    """
+    if items.empty:
+        return 0, 0, 0
+
+    columns = [name for name, _ in ITEM_SELECTION_STAGING_COLUMNS]
+    try:
+        with conn.cursor() as cursor:
+            create_staging_table(cursor, ITEM_SELECTION_STAGING_TABLE, ITEM_SELECTION_STAGING_COLUMNS)
+            staged_count = copy_rows(cursor, ITEM_SELECTION_STAGING_TABLE, columns, frame_to_rows(items, columns))
+
+            cursor.execute(f"""
+                SELECT count(*) FROM {ITEM_SELECTION_STAGING_TABLE} s
+                WHERE NOT EXISTS (SELECT 1 FROM orders o WHERE o.order_id = s.order_id)
+            """)
+            orphaned_count = cursor.fetchone()[0]
+            if orphaned_count:
+                logger.warning("%d item selections reference orders that are not loaded", orphaned_count)
+
+            column_list = ', '.join(columns)
+            select_list = ', '.join('o.id' if name == 'order_id' else f's.{name}' for name in columns)
+            cursor.execute(f"""
+                INSERT INTO item_selections ({column_list})
+                SELECT {select_list}
+                FROM {ITEM_SELECTION_STAGING_TABLE} s
+                JOIN orders o ON o.order_id = s.order_id
+                ON CONFLICT (item_selection_id) DO NOTHING
+            """)
+            inserted_count = cursor.rowcount
+        conn.commit()
+    except Exception as e:
+        logger.error("Error bulk loading item selections: %s", e)
+        conn.rollback()
+        raise
+
+    return inserted_count, staged_count - orphaned_count - inserted_count, orphaned_count
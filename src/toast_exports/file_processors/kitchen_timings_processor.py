@@ -0,0 +1,164 @@
+import pandas as pd
+import logging
+from pathlib import Path
+from toast_exports.config import CURRENT_DATA_DIR
+from toast_exports.db.bulk import create_staging_table, copy_rows, frame_to_rows
+from toast_exports.db.dimensions import resolve_locations, resolve_employee_aliases
+from toast_exports.logs import ErrorSummary
+from toast_exports.metrics import timed
+from toast_exports.readers import iter_csv_chunks
+from toast_exports.schemas import KITCHEN_TIMINGS_SCHEMA
+from toast_exports.transforms.kitchen_timings import transform_kitchen_timings
+
+logger = logging.getLogger(__name__)
+
+KITCHEN_TIMING_STAGING_TABLE = 'kitchen_timings_staging'
+
+# Columns staged for the bulk merge, in COPY order, with their staging types
+KITCHEN_TIMING_STAGING_COLUMNS = [
+    ('location_id', 'INT'),
+    ('server_id', 'INT'),
+    ('fulfilled_by_id', 'INT'),
+    ('ticket_id', 'BIGINT'),
+    ('check_number', 'VARCHAR(50)'),
+    ('table_number', 'VARCHAR(50)'),
+    ('check_opened_at', 'TIMESTAMP'),
+    ('station', 'VARCHAR(100)'),
+    ('expediter_level', 'SMALLINT'),
+    ('fired_at', 'TIMESTAMP'),
+    ('fulfilled_at', 'TIMESTAMP'),
+    ('fulfillment_seconds', 'INT'),
+]
+
+# Columns that must be present for a ticket to be loaded, with the message reported when missing
+REQUIRED_KITCHEN_TIMING_COLUMNS = [
+    ('ticket_id', "missing or invalid ID"),
+    ('location', "missing Location"),
+    ('fired_at', "missing or invalid Fired Date"),
+]
+
+# Optional source columns whose values must still parse when present
+OPTIONAL_KITCHEN_TIMING_COLUMNS = [
+    ('Fulfilled Date', 'fulfilled_at', "invalid Fulfilled Date"),
+    ('Fulfillment Time', 'fulfillment_seconds', "invalid Fulfillment Time"),
+]
+
+def process_kitchen_timings(conn, data_dir=None, cache=None, memory_budget_mb=None):
+    """
+    Process kitchen ticket timings from CSV file and insert into database.
+
+    Parameters:
+    - conn: psycopg connection object
+    - data_dir: export directory containing KitchenTimings.csv (defaults to CURRENT_DATA_DIR)
+    - cache: optional DimensionCache for location and employee ids
+    - memory_budget_mb: memory budget for one chunk in MB (defaults to CSV_MEMORY_BUDGET_MB)
+
+    Returns:
+    - tuple: (inserted count, skipped count, error count)
+    """
+    sample_data_path = Path(data_dir or CURRENT_DATA_DIR) / 'KitchenTimings.csv'
+
+    logger.info("Reading kitchen timings data...")
+    inserted_count = 0
+    skipped_count = 0
+    error_count = 0
+    summary = ErrorSummary('kitchen tickets')
+    for df in iter_csv_chunks(sample_data_path, memory_budget_mb, schema=KITCHEN_TIMINGS_SCHEMA):
+        timings, errors = validate_kitchen_timings(df)
+        summary.extend(errors)
+        chunk_inserted, chunk_skipped = load_kitchen_timings_bulk(conn, timings, cache)
+        inserted_count += chunk_inserted
+        skipped_count += chunk_skipped
+        error_count += len(errors)
+
+    summary.log(logger)
+    logger.info("Kitchen timings processing complete. %d inserted, %d skipped, %d errors", inserted_count, skipped_count, error_count)
+    return inserted_count, skipped_count, error_count
+
+@timed('transform')
+def validate_kitchen_timings(df):
+    """
+    Transform KitchenTimings rows and split out rows that cannot be loaded.
+
+    Parameters:
+    - df: KitchenTimings DataFrame
+
+    Returns:
+    - tuple: (transformed DataFrame of valid tickets, list of (ticket id, error message))
+    """
+    timings = transform_kitchen_timings(df)
+    problems = pd.Series('', index=df.index, dtype=object)
+
+    def flag(mask, message):
+        problems[mask & (problems == '')] = message
+
+    for column, message in REQUIRED_KITCHEN_TIMING_COLUMNS:
+        flag(timings[column].isna(), message)
+    for source_column, column, message in OPTIONAL_KITCHEN_TIMING_COLUMNS:
+        flag(df[source_column].notna() & timings[column].isna(), message)
+
+    invalid = problems != ''
+    errors = [
+        (ticket_id if pd.notna(ticket_id) else 'unknown', message)
+        for ticket_id, message in zip(df.loc[invalid, 'ID'], problems[invalid])
+    ]
+    return timings[~invalid], errors
+
+@timed('load')
+def load_kitchen_timings_bulk(conn, timings, cache=None):
+    """
+    Load validated kitchen tickets with COPY and a single merge statement.
+
+    Locations and employees ('Server' and 'Fulfilled By') are resolved and
+    committed first with the same set-based resolvers the order loader uses,
+    then the tickets are merged with ON CONFLICT (ticket_id) DO NOTHING.
+
+    Parameters:
+    - conn: psycopg connection object
+    - timings: transformed tickets returned by validate_kitchen_timings
+    - cache: optional DimensionCache for location and employee ids
+
+    Returns:
+    - tuple: (inserted count, skipped count)
+    """
+    if timings.empty:
+        return 0, 0
+
+    columns = [name for name, _ in KITCHEN_TIMING_STAGING_COLUMNS]
+    try:
+        with conn.cursor() as cursor:
+            locations = timings['location'].dropna().unique()
+            employee_names = pd.concat([timings['server'], timings['fulfilled_by']]).dropna().unique()
+            if cache is None:
+                location_ids = resolve_locations(cursor, locations)
+                employee_ids = resolve_employee_aliases(cursor, employee_names)
+            else:
+                location_ids = cache.resolve('locations', locations, lambda missing: resolve_locations(cursor, missing))
+                employee_ids = cache.resolve('employee_aliases', employee_names, lambda missing: resolve_employee_aliases(cursor, missing))
+            conn.commit()
+
+            staged = timings.assign(
+                location_id=timings['location'].map(location_ids).astype('Int64'),
+                server_id=timings['server'].map(employee_ids).astype('Int64'),
+                fulfilled_by_id=timings['fulfilled_by'].map(employee_ids).astype('Int64'),
+            )
+
+            create_staging_table(cursor, KITCHEN_TIMING_STAGING_TABLE, KITCHEN_TIMING_STAGING_COLUMNS)
+            staged_count = copy_rows(cursor, KITCHEN_TIMING_STAGING_TABLE, columns, frame_to_rows(staged, columns))
+
+            column_list = ', '.join(columns)
+            cursor.execute(f"""
+                INSERT INTO kitchen_timings ({column_list})
+                SELECT {column_list} FROM {KITCHEN_TIMING_STAGING_TABLE}
+                ON CONFLICT (ticket_id) DO NOTHING
+            """)
+            inserted_count = cursor.rowcount
+        conn.commit()
+    except Exception as e:
+        logger.error("Error bulk loading kitchen timings: %s", e)
+        conn.rollback()
+        if cache is not None:
+            cache.invalidate()
+        raise
+
+    return inserted_count, staged_count - inserted_count
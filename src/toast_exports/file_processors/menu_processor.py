@@ -1,83 +1,361 @@
+import uuid
 import psycopg
-import json
 import logging
 from pathlib import Path
+from toast_exports.config import CURRENT_DATA_DIR
+from toast_exports.db.bulk import create_staging_table, copy_rows
+from toast_exports.db.rejects import record_rejects
+from toast_exports.metrics import timed
+from toast_exports.transforms.menus import MENU_ENTITIES, iter_menus, iter_menu_entity_rows
 
 logger = logging.getLogger(__name__)
 
-def insert_menus_into_db(conn):
+# Staging types for the menu entity columns in MENU_ENTITIES
+MENU_COLUMN_TYPES = {
+    'guid': 'UUID',
+    'menu_guid': 'UUID',
+    'parent_guid': 'UUID',
+    'group_guid': 'UUID',
+    'item_guid': 'UUID',
+    'modifier_group_guid': 'UUID',
+    'name': 'VARCHAR(255)',
+    'description': 'TEXT',
+    'id_string': 'VARCHAR(50)',
+    'price': 'NUMERIC(10,2)',
+    'sku': 'VARCHAR(50)',
+    'plu': 'VARCHAR(50)',
+    'min_selections': 'INT',
+    'max_selections': 'INT',
+}
+
+# Link entity -> (column, table) pairs a staged link must reference before
+# it is merged. MENU_ENTITIES lists every parent before its links.
+MENU_LINK_PARENTS = {
+    'menu_group_items': [('group_guid', 'menu_groups'), ('item_guid', 'menu_items')],
+    'item_modifier_groups': [('item_guid', 'menu_items'), ('modifier_group_guid', 'modifier_groups')],
+    'modifier_group_options': [('modifier_group_guid', 'modifier_groups'), ('item_guid', 'menu_items')],
+}
+
+# Menu JSON field -> value used when the field is missing, matching the menus table defaults
+MENU_FIELD_DEFAULTS = {
+    'guid': None,
+    'name': None,
+    'description': '',
+    'idString': None,
+    'orderableOnline': True,
+    'orderableOnlineStatus': 'YES',
+    'visibility': 'ALL',
+    'startTime': None,
+    'endTime': None,
+    'startTimeHHmm': None,
+    'endTimeHHmm': None,
+    'startTimeLocalStandardTime': None,
+    'endTimeLocalStandardTime': None,
+    'startTimeHHmmLocalStandardTime': None,
+    'endTimeHHmmLocalStandardTime': None,
+    'availableAllTimes': True,
+    'availableAllDays': True,
+    'daysAvailableBits': 127,
+    'daysAvailableString': None,
+}
+
+# Text fields checked before the batch insert: (field, maximum length, required)
+MENU_TEXT_FIELDS = [
+    ('name', 100, True),
+    ('idString', 50, True),
+    ('orderableOnlineStatus', 10, False),
+    ('visibility', 10, False),
+]
+
+INSERT_MENUS_SQL = """
+    INSERT INTO menus (
+        guid,
+        name,
+        description,
+        id_string,
+        orderable_online,
+        orderable_online_status,
+        visibility,
+        start_time,
+        end_time,
+        start_time_hhmm,
+        end_time_hhmm,
+        start_time_local_standard_time,
+        end_time_local_standard_time,
+        start_time_hhmm_local_standard_time,
+        end_time_hhmm_local_standard_time,
+        available_all_times,
+        available_all_days,
+        days_available_bits,
+        days_available_string
+    ) VALUES (
+        %(guid)s,
+        %(name)s,
+        %(description)s,
+        %(idString)s,
+        %(orderableOnline)s,
+        %(orderableOnlineStatus)s,
+        %(visibility)s,
+        %(startTime)s,
+        %(endTime)s,
+        %(startTimeHHmm)s,
+        %(endTimeHHmm)s,
+        %(startTimeLocalStandardTime)s,
+        %(endTimeLocalStandardTime)s,
+        %(startTimeHHmmLocalStandardTime)s,
+        %(endTimeHHmmLocalStandardTime)s,
+        %(availableAllTimes)s,
+        %(availableAllDays)s,
+        %(daysAvailableBits)s,
+        %(daysAvailableString)s
+    )
+    ON CONFLICT DO NOTHING
+"""
+
+def insert_menus_into_db(conn, data_dir=None):
     """
-    Inserts menu data into the 'menus' table in the database.
+    Inserts menu data into the 'menus' table in the database, then loads the
+    groups, items and modifier groups below each menu.
+
+    The file is streamed one menu at a time rather than loaded whole. Menus
+    are inserted with a single executemany in pipeline mode, records that
+    fail validation or the insert go to etl_rejects, and the whole file is
+    committed once.
 
     Parameters:
     - connection: A psycopg3 database connection object (used with a `with` statement).
+    - data_dir: export directory containing the MenuExport_*.json file (defaults to CURRENT_DATA_DIR)
+
+    Returns:
+    - tuple: (inserted count, skipped count, error count)
     """
-    insert_menus_sql = """
-        INSERT INTO menus (
-            guid,
-            name,
-            description,
-            id_string,
-            orderable_online,
-            orderable_online_status,
-            visibility,
-            start_time,
-            end_time,
-            start_time_hhmm,
-            end_time_hhmm,
-            start_time_local_standard_time,
-            end_time_local_standard_time,
-            start_time_hhmm_local_standard_time,
-            end_time_hhmm_local_standard_time,
-            available_all_times,
-            available_all_days,
-            days_available_bits,
-            days_available_string
-        ) VALUES (
-            %(guid)s,
-            %(name)s,
-            %(description)s,
-            %(idString)s,
-            %(orderableOnline)s,
-            %(orderableOnlineStatus)s,
-            %(visibility)s,
-            %(startTime)s,
-            %(endTime)s,
-            %(startTimeHHmm)s,
-            %(endTimeHHmm)s,
-            %(startTimeLocalStandardTime)s,
-            %(endTimeLocalStandardTime)s,
-            %(startTimeHHmmLocalStandardTime)s,
-            %(endTimeHHmmLocalStandardTime)s,
-            %(availableAllTimes)s,
-            %(availableAllDays)s,
-            %(daysAvailableBits)s,
-            %(daysAvailableString)s
-        )
-        ON CONFLICT DO NOTHING;
-    """
-    
-    sample_data_path = Path('sample_data/20240410/MenuExport_adddeea2-4ff3-46e6-840b-5b8fa9fad1db.json')
-    with open(sample_data_path, 'r') as file:
-        data = json.load(file)
+    menu_files = sorted(Path(data_dir or CURRENT_DATA_DIR).glob('MenuExport_*.json'))
+    if not menu_files:
+        logger.warning("No MenuExport_*.json file found in %s, skipping menus", data_dir or CURRENT_DATA_DIR)
+        return 0, 0, 0
+    sample_data_path = menu_files[0]
     
-    logger.info(f"Processing {len(data)} menu items")
+    logger.info("Processing menus from %s", sample_data_path)
+    menus = []
+    rejects = []
+    for menu in iter_menus(sample_data_path):
+        params, error = validate_menu(menu)
+        if error:
+            rejects.append((params.get('guid'), params, error))
+        else:
+            menus.append(params)
+
+    try:
+        with conn.cursor() as cursor:
+            inserted_count, failed = insert_menus_batch(conn, cursor, menus)
+            rejects.extend(failed)
+            record_rejects(cursor, sample_data_path.name, rejects)
+            hierarchy_counts = _load_menu_hierarchy(cursor, sample_data_path)
+        conn.commit()
+    except Exception as e:
+        logger.error("Error loading menus from %s: %s", sample_data_path, e)
+        conn.rollback()
+        raise
+
+    skipped_count = len(menus) - len(failed) - inserted_count
+    error_count = len(rejects)
+    logger.info("Menu processing complete. %d menus inserted, %d already existed, %d rejected", inserted_count, skipped_count, error_count)
+
+    hierarchy_inserted, hierarchy_skipped, hierarchy_errors = hierarchy_counts
+    return inserted_count + hierarchy_inserted, skipped_count + hierarchy_skipped, error_count + hierarchy_errors
+
+def validate_menu(menu):
+    """
+    Build the insert parameters for one menu and check them against the menus table.
+
+    Parameters:
+    - menu: menu dict from the export
+
+    Returns:
+    - tuple: (parameter dict with defaults filled in, error message or None)
+    """
+    params = {field: menu.get(field, default) for field, default in MENU_FIELD_DEFAULTS.items()}
+    try:
+        uuid.UUID(str(params['guid']))
+    except ValueError:
+        return params, "missing or invalid guid"
+    for field, max_length, required in MENU_TEXT_FIELDS:
+        value = params[field]
+        if value is None:
+            if required:
+                return params, f"missing {field}"
+        elif not isinstance(value, str) or len(value) > max_length:
+            return params, f"{field} must be text of at most {max_length} characters"
+    return params, None
+
+@timed('load')
+def insert_menus_batch(conn, cursor, menus):
+    """
+    Insert menus with one executemany in pipeline mode, inside the caller's transaction.
+
+    The batch runs under a savepoint. If any menu fails, the batch is rolled
+    back to the savepoint and the menus are retried one at a time, each
+    under its own savepoint, so only the failing menus are rejected.
+
+    Parameters:
+    - conn: psycopg connection object
+    - cursor: psycopg cursor on conn
+    - menus: list of parameter dicts returned by validate_menu
+
+    Returns:
+    - tuple: (inserted count, list of (guid, menu, error message) rejects)
+    """
+    if not menus:
+        return 0, []
+    cursor.execute("SAVEPOINT menus_batch")
+    try:
+        with conn.pipeline():
+            cursor.executemany(INSERT_MENUS_SQL, menus)
+        inserted_count = cursor.rowcount
+        cursor.execute("RELEASE SAVEPOINT menus_batch")
+        return inserted_count, []
+    except psycopg.Error as e:
+        logger.warning("Batch insert of %d menus failed (%s), retrying one at a time", len(menus), e)
+        cursor.execute("ROLLBACK TO SAVEPOINT menus_batch")
+
+    inserted_count = 0
+    rejects = []
+    for menu in menus:
+        cursor.execute("SAVEPOINT menu_row")
+        try:
+            cursor.execute(INSERT_MENUS_SQL, menu)
+            inserted_count += cursor.rowcount
+            cursor.execute("RELEASE SAVEPOINT menu_row")
+        except psycopg.Error as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT menu_row")
+            rejects.append((menu['guid'], menu, str(e)))
+    return inserted_count, rejects
+
+def load_menu_hierarchy(conn, path):
+    """
+    Load the menu groups, items, modifier groups and their links below each menu.
+
+    Everything is committed together once all entity types are loaded.
+
+    Parameters:
+    - conn: psycopg connection object
+    - path: MenuExport JSON file path
+
+    Returns:
+    - tuple: (inserted or changed count, unchanged count, error count)
+    """
+    try:
+        with conn.cursor() as cursor:
+            counts = _load_menu_hierarchy(cursor, path)
+        conn.commit()
+    except Exception as e:
+        logger.error("Error loading menu hierarchy from %s: %s", path, e)
+        conn.rollback()
+        raise
+    return counts
+
+@timed('load')
+def _load_menu_hierarchy(cursor, path):
+    """
+    Load the menu hierarchy in the caller's transaction.
+
+    Each entity type is streamed from the file in its own pass, deduplicated
+    by GUID, COPY'd into a staging table and merged in one statement, so a
+    file costs one COPY per entity type however many menus share an entity.
+    Only one menu and the set of GUIDs already seen are held in memory.
+
+    Before each merge, staged rows whose parent is not in the database are
+    removed: groups whose menu (or parent group) is not loaded, and links
+    whose group, item or modifier group is not. A rejected menu therefore
+    drops its own subtree instead of failing the file on a foreign key. The
+    removed rows go to etl_rejects and are counted as errors.
+    """
     inserted_count = 0
     skipped_count = 0
-    
-    with conn.cursor() as cursor:
-        for menu in data:
-            try:
-                cursor.execute(insert_menus_sql, menu)
-                if cursor.rowcount > 0:
-                    inserted_count += 1
-                    logger.info(f"Info: Inserted new menu item: {menu['name']}")
-                else:
-                    skipped_count += 1
-                    logger.info(f"Info: Menu item already exists (skipped): {menu['name']}")
-                conn.commit()
-            except Exception as e:
-                logger.error(f"Error processing menu item {menu.get('name', 'unknown')}: {str(e)}")
-                conn.rollback()
-    
-    logger.info(f"Menu processing complete. {inserted_count} items inserted, {skipped_count} items already existed")
\ No newline at end of file
+    error_count = 0
+    for entity, (columns, key_length) in MENU_ENTITIES.items():
+        staging_table = f"{entity}_staging"
+        create_staging_table(cursor, staging_table, [(name, MENU_COLUMN_TYPES[name]) for name in columns])
+        staged_count = copy_rows(cursor, staging_table, columns, iter_menu_entity_rows(path, entity))
+
+        orphaned_count = 0
+        orphan_sql = _menu_orphan_delete_sql(entity, staging_table, columns)
+        if orphan_sql:
+            cursor.execute(orphan_sql)
+            orphans = cursor.fetchall()
+            orphaned_count = len(orphans)
+            if orphaned_count:
+                logger.warning("%d %s rows refer to menu entities that are not loaded", orphaned_count, entity)
+                record_rejects(cursor, path.name, [
+                    (row[0], {'entity': entity, **dict(zip(columns, row))}, f"{entity} parent not loaded")
+                    for row in orphans
+                ])
+
+        cursor.execute(_menu_entity_merge_sql(entity, staging_table, columns, key_length))
+        logger.info("Loaded %s: %s inserted or changed, %s distinct in file", entity, cursor.rowcount, staged_count)
+        inserted_count += cursor.rowcount
+        skipped_count += staged_count - orphaned_count - cursor.rowcount
+        error_count += orphaned_count
+    return inserted_count, skipped_count, error_count
+
+def _menu_orphan_delete_sql(entity, staging_table, columns):
+    """
+    Build the statement that removes staged rows whose parents are not loaded.
+
+    A group is kept when its menu is loaded and its parent group is either
+    already in menu_groups or is itself a kept staged group. A link is kept
+    when both of its ends are loaded.
+
+    Returns:
+    - str or None: DELETE ... RETURNING the removed rows, or None for entities without parents
+    """
+    column_list = ', '.join(f"s.{name}" for name in columns)
+    if entity == 'menu_groups':
+        return f"""
+            WITH RECURSIVE loadable (guid) AS (
+                SELECT s.guid FROM {staging_table} s
+                WHERE EXISTS (SELECT 1 FROM menus m WHERE m.guid = s.menu_guid)
+                AND (s.parent_guid IS NULL OR EXISTS (SELECT 1 FROM menu_groups g WHERE g.guid = s.parent_guid))
+                UNION
+                SELECT s.guid FROM {staging_table} s
+                JOIN loadable l ON l.guid = s.parent_guid
+                WHERE EXISTS (SELECT 1 FROM menus m WHERE m.guid = s.menu_guid)
+            )
+            DELETE FROM {staging_table} s
+            WHERE NOT EXISTS (SELECT 1 FROM loadable l WHERE l.guid = s.guid)
+            RETURNING {column_list}
+        """
+    parents = MENU_LINK_PARENTS.get(entity)
+    if not parents:
+        return None
+    loaded = ' AND '.join(
+        f"EXISTS (SELECT 1 FROM {table} p WHERE p.guid = s.{column})" for column, table in parents
+    )
+    return f"""
+        DELETE FROM {staging_table} s
+        WHERE NOT ({loaded})
+        RETURNING {column_list}
+    """
+
+def _menu_entity_merge_sql(entity, staging_table, columns, key_length):
+    """
+    Build the merge statement for one menu entity type.
+
+    Entities keyed by GUID are upserted, updating only rows whose values
+    changed. Link tables are keyed by every column and only inserted.
+    """
+    column_list = ', '.join(columns)
+    source = f"SELECT {column_list} FROM {staging_table} s"
+    if key_length == len(columns):
+        return f"INSERT INTO {entity} ({column_list}) {source} ON CONFLICT DO NOTHING"
+
+    key_list = ', '.join(columns[:key_length])
+    values = columns[key_length:]
+    updates = ', '.join(f"{name} = EXCLUDED.{name}" for name in values)
+    current = ', '.join(f"{entity}.{name}" for name in values)
+    incoming = ', '.join(f"EXCLUDED.{name}" for name in values)
+    return f"""
+        INSERT INTO {entity} ({column_list}) {source}
+        ON CONFLICT ({key_list}) DO UPDATE SET {updates}
+        WHERE ({current}) IS DISTINCT FROM ({incoming})
+    """
\ No newline at end of file
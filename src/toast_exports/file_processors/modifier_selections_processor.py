@@ -0,0 +1,176 @@
+import pandas as pd
+import logging
+from pathlib import Path
+from toast_exports.config import CURRENT_DATA_DIR
+from toast_exports.db.bulk import create_staging_table, copy_rows, frame_to_rows
+from toast_exports.logs import ErrorSummary
+from toast_exports.metrics import timed
+from toast_exports.readers import iter_csv_chunks
+from toast_exports.schemas import MODIFIER_SELECTION_DETAILS_SCHEMA
+from toast_exports.transforms.modifier_selections import transform_modifier_selections
+
+logger = logging.getLogger(__name__)
+
+MODIFIER_SELECTION_STAGING_TABLE = 'modifier_selections_staging'
+
+# Columns staged for the bulk merge, in COPY order, with their staging types
+MODIFIER_SELECTION_STAGING_COLUMNS = [
+    ('modifier_selection_id', 'BIGINT'),
+    ('check_id', 'BIGINT'),
+    ('parent_item_id', 'BIGINT'),
+    ('modifier_id', 'BIGINT'),
+    ('master_id', 'BIGINT'),
+    ('option_group_id', 'BIGINT'),
+    ('option_group_name', 'VARCHAR(255)'),
+    ('sent_at', 'TIMESTAMP'),
+    ('ordered_at', 'TIMESTAMP'),
+    ('sku', 'VARCHAR(50)'),
+    ('plu', 'VARCHAR(50)'),
+    ('modifier', 'VARCHAR(255)'),
+    ('sales_category', 'VARCHAR(100)'),
+    ('gross_price', 'NUMERIC(10,2)'),
+    ('discount', 'NUMERIC(10,2)'),
+    ('net_price', 'NUMERIC(10,2)'),
+    ('quantity', 'NUMERIC(10,3)'),
+    ('is_voided', 'BOOLEAN'),
+    ('void_reason_id', 'BIGINT'),
+    ('void_reason', 'VARCHAR(255)'),
+]
+
+# Staged columns copied to modifier_selections as they are; check_id and
+# parent_item_id are only used to find the parent item selection
+MODIFIER_SELECTION_COLUMNS = [
+    name for name, _ in MODIFIER_SELECTION_STAGING_COLUMNS
+    if name not in ('check_id', 'parent_item_id')
+]
+
+# Columns that must be present for a modifier to be loaded, with the message reported when missing
+REQUIRED_MODIFIER_SELECTION_COLUMNS = [
+    ('modifier_selection_id', "missing or invalid Item Selection Id"),
+    ('check_id', "missing or invalid Check Id"),
+    ('parent_item_id', "missing or invalid Parent Menu Selection Item ID"),
+    ('modifier', "missing Modifier"),
+    ('quantity', "missing or invalid Qty"),
+]
+
+def process_modifier_selections(conn, data_dir=None, memory_budget_mb=None):
+    """
+    Process modifier selections from CSV file and insert into database.
+
+    Item selections must be loaded first; modifiers whose parent item
+    selection cannot be found are reported as errors.
+
+    Parameters:
+    - conn: psycopg connection object
+    - data_dir: export directory containing ModifiersSelectionDetails.csv (defaults to CURRENT_DATA_DIR)
+    - memory_budget_mb: memory budget for one chunk in MB (defaults to CSV_MEMORY_BUDGET_MB)
+
+    Returns:
+    - tuple: (inserted count, skipped count, error count)
+    """
+    sample_data_path = Path(data_dir or CURRENT_DATA_DIR) / 'ModifiersSelectionDetails.csv'
+
+    logger.info("Reading modifier selections data...")
+    inserted_count = 0
+    skipped_count = 0
+    error_count = 0
+    summary = ErrorSummary('modifier selections')
+    for df in iter_csv_chunks(sample_data_path, memory_budget_mb, schema=MODIFIER_SELECTION_DETAILS_SCHEMA):
+        modifiers, errors = validate_modifier_selections(df)
+        summary.extend(errors)
+        chunk_inserted, chunk_skipped, orphaned_count = load_modifier_selections_bulk(conn, modifiers)
+        inserted_count += chunk_inserted
+        skipped_count += chunk_skipped
+        error_count += len(errors) + orphaned_count
+
+    summary.log(logger)
+    logger.info("Modifier selections processing complete. %d inserted, %d skipped, %d errors", inserted_count, skipped_count, error_count)
+    return inserted_count, skipped_count, error_count
+
+@timed('transform')
+def validate_modifier_selections(df):
+    """
+    Transform ModifiersSelectionDetails rows and split out rows that cannot be loaded.
+
+    Parameters:
+    - df: ModifiersSelectionDetails DataFrame
+
+    Returns:
+    - tuple: (transformed DataFrame of valid modifiers, list of (item selection id, error message))
+    """
+    modifiers = transform_modifier_selections(df)
+    problems = pd.Series('', index=df.index, dtype=object)
+
+    for column, message in REQUIRED_MODIFIER_SELECTION_COLUMNS:
+        problems[modifiers[column].isna() & (problems == '')] = message
+
+    invalid = problems != ''
+    errors = [
+        (selection_id if pd.notna(selection_id) else 'unknown', message)
+        for selection_id, message in zip(df.loc[invalid, 'Item Selection Id'], problems[invalid])
+    ]
+    return modifiers[~invalid], errors
+
+@timed('load')
+def load_modifier_selections_bulk(conn, modifiers):
+    """
+    Load validated modifier selections with COPY and a single merge statement.
+
+    'Parent Menu Selection Item ID' is the menu item id of the parent, not its
+    selection id, so a check can hold several candidate parents (two burgers
+    with different toppings). Toast allocates a modifier's selection id just
+    before its parent's, so the merge picks the item selection on the same
+    check with that menu item id and the nearest selection id after the
+    modifier's, falling back to the nearest one before it.
+
+    Parameters:
+    - conn: psycopg connection object
+    - modifiers: transformed modifiers returned by validate_modifier_selections
+
+    Returns:
+    - tuple: (inserted count, skipped count, count of modifiers with no parent item selection)
+    """
+    if modifiers.empty:
+        return 0, 0, 0
+
+    staging_columns = [name for name, _ in MODIFIER_SELECTION_STAGING_COLUMNS]
+    try:
+        with conn.cursor() as cursor:
+            create_staging_table(cursor, MODIFIER_SELECTION_STAGING_TABLE, MODIFIER_SELECTION_STAGING_COLUMNS)
+            staged_count = copy_rows(
+                cursor, MODIFIER_SELECTION_STAGING_TABLE, staging_columns, frame_to_rows(modifiers, staging_columns)
+            )
+
+            column_list = ', '.join(MODIFIER_SELECTION_COLUMNS)
+            select_list = ', '.join(f's.{name}' for name in MODIFIER_SELECTION_COLUMNS)
+            cursor.execute(f"""
+                WITH matched AS (
+                    SELECT parent.id AS item_selection_id, {select_list}
+                    FROM {MODIFIER_SELECTION_STAGING_TABLE} s
+                    JOIN LATERAL (
+                        SELECT i.id
+                        FROM item_selections i
+                        WHERE i.check_id = s.check_id AND i.item_id = s.parent_item_id
+                        ORDER BY i.item_selection_id < s.modifier_selection_id,
+                                 abs(i.item_selection_id - s.modifier_selection_id)
+                        LIMIT 1
+                    ) parent ON TRUE
+                ), inserted AS (
+                    INSERT INTO modifier_selections (item_selection_id, {column_list})
+                    SELECT item_selection_id, {column_list} FROM matched
+                    ON CONFLICT (modifier_selection_id) DO NOTHING
+                    RETURNING 1
+                )
+                SELECT (SELECT count(*) FROM matched), (SELECT count(*) FROM inserted)
+            """)
+            matched_count, inserted_count = cursor.fetchone()
+        conn.commit()
+    except Exception as e:
+        logger.error("Error bulk loading modifier selections: %s", e)
+        conn.rollback()
+        raise
+
+    orphaned_count = staged_count - matched_count
+    if orphaned_count:
+        logger.warning("%d modifier selections have no matching item selection", orphaned_count)
+    return inserted_count, matched_count - inserted_count, orphaned_count
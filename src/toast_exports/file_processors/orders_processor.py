@@ -2,37 +2,237 @@ import pandas as pd
 import logging
 from pathlib import Path
 import psycopg
-from toast_exports.utils.name_formatter import format_name
+from toast_exports.config import CURRENT_DATA_DIR, DB_PARTITIONED
+from toast_exports.db.bulk import create_staging_table, copy_rows, frame_to_rows
+from toast_exports.db.dimensions import resolve_locations, resolve_employee_aliases
+from toast_exports.db.partitions import ORDER_KEY, ensure_partitions
+from toast_exports.logs import ErrorSummary
+from toast_exports.metrics import timed
+from toast_exports.readers import iter_csv_chunks
+from toast_exports.schemas import ORDER_DETAILS_SCHEMA
+from toast_exports.transforms.orders import transform_order_details
+from toast_exports.transforms.parsing import normalize_nulls
+from toast_exports.utils.name_formatter import cached_format_name
 
 logger = logging.getLogger(__name__)
 
-def process_orders(conn):
+ORDER_STAGING_TABLE = 'orders_staging'
+
+# Columns staged for the bulk merge, in COPY order, with their staging types
+ORDER_STAGING_COLUMNS = [
+    ('location_id', 'INT'),
+    ('order_id', 'BIGINT'),
+    ('order_number', 'VARCHAR(50)'),
+    ('opened_at', 'TIMESTAMP'),
+    ('closed_at', 'TIMESTAMP'),
+    ('paid_at', 'TIMESTAMP'),
+    ('guest_count', 'INT'),
+    ('tab_names', 'TEXT'),
+    ('server_id', 'INT'),
+    ('table_number', 'VARCHAR(50)'),
+    ('revenue_center', 'VARCHAR(100)'),
+    ('dining_area', 'VARCHAR(100)'),
+    ('service_period', 'VARCHAR(50)'),
+    ('dining_option', 'VARCHAR(100)'),
+    ('discount_amount', 'NUMERIC(10,2)'),
+    ('subtotal', 'NUMERIC(10,2)'),
+    ('tax', 'NUMERIC(10,2)'),
+    ('tip', 'NUMERIC(10,2)'),
+    ('gratuity', 'NUMERIC(10,2)'),
+    ('total', 'NUMERIC(10,2)'),
+    ('is_voided', 'BOOLEAN'),
+    ('duration_minutes', 'INT'),
+    ('order_source', 'VARCHAR(50)'),
+]
+
+# Columns that must be present for an order to be loaded, with the message reported when missing
+REQUIRED_ORDER_COLUMNS = [
+    ('location', "missing Location"),
+    ('order_id', "missing or invalid Order Id"),
+    ('order_number', "missing Order #"),
+    ('opened_at', "missing or invalid Opened date"),
+    ('server_name', "no server specified"),
+    ('guest_count', "missing or invalid # of Guests"),
+    ('subtotal', "missing or invalid Amount"),
+    ('tax', "missing or invalid Tax"),
+    ('total', "missing or invalid Total"),
+]
+
+# Optional source columns whose values must still parse when present
+OPTIONAL_ORDER_COLUMNS = [
+    ('Closed', 'closed_at', "invalid Closed date"),
+    ('Paid', 'paid_at', "invalid Paid date"),
+    ('Duration (Opened to Paid)', 'duration_minutes', "invalid Duration (Opened to Paid)"),
+]
+
+def process_orders(conn, data_dir=None, bulk=True, cache=None, memory_budget_mb=None):
     """
     Process orders from CSV file and insert into database.
+
+    The file is streamed in chunks that fit the memory budget; each chunk is
+    transformed and loaded before the next one is read.
     
     Parameters:
     - conn: psycopg connection object
+    - data_dir: export directory containing OrderDetails.csv (defaults to CURRENT_DATA_DIR)
+    - bulk: load through a COPY staging table (default) instead of one INSERT per row
+    - cache: optional DimensionCache for location and server ids
+    - memory_budget_mb: memory budget for one chunk in MB (defaults to CSV_MEMORY_BUDGET_MB)
+
+    Returns:
+    - tuple: (inserted count, skipped count, error count)
     """
-    sample_data_path = Path('sample_data/20240410/OrderDetails.csv')
+    sample_data_path = Path(data_dir or CURRENT_DATA_DIR) / 'OrderDetails.csv'
     
     logger.info("Reading orders data...")
-    df = pd.read_csv(sample_data_path)
-    
-    # First, ensure we have the location in the locations table
+    inserted_count = 0
+    skipped_count = 0
+    error_count = 0
+    summary = ErrorSummary('orders')
+    for df in iter_csv_chunks(sample_data_path, memory_budget_mb, schema=ORDER_DETAILS_SCHEMA):
+        if bulk:
+            orders, errors = validate_orders(df)
+            summary.extend(errors)
+            chunk_inserted, chunk_skipped = load_orders_bulk(conn, orders, cache)
+            chunk_errors = len(errors)
+        else:
+            chunk_inserted, chunk_skipped, chunk_errors = _process_orders_row_by_row(conn, normalize_nulls(df), summary, cache)
+        inserted_count += chunk_inserted
+        skipped_count += chunk_skipped
+        error_count += chunk_errors
+
+    summary.log(logger)
+    logger.info("Orders processing complete. %d inserted, %d skipped, %d errors", inserted_count, skipped_count, error_count)
+    return inserted_count, skipped_count, error_count
+
+@timed('transform')
+def validate_orders(df):
+    """
+    Transform OrderDetails rows and check them before they are staged for COPY.
+
+    A single bad value would abort the whole COPY, so rows that cannot be
+    loaded are split out here and reported individually instead.
+
+    Parameters:
+    - df: OrderDetails DataFrame
+
+    Returns:
+    - tuple: (transformed DataFrame of valid orders, list of (order number, error message))
+    """
+    orders = transform_order_details(df)
+    problems = pd.Series('', index=df.index, dtype=object)
+
+    def flag(mask, message):
+        problems[mask & (problems == '')] = message
+
+    for column, message in REQUIRED_ORDER_COLUMNS:
+        flag(orders[column].isna(), message)
+    for source_column, column, message in OPTIONAL_ORDER_COLUMNS:
+        flag(df[source_column].notna() & orders[column].isna(), message)
+
+    invalid = problems != ''
+    errors = [
+        (order_number if pd.notna(order_number) else 'unknown', message)
+        for order_number, message in zip(df.loc[invalid, 'Order #'], problems[invalid])
+    ]
+    return orders[~invalid], errors
+
+@timed('load')
+def load_orders_bulk(conn, orders, cache=None):
+    """
+    Load validated orders with COPY and a single merge statement.
+
+    Locations and servers are resolved (and, with DB_PARTITIONED, any missing
+    monthly partitions created) and committed first, so the dimension
+    locks are released before the orders themselves are streamed into a
+    temporary staging table and merged with INSERT ... SELECT ... ON CONFLICT
+    (order_id) DO NOTHING in a second transaction.
+
+    Parameters:
+    - conn: psycopg connection object
+    - orders: transformed orders returned by validate_orders
+    - cache: optional DimensionCache for location and server ids
+
+    Returns:
+    - tuple: (inserted count, skipped count)
+    """
+    if orders.empty:
+        return 0, 0
+
+    columns = [name for name, _ in ORDER_STAGING_COLUMNS]
+    try:
+        with conn.cursor() as cursor:
+            locations = orders['location'].dropna().unique()
+            servers = orders['server'].dropna().unique()
+            if cache is None:
+                location_ids = resolve_locations(cursor, locations)
+                server_ids = resolve_employee_aliases(cursor, servers)
+            else:
+                location_ids = cache.resolve('locations', locations, lambda missing: resolve_locations(cursor, missing))
+                server_ids = cache.resolve('employee_aliases', servers, lambda missing: resolve_employee_aliases(cursor, missing))
+            if DB_PARTITIONED:
+                ensure_partitions(cursor, 'orders', orders['opened_at'])
+            conn.commit()
+
+            staged = orders.assign(
+                location_id=orders['location'].map(location_ids).astype('Int64'),
+                server_id=orders['server'].map(server_ids).astype('Int64'),
+            )
+
+            create_staging_table(cursor, ORDER_STAGING_TABLE, ORDER_STAGING_COLUMNS)
+            staged_count = copy_rows(cursor, ORDER_STAGING_TABLE, columns, frame_to_rows(staged, columns))
+
+            column_list = ', '.join(columns)
+            cursor.execute(f"""
+                INSERT INTO orders ({column_list})
+                SELECT {column_list} FROM {ORDER_STAGING_TABLE}
+                ON CONFLICT ({ORDER_KEY}) DO NOTHING
+            """)
+            inserted_count = cursor.rowcount
+        conn.commit()
+    except Exception as e:
+        logger.error("Error bulk loading orders: %s", e)
+        conn.rollback()
+        if cache is not None:
+            cache.invalidate()
+        raise
+
+    return inserted_count, staged_count - inserted_count
+
+def _process_orders_row_by_row(conn, df, summary, cache=None):
+    """
+    Insert orders one row at a time, committing after each row.
+
+    Servers are resolved up front through their name aliases, as the bulk
+    load does. Rows that fail are counted in summary by exception class.
+
+    Returns:
+    - tuple: (inserted count, skipped count, error count)
+    """
+    # First, ensure we have the location in the locations table and every server resolved
+    servers = df['Server'].dropna().unique()
     with conn.cursor() as cursor:
         try:
             cursor.execute(
                 "INSERT INTO locations (location) VALUES (%s) ON CONFLICT (location) DO NOTHING",
                 (df['Location'].iloc[0],)
             )
+            if cache is None:
+                server_ids = resolve_employee_aliases(cursor, servers)
+            else:
+                server_ids = cache.resolve('employee_aliases', servers, lambda missing: resolve_employee_aliases(cursor, missing))
+            if DB_PARTITIONED:
+                ensure_partitions(cursor, 'orders', pd.to_datetime(df['Opened'], errors='coerce'))
             conn.commit()
             
             # Get the location_id
             cursor.execute("SELECT id FROM locations WHERE location = %s", (df['Location'].iloc[0],))
             location_id = cursor.fetchone()[0]
         except Exception as e:
-            logger.error(f"Error setting up location: {str(e)}")
+            logger.error("Error setting up location and servers: %s", e)
             conn.rollback()
+            if cache is not None:
+                cache.invalidate()
             raise
     
     inserted_count = 0
@@ -41,28 +241,12 @@ def process_orders(conn):
     
     with conn.cursor() as cursor:
         for _, row in df.iterrows():
+            server_id = server_ids.get(row['Server'])
+            if server_id is None:
+                error_count += 1
+                summary.add("no server specified" if row['Server'] is None else "unresolved server", row['Order #'])
+                continue
             try:
-                # Format server name consistently
-                server_name = format_name(row['Server'])
-                
-                # First, ensure the server exists in employees table
-                cursor.execute(
-                    """
-                    INSERT INTO employees (employee_id, employee_guid, employee_name) 
-                    VALUES (%s, uuid_generate_v4(), %s)
-                    ON CONFLICT (employee_name) DO NOTHING
-                    RETURNING id
-                    """,
-                    (0, server_name)  # Using 0 as a placeholder employee_id
-                )
-                result = cursor.fetchone()
-                if result:
-                    server_id = result[0]
-                else:
-                    # Get the existing server_id
-                    cursor.execute("SELECT id FROM employees WHERE employee_name = %s", (server_name,))
-                    server_id = cursor.fetchone()[0]
-                
                 # Convert string dates to timestamps
                 opened_at = pd.to_datetime(row['Opened'])
                 closed_at = pd.to_datetime(row['Closed']) if pd.notna(row['Closed']) else None
@@ -76,7 +260,7 @@ def process_orders(conn):
                     duration_minutes = hours * 60 + minutes
                 
                 # Insert order
-                cursor.execute("""
+                cursor.execute(f"""
                     INSERT INTO orders (
                         location_id, order_id, order_number, opened_at, closed_at, paid_at,
                         guest_count, tab_names, server_id, table_number, revenue_center,
@@ -87,7 +271,7 @@ def process_orders(conn):
                         %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
                         %s, %s, %s, %s, %s, %s, %s, %s
                     )
-                    ON CONFLICT (order_id) DO NOTHING
+                    ON CONFLICT ({ORDER_KEY}) DO NOTHING
                     RETURNING id
                 """, (
                     location_id,
@@ -117,42 +301,56 @@ def process_orders(conn):
                 
                 if cursor.rowcount > 0:
                     inserted_count += 1
-                    logger.debug(f"Inserted order: {row['Order #']}")
+                    logger.debug("Inserted order: %s", row['Order #'])
                 else:
                     skipped_count += 1
-                    logger.debug(f"Order already exists (skipped): {row['Order #']}")
+                    logger.debug("Order already exists (skipped): %s", row['Order #'])
                 conn.commit()
             except Exception as e:
                 error_count += 1
-                logger.error(f"Error processing order {row.get('Order #', 'unknown')}: {str(e)}")
+                summary.add(type(e).__name__, row.get('Order #', 'unknown'), str(e))
                 conn.rollback()
     
-    logger.info(f"Orders processing complete. {inserted_count} inserted, {skipped_count} skipped, {error_count} errors")
+    return inserted_count, skipped_count, error_count
 
-def import_order(conn, row):
+def import_order(conn, row, cache=None):
     """
     Import a single order and return its id.
+
+    Location and server ids come from the cache when one is given, and are
+    only looked up in the database on a miss.
     """
+    # Blank cells read with the file schema are <NA>, which psycopg cannot adapt
+    row = row.astype(object).where(row.notna(), None)
     with conn.cursor() as cur:
         try:
             # Get location_id
-            cur.execute("SELECT id FROM locations WHERE location = %s", (row['Location'],))
-            location_id = cur.fetchone()
-            if not location_id:
-                logger.error(f"Error: Location not found: {row['Location']}")
-                return None
+            location_id = cache.get('locations', row['Location']) if cache is not None else None
+            if location_id is None:
+                cur.execute("SELECT id FROM locations WHERE location = %s", (row['Location'],))
+                result = cur.fetchone()
+                if not result:
+                    logger.error("Error: Location not found: %s", row['Location'])
+                    return None
+                location_id = result[0]
+                if cache is not None:
+                    cache.put('locations', row['Location'], location_id)
 
             # Get server_id using formatted name
             if pd.notna(row['Server']):
-                formatted_name = format_name(row['Server'])
-                cur.execute("SELECT id FROM employees WHERE employee_name = %s", (formatted_name,))
-                server_id = cur.fetchone()
-                if not server_id:
-                    logger.error(f"Error: Server not found in employees table: {formatted_name} (original: {row['Server']})")
-                    return None
-                server_id = server_id[0]
+                formatted_name = cached_format_name(row['Server'])
+                server_id = cache.get('employees', formatted_name) if cache is not None else None
+                if server_id is None:
+                    cur.execute("SELECT id FROM employees WHERE employee_name = %s", (formatted_name,))
+                    result = cur.fetchone()
+                    if not result:
+                        logger.error("Error: Server not found in employees table: %s (original: %s)", formatted_name, row['Server'])
+                        return None
+                    server_id = result[0]
+                    if cache is not None:
+                        cache.put('employees', formatted_name, server_id)
             else:
-                logger.error(f"Error: No server specified for order {row['Order Id']}")
+                logger.error("Error: No server specified for order %s", row['Order Id'])
                 return None
 
             # Convert string dates to timestamps
@@ -167,8 +365,11 @@ def import_order(conn, row):
                 hours, minutes, seconds = map(int, duration_str.split(':'))
                 duration_minutes = hours * 60 + minutes
 
+            if DB_PARTITIONED:
+                ensure_partitions(cur, 'orders', [opened_at])
+
             # Insert order
-            cur.execute("""
+            cur.execute(f"""
                 INSERT INTO orders (
                     location_id, order_id, order_number, opened_at, closed_at, paid_at,
                     guest_count, tab_names, server_id, table_number, revenue_center,
@@ -179,10 +380,10 @@ def import_order(conn, row):
                     %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
                     %s, %s, %s, %s, %s, %s, %s, %s
                 )
-                ON CONFLICT (order_id) DO NOTHING
+                ON CONFLICT ({ORDER_KEY}) DO NOTHING
                 RETURNING id
             """, (
-                location_id[0],
+                location_id,
                 int(row['Order Id']),
                 row['Order #'],
                 opened_at,
@@ -209,70 +410,12 @@ def import_order(conn, row):
             
             result = cur.fetchone()
             if result:
-                logger.info(f"Info: Inserted new order: {row['Order #']}")
+                logger.debug("Inserted new order: %s", row['Order #'])
                 return result[0]
             else:
-                logger.info(f"Info: Order already exists (skipped): {row['Order #']}")
+                logger.debug("Order already exists (skipped): %s", row['Order #'])
                 return None
 
         except Exception as e:
-            logger.error(f"Error inserting order {row['Order Id']}: {str(e)}")
+            logger.error("Error inserting order %s: %s", row['Order Id'], e)
             raise
-
-def import_check(conn, row, order_id):
-    """
-    Import a single check associated with an order.
-    Returns True if check was inserted, False if skipped.
-    """
-    with conn.cursor() as cur:
-        try:
-            # Convert date and time strings to proper formats
-            opened_date = pd.to_datetime(row['Opened Date']).date() if pd.notna(row['Opened Date']) else None
-            opened_time = pd.to_datetime(row['Opened Time']).time() if pd.notna(row['Opened Time']) else None
-
-            # Insert check
-            cur.execute("""
-                INSERT INTO checks (
-                    order_id, check_id, check_number, customer_id, customer_name,
-                    customer_phone, customer_email, customer_family, location_code,
-                    opened_date, opened_time, item_description, table_size,
-                    discount, discount_reason, tax, tender, total, receipt_link
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s
-                )
-                ON CONFLICT (order_id, check_number) DO NOTHING
-                RETURNING id
-            """, (
-                order_id,
-                int(row['Check Id']),
-                row['Check #'],
-                row['Customer Id'],
-                row['Customer'],
-                row['Customer Phone'],
-                row['Customer Email'],
-                row['Customer Family'],
-                row['Location Code'],
-                opened_date,
-                opened_time,
-                row['Item Description'],
-                row['Table Size'],
-                row['Discount'],
-                row['Reason of Discount'],
-                row['Tax'],
-                row['Tender'],
-                row['Total'],
-                row['Link']
-            ))
-            
-            result = cur.fetchone()
-            if result:
-                logger.info(f"Info: Inserted new check: {row['Check #']}")
-                return True
-            else:
-                logger.info(f"Info: Check already exists (skipped): {row['Check #']}")
-                return False
-
-        except Exception as e:
-            logger.error(f"Error inserting check {row['Check Id']}: {str(e)}")
-            raise 
\ No newline at end of file
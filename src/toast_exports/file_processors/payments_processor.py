@@ -0,0 +1,200 @@
+import pandas as pd
+import logging
+from pathlib import Path
+from toast_exports.config import CURRENT_DATA_DIR
+from toast_exports.db.bulk import create_staging_table, copy_rows, frame_to_rows
+from toast_exports.db.dimensions import resolve_codes
+from toast_exports.logs import ErrorSummary
+from toast_exports.metrics import timed
+from toast_exports.readers import iter_csv_chunks
+from toast_exports.schemas import PAYMENT_DETAILS_SCHEMA
+from toast_exports.transforms.payments import transform_payments
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_STAGING_TABLE = 'payments_staging'
+
+# Code tables for the enumerated payment columns: (payment column, id column, code table)
+PAYMENT_CODE_COLUMNS = [
+    ('payment_type', 'type_id', 'payment_types'),
+    ('status', 'status_id', 'payment_statuses'),
+    ('card_type', 'card_type_id', 'card_types'),
+]
+
+# Columns staged for the bulk merge, in COPY order, with their staging types.
+# order_id and check_id are staged as Toast ids and swapped for surrogate ids in the merge.
+PAYMENT_STAGING_COLUMNS = [
+    ('payment_id', 'BIGINT'),
+    ('order_id', 'BIGINT'),
+    ('check_id', 'BIGINT'),
+    ('check_number', 'VARCHAR(50)'),
+    ('paid_at', 'TIMESTAMP'),
+    ('ordered_at', 'TIMESTAMP'),
+    ('tab_name', 'VARCHAR(255)'),
+    ('house_account', 'VARCHAR(50)'),
+    ('amount', 'NUMERIC(10,2)'),
+    ('tip', 'NUMERIC(10,2)'),
+    ('gratuity', 'NUMERIC(10,2)'),
+    ('total', 'NUMERIC(10,2)'),
+    ('swiped_card_amount', 'NUMERIC(10,2)'),
+    ('keyed_card_amount', 'NUMERIC(10,2)'),
+    ('amount_tendered', 'NUMERIC(10,2)'),
+    ('refund_status', 'VARCHAR(20)'),
+    ('refunded_at', 'TIMESTAMP'),
+    ('refund_amount', 'NUMERIC(10,2)'),
+    ('refund_tip_amount', 'NUMERIC(10,2)'),
+    ('void_user', 'VARCHAR(255)'),
+    ('void_approver', 'VARCHAR(255)'),
+    ('voided_at', 'TIMESTAMP'),
+    ('status_id', 'SMALLINT'),
+    ('type_id', 'SMALLINT'),
+    ('cash_drawer', 'VARCHAR(100)'),
+    ('card_type_id', 'SMALLINT'),
+    ('other_type', 'VARCHAR(100)'),
+    ('email', 'VARCHAR(255)'),
+    ('phone', 'VARCHAR(50)'),
+    ('card_last_4', 'VARCHAR(4)'),
+    ('card_fees', 'NUMERIC(10,2)'),
+    ('room_info', 'VARCHAR(255)'),
+    ('receipt', 'VARCHAR(50)'),
+    ('source', 'VARCHAR(50)'),
+]
+
+# Columns that must be present for a payment to be loaded, with the message reported when missing
+REQUIRED_PAYMENT_COLUMNS = [
+    ('payment_id', "missing or invalid Payment Id"),
+    ('order_id', "missing or invalid Order Id"),
+    ('check_id', "missing or invalid Check Id"),
+    ('paid_at', "missing or invalid Paid Date"),
+    ('status', "missing Status"),
+    ('payment_type', "missing Type"),
+    ('amount', "missing or invalid Amount"),
+    ('total', "missing or invalid Total"),
+]
+
+def process_payments(conn, data_dir=None, cache=None, memory_budget_mb=None):
+    """
+    Process payments from CSV file and insert into database.
+
+    Orders must be loaded first; payments whose order is not in the database
+    are reported as errors.
+
+    Parameters:
+    - conn: psycopg connection object
+    - data_dir: export directory containing PaymentDetails.csv (defaults to CURRENT_DATA_DIR)
+    - cache: optional DimensionCache for payment type, status and card type ids
+    - memory_budget_mb: memory budget for one chunk in MB (defaults to CSV_MEMORY_BUDGET_MB)
+
+    Returns:
+    - tuple: (inserted count, skipped count, error count)
+    """
+    sample_data_path = Path(data_dir or CURRENT_DATA_DIR) / 'PaymentDetails.csv'
+
+    logger.info("Reading payments data...")
+    inserted_count = 0
+    skipped_count = 0
+    error_count = 0
+    summary = ErrorSummary('payments')
+    for df in iter_csv_chunks(sample_data_path, memory_budget_mb, schema=PAYMENT_DETAILS_SCHEMA):
+        payments, errors = validate_payments(df)
+        summary.extend(errors)
+        chunk_inserted, chunk_skipped, orphaned_count = load_payments_bulk(conn, payments, cache)
+        inserted_count += chunk_inserted
+        skipped_count += chunk_skipped
+        error_count += len(errors) + orphaned_count
+
+    summary.log(logger)
+    logger.info("Payments processing complete. %d inserted, %d skipped, %d errors", inserted_count, skipped_count, error_count)
+    return inserted_count, skipped_count, error_count
+
+@timed('transform')
+def validate_payments(df):
+    """
+    Transform PaymentDetails rows and split out rows that cannot be loaded.
+
+    Parameters:
+    - df: PaymentDetails DataFrame
+
+    Returns:
+    - tuple: (transformed DataFrame of valid payments, list of (payment id, error message))
+    """
+    payments = transform_payments(df)
+    problems = pd.Series('', index=df.index, dtype=object)
+
+    for column, message in REQUIRED_PAYMENT_COLUMNS:
+        problems[payments[column].isna() & (problems == '')] = message
+
+    invalid = problems != ''
+    errors = [
+        (payment_id if pd.notna(payment_id) else 'unknown', message)
+        for payment_id, message in zip(df.loc[invalid, 'Payment Id'], problems[invalid])
+    ]
+    return payments[~invalid], errors
+
+@timed('load')
+def load_payments_bulk(conn, payments, cache=None):
+    """
+    Load validated payments with COPY and a single merge statement.
+
+    Payment types, statuses and card types are resolved to code table ids
+    and committed first. The staged payments are then joined to orders and
+    checks on their Toast ids in one INSERT ... SELECT. A payment whose check
+    is not loaded yet keeps a NULL check_id, which the checks loader fills in.
+
+    Parameters:
+    - conn: psycopg connection object
+    - payments: transformed payments returned by validate_payments
+    - cache: optional DimensionCache for code table ids
+
+    Returns:
+    - tuple: (inserted count, skipped count, count of payments with no matching order)
+    """
+    if payments.empty:
+        return 0, 0, 0
+
+    columns = [name for name, _ in PAYMENT_STAGING_COLUMNS]
+    try:
+        with conn.cursor() as cursor:
+            code_ids = {}
+            for column, id_column, table in PAYMENT_CODE_COLUMNS:
+                names = payments[column].dropna().unique()
+                if cache is None:
+                    code_ids[id_column] = payments[column].map(resolve_codes(cursor, table, names)).astype('Int64')
+                else:
+                    ids = cache.resolve(table, names, lambda missing: resolve_codes(cursor, table, missing))
+                    code_ids[id_column] = payments[column].map(ids).astype('Int64')
+            conn.commit()
+
+            staged = payments.assign(**code_ids)
+            create_staging_table(cursor, PAYMENT_STAGING_TABLE, PAYMENT_STAGING_COLUMNS)
+            staged_count = copy_rows(cursor, PAYMENT_STAGING_TABLE, columns, frame_to_rows(staged, columns))
+
+            cursor.execute(f"""
+                SELECT count(*) FROM {PAYMENT_STAGING_TABLE} s
+                WHERE NOT EXISTS (SELECT 1 FROM orders o WHERE o.order_id = s.order_id)
+            """)
+            orphaned_count = cursor.fetchone()[0]
+            if orphaned_count:
+                logger.warning("%d payments reference orders that are not loaded", orphaned_count)
+
+            payment_columns = [name for name in columns if name != 'check_id']
+            column_list = ', '.join(payment_columns)
+            select_list = ', '.join('o.id' if name == 'order_id' else f's.{name}' for name in payment_columns)
+            cursor.execute(f"""
+                INSERT INTO payments (check_id, toast_check_id, {column_list})
+                SELECT c.id, s.check_id, {select_list}
+                FROM {PAYMENT_STAGING_TABLE} s
+                JOIN orders o ON o.order_id = s.order_id
+                LEFT JOIN checks c ON c.check_id = s.check_id
+                ON CONFLICT (payment_id) DO NOTHING
+            """)
+            inserted_count = cursor.rowcount
+        conn.commit()
+    except Exception as e:
+        logger.error("Error bulk loading payments: %s", e)
+        conn.rollback()
+        if cache is not None:
+            cache.invalidate()
+        raise
+
+    return inserted_count, staged_count - orphaned_count - inserted_count, orphaned_count
@@ -2,157 +2,360 @@ import pandas as pd
 import logging
 from pathlib import Path
 import psycopg
-from toast_exports.utils.name_formatter import format_name
+from toast_exports.config import CURRENT_DATA_DIR, DB_PARTITIONED
+from toast_exports.db.bulk import create_staging_table, copy_rows, frame_to_rows
+from toast_exports.db.dimensions import (
+    lookup_ids, resolve_locations, resolve_jobs, resolve_employees, record_employee_aliases,
+)
+from toast_exports.db.partitions import ensure_partitions
+from toast_exports.logs import ErrorSummary
+from toast_exports.metrics import timed
+from toast_exports.readers import iter_csv_chunks
+from toast_exports.schemas import TIME_ENTRIES_SCHEMA
+from toast_exports.transforms.parsing import parse_timestamps, parse_booleans, parse_ids
+from toast_exports.utils.name_formatter import format_names
 
 logger = logging.getLogger(__name__)
 
-def process_time_entries(conn):
+TIME_ENTRY_STAGING_TABLE = 'time_entries_staging'
+
+# Columns staged for the bulk merge, in COPY order, with their staging types
+TIME_ENTRY_STAGING_COLUMNS = [
+    ('location_id', 'INT'),
+    ('employee_id', 'INT'),
+    ('job_id', 'INT'),
+    ('in_date', 'TIMESTAMP'),
+    ('out_date', 'TIMESTAMP'),
+    ('auto_clock_out', 'BOOLEAN'),
+    ('total_hours', 'NUMERIC(5, 2)'),
+    ('unpaid_break_time', 'NUMERIC(5, 2)'),
+    ('paid_break_time', 'NUMERIC(5, 2)'),
+    ('payable_hours', 'NUMERIC(5, 2)'),
+    ('cash_tips_declared', 'NUMERIC(10, 2)'),
+    ('non_cash_tips', 'NUMERIC(10, 2)'),
+    ('total_gratuity', 'NUMERIC(10, 2)'),
+    ('total_tips', 'NUMERIC(10, 2)'),
+    ('tips_withheld', 'NUMERIC(10, 2)'),
+    ('wage', 'NUMERIC(10, 2)'),
+    ('regular_hours', 'NUMERIC(5, 2)'),
+    ('overtime_hours', 'NUMERIC(5, 2)'),
+    ('regular_pay', 'NUMERIC(10, 2)'),
+    ('overtime_pay', 'NUMERIC(10, 2)'),
+    ('total_pay', 'NUMERIC(10, 2)'),
+]
+
+# Id columns that must parse for a time entry to be loaded, with the message reported otherwise
+REQUIRED_TIME_ENTRY_IDS = [
+    ('Employee Id', "missing or invalid Employee Id"),
+    ('Job Id', "missing or invalid Job Id"),
+]
+
+def process_time_entries(conn, data_dir=None, cache=None, memory_budget_mb=None):
     """
     Process time entries from CSV file and insert into database.
-    
+
+    The file is streamed in chunks that fit the memory budget. For each chunk,
+    rows without a valid employee or job id are rejected, then locations,
+    jobs and employees are resolved once per distinct entity before the time
+    entries themselves are loaded in a single batch.
+
     Parameters:
     - conn: psycopg connection object
+    - data_dir: export directory containing TimeEntries.csv (defaults to CURRENT_DATA_DIR)
+    - cache: optional DimensionCache; cached entities are not sent to the database again
+    - memory_budget_mb: memory budget for one chunk in MB (defaults to CSV_MEMORY_BUDGET_MB)
+
+    Returns:
+    - tuple: (inserted count, skipped count, error count)
     """
-    sample_data_path = Path('sample_data/20240410/TimeEntries.csv')
-    
+    sample_data_path = Path(data_dir or CURRENT_DATA_DIR) / 'TimeEntries.csv'
+
     logger.info("Reading time entries data...")
-    df = pd.read_csv(sample_data_path)
-    
-    # First, ensure we have the location in the locations table
+    inserted_count = 0
+    skipped_count = 0
+    error_count = 0
+    summary = ErrorSummary('time entries')
+    for df in iter_csv_chunks(sample_data_path, memory_budget_mb, schema=TIME_ENTRIES_SCHEMA):
+        entries, errors = validate_time_entries(df)
+        summary.extend(errors)
+        location_ids = import_locations(conn, entries, cache)
+        job_ids = import_jobs(conn, entries, cache)
+        employee_ids = import_employees(conn, entries, cache)
+        chunk_inserted, chunk_skipped, chunk_errors = import_time_entries(
+            conn, entries, location_ids, employee_ids, job_ids, cache, summary
+        )
+        inserted_count += chunk_inserted
+        skipped_count += chunk_skipped
+        error_count += chunk_errors + len(errors)
+
+    summary.log(logger)
+    logger.info("Time entries processing complete. %d inserted, %d skipped, %d errors", inserted_count, skipped_count, error_count)
+    return inserted_count, skipped_count, error_count
+
+@timed('transform')
+def validate_time_entries(df):
+    """
+    Parse the employee and job ids of TimeEntries rows and split out the rows without one.
+
+    The ids are read as strings and parsed with parse_ids, so an 18-digit id
+    never passes through float64 and a malformed one rejects only its row.
+
+    Parameters:
+    - df: TimeEntries DataFrame read with TIME_ENTRIES_SCHEMA
+
+    Returns:
+    - tuple: (DataFrame of valid rows with Int64 ids, list of (employee, error message))
+    """
+    entries = df.assign(**{column: parse_ids(df[column]) for column, _ in REQUIRED_TIME_ENTRY_IDS})
+    problems = pd.Series('', index=df.index, dtype=object)
+    for column, message in REQUIRED_TIME_ENTRY_IDS:
+        problems[entries[column].isna() & (problems == '')] = message
+
+    invalid = problems != ''
+    errors = [
+        (employee if pd.notna(employee) else 'unknown', message)
+        for employee, message in zip(df.loc[invalid, 'Employee'], problems[invalid])
+    ]
+    return entries[~invalid], errors
+
+@timed('load')
+def import_locations(conn, df, cache=None):
+    """
+    Insert the distinct locations in the frame in one statement.
+
+    Returns:
+    - dict: location name -> locations.id
+    """
+    locations = df['Location'].dropna().unique()
     with conn.cursor() as cursor:
         try:
-            cursor.execute(
-                "INSERT INTO locations (location) VALUES (%s) ON CONFLICT (location) DO NOTHING",
-                (df['Location'].iloc[0],)
-            )
-            conn.commit()
-            
-            # Get the location_id
-            cursor.execute("SELECT id FROM locations WHERE location = %s", (df['Location'].iloc[0],))
-            location_id = cursor.fetchone()[0]
+            if cache is None:
+                location_ids = resolve_locations(cursor, locations)
+            else:
+                location_ids = cache.resolve('locations', locations, lambda missing: resolve_locations(cursor, missing))
         except Exception as e:
-            logger.error(f"Error setting up location: {str(e)}")
+            logger.error("Error importing locations: %s", e)
             conn.rollback()
+            _invalidate(cache)
             raise
-    
-    inserted_count = 0
-    skipped_count = 0
-    error_count = 0
-    
+    conn.commit()
+    return location_ids
+
+@timed('load')
+def import_jobs(conn, df, cache=None):
+    """
+    Insert the distinct jobs in the frame in one statement.
+
+    Returns:
+    - dict: Toast job id -> jobs.id
+    """
+    jobs = df.drop_duplicates(subset='Job Id').dropna(subset=['Job Id'])
+    job_ids = {}
+    if cache is not None:
+        job_ids, jobs = _split_cached(cache, 'jobs', jobs, 'Job Id')
+        if jobs.empty:
+            return job_ids
+    job_rows = [
+        (
+            int(row['Job Id']),
+            row['Job GUID'],
+            None if pd.isna(row['Job Code']) else str(row['Job Code']),
+            row['Job Title'],
+        )
+        for _, row in jobs.iterrows()
+    ]
     with conn.cursor() as cursor:
-        for _, row in df.iterrows():
-            try:
-                # Format employee name consistently
-                employee_name = format_name(row['Employee'])
-                
-                # Ensure job exists
-                cursor.execute(
-                    """
-                    INSERT INTO jobs (job_id, job_guid, job_code, job_title)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (job_id) DO NOTHING
-                    RETURNING id
-                    """,
-                    (row['Job Id'], row['Job GUID'], row['Job Code'], row['Job Title'])
-                )
-                result = cursor.fetchone()
-                if result:
-                    job_id = result[0]
-                else:
-                    # Get existing job_id
-                    cursor.execute("SELECT id FROM jobs WHERE job_id = %s", (row['Job Id'],))
-                    job_id = cursor.fetchone()[0]
-                
-                # Get or create employee
-                cursor.execute(
-                    """
-                    SELECT id FROM employees 
-                    WHERE employee_id = %s 
-                    OR employee_guid = %s 
-                    OR employee_name = %s
-                    """,
-                    (str(row['Employee Id']), row['Employee GUID'], employee_name)
-                )
-                result = cursor.fetchone()
-                
-                if result:
-                    employee_id = result[0]
-                    # Update employee record with any missing information
-                    cursor.execute(
-                        """
-                        UPDATE employees 
-                        SET 
-                            employee_id = %s,
-                            employee_guid = %s,
-                            employee_external_id = %s,
-                            employee_name = %s
-                        WHERE id = %s
-                        """,
-                        (row['Employee Id'], row['Employee GUID'], 
-                         str(row['Employee External Id']), employee_name, employee_id)
-                    )
-                else:
-                    # Create new employee
-                    cursor.execute(
-                        """
-                        INSERT INTO employees (employee_id, employee_guid, employee_external_id, employee_name)
-                        VALUES (%s, %s, %s, %s)
-                        RETURNING id
-                        """,
-                        (row['Employee Id'], row['Employee GUID'], 
-                         str(row['Employee External Id']), employee_name)
-                    )
-                    employee_id = cursor.fetchone()[0]
-                
-                # Insert time entry
-                cursor.execute("""
-                    INSERT INTO time_entries (
-                        location_id, employee_id, job_id, in_date, out_date,
-                        auto_clock_out, total_hours, unpaid_break_time,
-                        paid_break_time, payable_hours, cash_tips_declared,
-                        non_cash_tips, total_gratuity, total_tips,
-                        tips_withheld, wage, regular_hours, overtime_hours,
-                        regular_pay, overtime_pay, total_pay
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s
-                    )
+        try:
+            inserted_ids = resolve_jobs(cursor, job_rows)
+        except Exception as e:
+            logger.error("Error importing jobs: %s", e)
+            conn.rollback()
+            _invalidate(cache)
+            raise
+    conn.commit()
+    if cache is not None:
+        cache.update('jobs', inserted_ids)
+    job_ids.update(inserted_ids)
+    logger.info("Resolved %d jobs from %d time entries", len(job_ids), len(df))
+    return job_ids
+
+@timed('load')
+def import_employees(conn, df, cache=None):
+    """
+    Upsert the distinct employees in the frame in one statement.
+
+    Each employee's name as spelled in TimeEntries is recorded as an alias
+    in the same transaction, so other exports that spell it the same way
+    resolve it without formatting and matching the name again.
+
+    Returns:
+    - dict: Toast employee id -> employees.id
+    """
+    employees = df.drop_duplicates(subset='Employee Id', keep='last').dropna(subset=['Employee Id'])
+    employee_ids = {}
+    if cache is not None:
+        employee_ids, employees = _split_cached(cache, 'employee_ids', employees, 'Employee Id')
+        if employees.empty:
+            return employee_ids
+    employee_rows = [
+        (
+            int(employee_id),
+            employee_guid,
+            None if pd.isna(external_id) else str(external_id),
+            employee_name,
+        )
+        for employee_id, employee_guid, external_id, employee_name in zip(
+            employees['Employee Id'],
+            employees['Employee GUID'],
+            employees['Employee External Id'],
+            format_names(employees['Employee']),
+        )
+    ]
+    with conn.cursor() as cursor:
+        try:
+            upserted_ids = resolve_employees(cursor, employee_rows)
+            alias_ids = {
+                spelling: upserted_ids[int(employee_id)]
+                for employee_id, spelling in zip(employees['Employee Id'], employees['Employee'])
+                if not pd.isna(spelling) and int(employee_id) in upserted_ids
+            }
+            record_employee_aliases(cursor, alias_ids)
+        except Exception as e:
+            logger.error("Error importing employees: %s", e)
+            conn.rollback()
+            _invalidate(cache)
+            raise
+    conn.commit()
+    if cache is not None:
+        cache.update('employee_ids', upserted_ids)
+        cache.update('employees', {
+            employee_name: upserted_ids[employee_id]
+            for employee_id, _, _, employee_name in employee_rows
+            if employee_id in upserted_ids
+        })
+        cache.update('employee_aliases', alias_ids)
+    employee_ids.update(upserted_ids)
+    logger.info("Resolved %d employees from %d time entries", len(employee_ids), len(df))
+    return employee_ids
+
+@timed('load')
+def import_time_entries(conn, df, location_ids=None, employee_ids=None, job_ids=None, cache=None, summary=None):
+    """
+    Load time entries with COPY and a single merge statement.
+
+    Any id map that is not supplied is taken from the cache, and cache misses
+    are looked up with one SELECT per dimension. Rows whose location,
+    employee or job cannot be resolved are counted in summary and left out
+    of the batch; without a summary they are logged before returning.
+
+    Returns:
+    - tuple: (inserted count, skipped count, error count)
+    """
+    columns = [name for name, _ in TIME_ENTRY_STAGING_COLUMNS]
+    try:
+        with conn.cursor() as cursor:
+            if location_ids is None:
+                location_ids = _lookup(cursor, cache, 'locations', 'locations', 'location', df['Location'].dropna().unique())
+            if employee_ids is None:
+                employee_ids = _lookup(cursor, cache, 'employee_ids', 'employees', 'employee_id', _distinct_ids(df['Employee Id']))
+            if job_ids is None:
+                job_ids = _lookup(cursor, cache, 'jobs', 'jobs', 'job_id', _distinct_ids(df['Job Id']))
+
+            staged = _prepare_time_entry_rows(df, location_ids, employee_ids, job_ids)
+            invalid = staged[['location_id', 'employee_id', 'job_id', 'in_date', 'out_date']].isna().any(axis=1)
+            rejected = summary if summary is not None else ErrorSummary('time entries')
+            for employee in df.loc[invalid, 'Employee']:
+                rejected.add("unresolved location, employee, job or dates", employee)
+            if summary is None:
+                rejected.log(logger)
+            staged = staged[~invalid]
+
+            inserted_count = 0
+            staged_count = 0
+            if not staged.empty:
+                if DB_PARTITIONED:
+                    ensure_partitions(cursor, 'time_entries', staged['in_date'])
+                    conn.commit()
+                create_staging_table(cursor, TIME_ENTRY_STAGING_TABLE, TIME_ENTRY_STAGING_COLUMNS)
+                staged_count = copy_rows(cursor, TIME_ENTRY_STAGING_TABLE, columns, frame_to_rows(staged, columns))
+
+                column_list = ', '.join(columns)
+                cursor.execute(f"""
+                    INSERT INTO time_entries ({column_list})
+                    SELECT {column_list} FROM {TIME_ENTRY_STAGING_TABLE}
                     ON CONFLICT (employee_id, in_date) DO NOTHING
-                    RETURNING id
-                """, (
-                    location_id,
-                    employee_id,
-                    job_id,
-                    pd.to_datetime(row['In Date']),
-                    pd.to_datetime(row['Out Date']),
-                    row['Auto Clock-out'],
-                    row['Total Hours'],
-                    row['Unpaid Break Time'],
-                    row['Paid Break Time'],
-                    row['Payable Hours'],
-                    row['Cash Tips Declared'],
-                    row['Non Cash Tips'],
-                    row['Total Gratuity'],
-                    row['Total Tips'],
-                    row['Tips Withheld'],
-                    row['Wage'],
-                    row['Regular Hours'],
-                    row['Overtime Hours'],
-                    row['Regular Pay'],
-                    row['Overtime Pay'],
-                    row['Total Pay']
-                ))
-                
-                if cursor.rowcount > 0:
-                    inserted_count += 1
-                    logger.debug(f"Inserted time entry for: {employee_name}")
-                else:
-                    skipped_count += 1
-                    logger.debug(f"Time entry already exists (skipped) for: {employee_name}")
-                conn.commit()
-            except Exception as e:
-                error_count += 1
-                logger.error(f"Error processing time entry for {employee_name if 'employee_name' in locals() else 'unknown'}: {str(e)}")
-                conn.rollback()
-    
-    logger.info(f"Time entries processing complete. {inserted_count} inserted, {skipped_count} skipped, {error_count} errors")
+                """)
+                inserted_count = cursor.rowcount
+        conn.commit()
+    except Exception as e:
+        logger.error("Error bulk loading time entries: %s", e)
+        conn.rollback()
+        _invalidate(cache)
+        raise
+
+    return inserted_count, staged_count - inserted_count, int(invalid.sum())
+
+def _lookup(cursor, cache, dimension, table, key_column, keys):
+    """
+    Look up surrogate ids through the cache when one is given.
+    """
+    if cache is None:
+        return lookup_ids(cursor, table, key_column, keys)
+    return cache.resolve(dimension, keys, lambda missing: lookup_ids(cursor, table, key_column, missing))
+
+def _split_cached(cache, dimension, df, key_column):
+    """
+    Split frame rows into cached ids and the rows still to be resolved.
+
+    Returns:
+    - tuple: (dict of cached natural key -> id, DataFrame of uncached rows)
+    """
+    cached_ids = {}
+    for key in df[key_column]:
+        surrogate_id = cache.get(dimension, int(key))
+        if surrogate_id is not None:
+            cached_ids[int(key)] = surrogate_id
+    uncached = df[~df[key_column].astype('int64').isin(list(cached_ids))]
+    return cached_ids, uncached
+
+def _invalidate(cache):
+    """
+    Drop cached ids after a rollback.
+    """
+    if cache is not None:
+        cache.invalidate()
+
+def _distinct_ids(series):
+    """
+    Return the distinct non-null values of an id column as Python ints.
+    """
+    return [int(value) for value in series.dropna().unique()]
+
+@timed('transform')
+def _prepare_time_entry_rows(df, location_ids, employee_ids, job_ids):
+    """
+    Build the staging frame for time entries, one column per TIME_ENTRY_STAGING_COLUMNS entry.
+    """
+    return pd.DataFrame({
+        'location_id': df['Location'].map(location_ids).astype('Int64'),
+        'employee_id': df['Employee Id'].map(employee_ids).astype('Int64'),
+        'job_id': df['Job Id'].map(job_ids).astype('Int64'),
+        'in_date': parse_timestamps(df['In Date']),
+        'out_date': parse_timestamps(df['Out Date']),
+        'auto_clock_out': parse_booleans(df['Auto Clock-out']),
+        'total_hours': df['Total Hours'],
+        'unpaid_break_time': df['Unpaid Break Time'],
+        'paid_break_time': df['Paid Break Time'],
+        'payable_hours': df['Payable Hours'],
+        'cash_tips_declared': df['Cash Tips Declared'],
+        'non_cash_tips': df['Non Cash Tips'],
+        'total_gratuity': df['Total Gratuity'],
+        'total_tips': df['Total Tips'],
+        'tips_withheld': df['Tips Withheld'],
+        'wage': df['Wage'],
+        'regular_hours': df['Regular Hours'],
+        'overtime_hours': df['Overtime Hours'],
+        'regular_pay': df['Regular Pay'],
+        'overtime_pay': df['Overtime Pay'],
+        'total_pay': df['Total Pay'],
+    })
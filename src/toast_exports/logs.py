@@ -0,0 +1,110 @@
+"""
+Logging setup and helpers that keep logging cost proportional to errors, not rows.
+
+Processors do not log one line per bad record. They collect problems in an
+ErrorSummary and log one line per kind of problem, with its count and the
+first few record ids. Messages use lazy %-style arguments, so nothing is
+formatted for records below the log level.
+
+configure_logging writes plain text, or one JSON object per line
+(LOG_FORMAT=json) for log shippers. Values passed in a record's extra
+appear as JSON fields.
+"""
+import json
+import logging
+from datetime import datetime, timezone
+from toast_exports.config import LOG_ERROR_EXAMPLES, LOG_FORMAT, LOG_LEVEL
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else on a record came from extra
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format each record as one JSON object per line.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def configure_logging(level=None, log_format=None):
+    """
+    Configure the root logger.
+
+    Parameters:
+    - level: log level name (defaults to LOG_LEVEL)
+    - log_format: 'text' or 'json' (defaults to LOG_FORMAT)
+    """
+    handler = logging.StreamHandler()
+    if (log_format or LOG_FORMAT) == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    logging.basicConfig(level=level or LOG_LEVEL, handlers=[handler], force=True)
+
+class ErrorSummary:
+    """
+    Per-kind counts of rejected records, with the first few record ids of each kind.
+
+    Kinds are validation messages, or exception class names for records that
+    failed in the database.
+    """
+
+    def __init__(self, subject, examples=None):
+        """
+        Parameters:
+        - subject: plural name of the records, e.g. 'orders'
+        - examples: record ids kept per kind (defaults to LOG_ERROR_EXAMPLES)
+        """
+        self.subject = subject
+        self.examples = LOG_ERROR_EXAMPLES if examples is None else examples
+        self.counts = {}
+        self._examples = {}
+        self._details = {}
+
+    def add(self, kind, record_id='unknown', detail=None):
+        """
+        Count one rejected record. Only the first detail of each kind is kept.
+        """
+        if kind not in self.counts:
+            self.counts[kind] = 0
+            self._examples[kind] = []
+            self._details[kind] = detail
+        self.counts[kind] += 1
+        if len(self._examples[kind]) < self.examples:
+            self._examples[kind].append(record_id)
+
+    def extend(self, errors):
+        """
+        Count (record id, kind) pairs, as returned by the validate_* functions.
+        """
+        for record_id, kind in errors:
+            self.add(kind, record_id)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def log(self, logger, level=logging.ERROR):
+        """
+        Log one line per kind of error.
+        """
+        for kind, count in self.counts.items():
+            examples = self._examples[kind]
+            detail = self._details[kind]
+            logger.log(
+                level, "Error processing %d %s: %s (first: %s)%s",
+                count, self.subject, kind, ', '.join(map(str, examples)),
+                f"; {detail}" if detail else '',
+                extra={'error_kind': kind, 'error_count': count, 'examples': examples},
+            )
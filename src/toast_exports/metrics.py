@@ -0,0 +1,299 @@
+"""
+Lightweight instrumentation for pipeline runs.
+
+Each stage gets a StageMetrics collecting wall time per phase (read,
+transform, load, commit), row counts, bytes read and the latency of every
+statement it runs. Phases are timed with the timed() context manager, which
+also works as a decorator; statements and commits are timed by the
+InstrumentedConnection the connection pool hands out. Nothing is recorded
+outside a stage, so instrumented code costs one context variable lookup when
+no run is being measured.
+
+At the end of a run RunMetrics writes a JSON report and, optionally, a
+Prometheus textfile for the node exporter, so nightly runs can be compared.
+"""
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+import psycopg
+
+logger = logging.getLogger(__name__)
+
+_current_stage = ContextVar('current_stage', default=None)
+
+METRIC_PREFIX = 'toast_etl'
+
+def percentile(values, fraction):
+    """
+    Return the nearest-rank percentile of a list of numbers, or None if it is empty.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+class StageMetrics:
+    """
+    Timings and counters for one pipeline stage.
+
+    A stage runs on a single thread, so its counters are not locked.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.status = 'pending'
+        self.seconds = 0.0
+        self.phases = {}
+        self.inserted = 0
+        self.skipped = 0
+        self.errors = 0
+        self.bytes_read = 0
+        self.statement_seconds = []
+        self.commits = 0
+        # Open phase timers, innermost last, so nested phases are not counted twice
+        self._open_phases = []
+
+    def record_statement(self, seconds):
+        self.statement_seconds.append(seconds)
+
+    def record_result(self, result):
+        self.inserted, self.skipped, self.errors = result
+
+    def to_dict(self):
+        rows = self.inserted + self.skipped
+        latencies = self.statement_seconds
+        return {
+            'stage': self.name,
+            'status': self.status,
+            'seconds': round(self.seconds, 6),
+            'phases': {phase: round(seconds, 6) for phase, seconds in self.phases.items()},
+            'inserted': self.inserted,
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'bytes_read': self.bytes_read,
+            'rows_per_second': round(rows / self.seconds, 1) if self.seconds else None,
+            'bytes_per_second': round(self.bytes_read / self.seconds, 1) if self.seconds else None,
+            'queries': len(latencies),
+            'commits': self.commits,
+            'statement_latency_ms': {
+                'p50': _milliseconds(percentile(latencies, 0.50)),
+                'p99': _milliseconds(percentile(latencies, 0.99)),
+                'max': _milliseconds(max(latencies, default=None)),
+            },
+        }
+
+def _milliseconds(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+class RunMetrics:
+    """
+    Metrics for one run of the pipeline over an export directory.
+    """
+
+    def __init__(self, data_dir=None):
+        self.data_dir = str(data_dir) if data_dir is not None else None
+        self.started_at = datetime.now(timezone.utc)
+        self.status = 'running'
+        self.seconds = None
+        self.stages = {}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """
+        Return the StageMetrics for a stage, creating it on first use.
+        """
+        with self._lock:
+            if name not in self.stages:
+                self.stages[name] = StageMetrics(name)
+            return self.stages[name]
+
+    def finish(self, status='ok'):
+        self.status = status
+        self.seconds = time.perf_counter() - self._started
+
+    def to_dict(self):
+        stages = [stage.to_dict() for stage in self.stages.values()]
+        return {
+            'data_dir': self.data_dir,
+            'started_at': self.started_at.isoformat(),
+            'status': self.status,
+            'seconds': round(self.seconds, 6) if self.seconds is not None else None,
+            'inserted': sum(stage['inserted'] for stage in stages),
+            'skipped': sum(stage['skipped'] for stage in stages),
+            'errors': sum(stage['errors'] for stage in stages),
+            'bytes_read': sum(stage['bytes_read'] for stage in stages),
+            'stages': stages,
+        }
+
+    def write_report(self, path):
+        """
+        Write the run report as JSON.
+        """
+        write_atomically(path, json.dumps(self.to_dict(), indent=2) + '\n')
+        logger.info("Run report written to %s", path)
+
+    def write_prometheus(self, path):
+        """
+        Write the run metrics in the Prometheus text exposition format.
+
+        The file is replaced atomically, as the node exporter textfile
+        collector requires.
+        """
+        lines = []
+
+        def metric(name, help_text, samples):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                label_text = ','.join(f'{key}="{label}"' for key, label in labels.items())
+                lines.append(f"{METRIC_PREFIX}_{name}{{{label_text}}} {value}" if labels else f"{METRIC_PREFIX}_{name} {value}")
+
+        stages = [stage.to_dict() for stage in self.stages.values()]
+        metric('run_success', "1 if the last run loaded every stage", [({}, int(self.status == 'ok'))])
+        metric('run_timestamp_seconds', "Start time of the last run", [({}, self.started_at.timestamp())])
+        metric('run_seconds', "Wall time of the last run", [({}, self.seconds)])
+        metric('stage_seconds', "Wall time of each stage", [
+            ({'stage': stage['stage']}, stage['seconds']) for stage in stages
+        ])
+        metric('stage_phase_seconds', "Time spent in each phase of a stage", [
+            ({'stage': stage['stage'], 'phase': phase}, seconds)
+            for stage in stages for phase, seconds in stage['phases'].items()
+        ])
+        metric('stage_rows', "Rows handled by each stage", [
+            ({'stage': stage['stage'], 'outcome': outcome}, stage[outcome])
+            for stage in stages for outcome in ('inserted', 'skipped', 'errors')
+        ])
+        metric('stage_rows_per_second', "Inserted plus skipped rows per second of stage time", [
+            ({'stage': stage['stage']}, stage['rows_per_second']) for stage in stages
+        ])
+        metric('stage_bytes_read', "Bytes of export file read by each stage", [
+            ({'stage': stage['stage']}, stage['bytes_read']) for stage in stages
+        ])
+        metric('stage_queries', "Statements run by each stage", [
+            ({'stage': stage['stage']}, stage['queries']) for stage in stages
+        ])
+        metric('stage_statement_latency_seconds', "Statement latency quantiles of each stage", [
+            ({'stage': stage['stage'], 'quantile': quantile}, _seconds(stage['statement_latency_ms'][key]))
+            for stage in stages for quantile, key in (('0.5', 'p50'), ('0.99', 'p99'))
+        ])
+        write_atomically(path, '\n'.join(lines) + '\n')
+        logger.info("Prometheus metrics written to %s", path)
+
+def _seconds(milliseconds):
+    return None if milliseconds is None else milliseconds / 1000
+
+def write_atomically(path, text):
+    """
+    Replace a file's contents so readers never see a partly written file.
+    """
+    path = Path(path)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    temp_path.write_text(text)
+    os.replace(temp_path, path)
+
+@contextmanager
+def measure_stage(stage_metrics):
+    """
+    Make stage_metrics the current stage and time the block as its wall time.
+
+    Does nothing if stage_metrics is None.
+    """
+    if stage_metrics is None:
+        yield None
+        return
+    token = _current_stage.set(stage_metrics)
+    started = time.perf_counter()
+    stage_metrics.status = 'running'
+    try:
+        yield stage_metrics
+        stage_metrics.status = 'ok'
+    except BaseException:
+        stage_metrics.status = 'failed'
+        raise
+    finally:
+        stage_metrics.seconds += time.perf_counter() - started
+        _current_stage.reset(token)
+
+@contextmanager
+def timed(phase):
+    """
+    Add the time spent in a block to a phase of the current stage.
+
+    Time spent in a nested timed block counts towards the inner phase only.
+    Can also decorate a function: @timed('load').
+    """
+    stage = _current_stage.get()
+    if stage is None:
+        yield
+        return
+    frame = [0.0]
+    stage._open_phases.append(frame)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        stage._open_phases.pop()
+        stage.phases[phase] = stage.phases.get(phase, 0.0) + elapsed - frame[0]
+        if stage._open_phases:
+            stage._open_phases[-1][0] += elapsed
+
+@contextmanager
+def _timed_statement():
+    stage = _current_stage.get()
+    if stage is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage.record_statement(time.perf_counter() - started)
+
+class InstrumentedCursor(psycopg.Cursor):
+    """
+    Cursor recording the latency of every statement in the current stage.
+
+    In pipeline mode execute() returns before the server answers, so those
+    statements are recorded as queued rather than with their full latency.
+    """
+
+    def execute(self, query, params=None, **kwargs):
+        with _timed_statement():
+            return super().execute(query, params, **kwargs)
+
+    def executemany(self, query, params_seq, **kwargs):
+        with _timed_statement():
+            return super().executemany(query, params_seq, **kwargs)
+
+    @contextmanager
+    def copy(self, statement, params=None, **kwargs):
+        with _timed_statement(), super().copy(statement, params, **kwargs) as copy:
+            yield copy
+
+class InstrumentedConnection(psycopg.Connection):
+    """
+    Connection whose cursors and commits are recorded in the current stage.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursor_factory = InstrumentedCursor
+
+    def commit(self):
+        stage = _current_stage.get()
+        with timed('commit'):
+            super().commit()
+        if stage is not None:
+            stage.commits += 1
@@ -0,0 +1,99 @@
+"""
+Concurrent loading of one export directory.
+
+The pipeline stages form a DAG: item selections need their orders, checks
+need payments and item selections, and so on, while menus, kitchen timings,
+cash entries and time entries depend on nothing. Each stage runs as soon as
+its dependencies have committed, on its own pooled connection, so independent
+files load at the same time instead of one after another.
+"""
+import asyncio
+import logging
+from pathlib import Path
+from toast_exports.config import PIPELINE_CONCURRENCY
+from toast_exports.pipeline import STAGES, load_export_manifest, run_stage
+
+logger = logging.getLogger(__name__)
+
+class StageSkipped(Exception):
+    """
+    Raised for a stage that did not run because a dependency failed.
+    """
+
+def _load_pooled_manifest(pool, data_dir):
+    with pool.connection() as conn:
+        return load_export_manifest(conn, data_dir)
+
+def _run_pooled_stage(pool, stage, pattern, processor, data_dir, export_date, manifest, cache, force, metrics):
+    """
+    Run one stage on a connection checked out of the pool.
+
+    The stage works on a fork of the dimension cache, merged back only once
+    its processor has committed.
+    """
+    stage_cache = cache.fork() if cache is not None else None
+    with pool.connection() as conn:
+        result = run_stage(
+            conn, stage, pattern, processor, data_dir, export_date, manifest, stage_cache, force, metrics
+        )
+    if cache is not None:
+        cache.merge(stage_cache)
+    return result
+
+async def run_export_concurrent(pool, data_dir, cache=None, force=False, concurrency=None, metrics=None):
+    """
+    Load one export directory, running independent stages concurrently.
+
+    The processors are synchronous psycopg code, so each stage runs in a
+    worker thread with its own connection from the pool. At most concurrency
+    stages run at once; the pool should allow at least that many connections.
+
+    Parameters:
+    - pool: psycopg_pool.ConnectionPool
+    - data_dir: export directory, e.g. sample_data/20240410
+    - cache: optional DimensionCache shared by the processors
+    - force: reload every file even if the manifest says it is unchanged
+    - concurrency: maximum stages running at once (defaults to PIPELINE_CONCURRENCY)
+    - metrics: optional RunMetrics recording per-stage timings and counters
+
+    Returns:
+    - dict: stage name -> (inserted count, skipped count, error count)
+
+    Raises:
+    - the first stage failure, in STAGES order, once every other stage has finished
+    """
+    data_dir = Path(data_dir)
+    semaphore = asyncio.Semaphore(concurrency or PIPELINE_CONCURRENCY)
+    export_date, manifest = await asyncio.to_thread(_load_pooled_manifest, pool, data_dir)
+
+    tasks = {}
+
+    async def run(stage, pattern, processor, depends_on):
+        outcomes = await asyncio.gather(*(tasks[dependency] for dependency in depends_on), return_exceptions=True)
+        failed = [dependency for dependency, outcome in zip(depends_on, outcomes) if isinstance(outcome, BaseException)]
+        if failed:
+            raise StageSkipped(f"{stage} skipped because {', '.join(failed)} failed")
+        async with semaphore:
+            return await asyncio.to_thread(
+                _run_pooled_stage, pool, stage, pattern, processor, data_dir, export_date, manifest, cache, force,
+                metrics
+            )
+
+    # STAGES lists dependencies first, so every dependency task exists already
+    for stage, pattern, processor, depends_on in STAGES:
+        tasks[stage] = asyncio.create_task(run(stage, pattern, processor, depends_on))
+    outcomes = await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    results = {}
+    errors = []
+    for stage, outcome in zip(tasks, outcomes):
+        if isinstance(outcome, StageSkipped):
+            logger.warning(str(outcome))
+        elif isinstance(outcome, BaseException):
+            logger.error("Error in %s stage: %s", stage, outcome, extra={'stage': stage})
+            errors.append(outcome)
+        else:
+            results[stage] = outcome
+    if errors:
+        raise errors[0]
+    return results
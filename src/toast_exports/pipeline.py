@@ -0,0 +1,128 @@
+"""
+Runs every file processor over one nightly export directory.
+"""
+import logging
+from datetime import datetime
+from pathlib import Path
+from toast_exports.db.manifest import file_fingerprint, load_manifest, record_load
+from toast_exports.metrics import measure_stage
+from toast_exports.file_processors.cash_entries_processor import process_cash_entries
+from toast_exports.file_processors.checks_processor import process_checks
+from toast_exports.file_processors.item_selections_processor import process_item_selections
+from toast_exports.file_processors.kitchen_timings_processor import process_kitchen_timings
+from toast_exports.file_processors.menu_processor import insert_menus_into_db
+from toast_exports.file_processors.modifier_selections_processor import process_modifier_selections
+from toast_exports.file_processors.orders_processor import process_orders
+from toast_exports.file_processors.payments_processor import process_payments
+from toast_exports.file_processors.time_entries_processor import process_time_entries
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR_FORMAT = '%Y%m%d'
+
+# (stage name, file pattern in the export directory, processor, stages it depends on),
+# in an order where every stage comes after its dependencies
+STAGES = [
+    ('menus', 'MenuExport_*.json', lambda conn, data_dir, cache: insert_menus_into_db(conn, data_dir), []),
+    ('orders', 'OrderDetails.csv', lambda conn, data_dir, cache: process_orders(conn, data_dir, cache=cache), []),
+    ('item_selections', 'ItemSelectionDetails.csv',
+     lambda conn, data_dir, cache: process_item_selections(conn, data_dir), ['orders']),
+    ('modifier_selections', 'ModifiersSelectionDetails.csv',
+     lambda conn, data_dir, cache: process_modifier_selections(conn, data_dir), ['item_selections']),
+    ('payments', 'PaymentDetails.csv',
+     lambda conn, data_dir, cache: process_payments(conn, data_dir, cache=cache), ['orders']),
+    ('checks', 'CheckDetails.csv',
+     lambda conn, data_dir, cache: process_checks(conn, data_dir), ['payments', 'item_selections']),
+    ('kitchen_timings', 'KitchenTimings.csv',
+     lambda conn, data_dir, cache: process_kitchen_timings(conn, data_dir, cache=cache), []),
+    ('cash_entries', 'CashEntries.csv',
+     lambda conn, data_dir, cache: process_cash_entries(conn, data_dir, cache=cache), []),
+    ('time_entries', 'TimeEntries.csv',
+     lambda conn, data_dir, cache: process_time_entries(conn, data_dir, cache=cache), []),
+]
+
+def parse_export_date(data_dir):
+    """
+    Return the export date encoded in a YYYYMMDD directory name, or None.
+    """
+    try:
+        return datetime.strptime(Path(data_dir).name, EXPORT_DIR_FORMAT).date()
+    except ValueError:
+        return None
+
+def run_export(conn, data_dir, cache=None, force=False, metrics=None):
+    """
+    Load one export directory through every processor, in dependency order.
+
+    Files whose content hash matches the load manifest entry for this export
+    date are skipped, so only new or changed files are reloaded. A file is
+    recorded in the manifest only when it loaded without errors, so files
+    with rejected or orphaned rows are loaded again on the next run.
+
+    Parameters:
+    - conn: psycopg connection object
+    - data_dir: export directory, e.g. sample_data/20240410
+    - cache: optional DimensionCache shared by the processors
+    - force: reload every file even if the manifest says it is unchanged
+    - metrics: optional RunMetrics recording per-stage timings and counters
+
+    Returns:
+    - dict: stage name -> (inserted count, skipped count, error count)
+    """
+    data_dir = Path(data_dir)
+    export_date, manifest = load_export_manifest(conn, data_dir)
+
+    results = {}
+    for stage, pattern, processor, _ in STAGES:
+        results[stage] = run_stage(
+            conn, stage, pattern, processor, data_dir, export_date, manifest, cache, force, metrics
+        )
+    return results
+
+def load_export_manifest(conn, data_dir):
+    """
+    Return the export date of a directory and its load manifest.
+
+    Directories not named YYYYMMDD have no export date and an empty manifest.
+    """
+    export_date = parse_export_date(data_dir)
+    if export_date is None:
+        logger.warning("%s is not named YYYYMMDD, loading without the load manifest", data_dir)
+        return None, {}
+    return export_date, load_manifest(conn, export_date)
+
+def run_stage(conn, stage, pattern, processor, data_dir, export_date, manifest, cache=None, force=False,
+              metrics=None):
+    """
+    Run one stage's processor on its file, unless the manifest says the file is unchanged.
+
+    With metrics, the stage's timings, statements and row counts are recorded
+    under the stage name.
+
+    Returns:
+    - tuple: (inserted count, skipped count, error count)
+    """
+    matches = sorted(Path(data_dir).glob(pattern))
+    if not matches:
+        logger.warning("No %s file found in %s, skipping %s", pattern, data_dir, stage, extra={'stage': stage})
+        return 0, 0, 0
+    path = matches[0]
+
+    content_hash, file_size = file_fingerprint(path)
+    if not force and manifest.get(path.name) == content_hash:
+        logger.info("%s unchanged since last load, skipping %s", path.name, stage, extra={'stage': stage})
+        return 0, 0, 0
+
+    logger.info("Processing %s data from %s...", stage, path, extra={'stage': stage})
+    stage_metrics = metrics.stage(stage) if metrics is not None else None
+    with measure_stage(stage_metrics):
+        result = processor(conn, data_dir, cache)
+        if export_date is not None and result[2] == 0:
+            record_load(conn, export_date, path.name, content_hash, file_size, sum(result))
+        elif export_date is not None:
+            logger.warning("%s loaded with %d errors, not recording it in the load manifest", path.name, result[2],
+                       extra={'stage': stage, 'error_count': result[2]})
+    if stage_metrics is not None:
+        stage_metrics.bytes_read = file_size
+        stage_metrics.record_result(result)
+    return result
@@ -0,0 +1,148 @@
+"""
+Streaming CSV readers that keep memory bounded for large export files.
+
+Files are read in chunks sized from a memory budget, so each chunk can be
+transformed and loaded before the next one is read and peak memory stays
+flat no matter how big the file is.
+
+Given a schema (see toast_exports.schemas), only the schema's columns are
+read, each with its declared dtype. With CSV_ENGINE=pyarrow the file is
+parsed by pyarrow's multithreaded streaming reader instead of pandas' own.
+"""
+import logging
+from pathlib import Path
+import pandas as pd
+from toast_exports.config import CSV_ENGINE, CSV_MEMORY_BUDGET_MB
+from toast_exports.metrics import timed
+from toast_exports.schemas import schema_dtypes
+
+logger = logging.getLogger(__name__)
+
+# Rows read up front to measure the in-memory size of a row
+SAMPLE_ROWS = 1000
+
+# A chunk is held several times over while it is processed: the raw frame,
+# the transformed frame and the rows being copied
+CHUNK_MEMORY_OVERHEAD = 4
+
+MIN_CHUNK_ROWS = 100
+
+def estimate_chunk_rows(path, memory_budget_mb=None, **read_csv_kwargs):
+    """
+    Work out how many rows of a CSV file fit in the memory budget.
+
+    Parameters:
+    - path: CSV file path
+    - memory_budget_mb: memory budget for one chunk in MB (defaults to CSV_MEMORY_BUDGET_MB)
+    - read_csv_kwargs: extra arguments passed to pd.read_csv
+
+    Returns:
+    - int: rows per chunk
+    """
+    memory_budget_mb = memory_budget_mb or CSV_MEMORY_BUDGET_MB
+    sample = pd.read_csv(path, nrows=SAMPLE_ROWS, **read_csv_kwargs)
+    if sample.empty:
+        return MIN_CHUNK_ROWS
+    bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+    chunk_rows = int(memory_budget_mb * 1024 * 1024 / (bytes_per_row * CHUNK_MEMORY_OVERHEAD))
+    return max(MIN_CHUNK_ROWS, chunk_rows)
+
+def schema_read_options(path, schema):
+    """
+    Work out which schema columns a CSV file has.
+
+    Parameters:
+    - path: CSV file path
+    - schema: list of schemas.Column
+
+    Returns:
+    - tuple: (pd.read_csv usecols and dtype arguments for the columns in the
+      file, list of nullable schema columns the file does not have)
+
+    Raises:
+    - ValueError: if the file lacks a column that may not be blank
+    """
+    header = set(pd.read_csv(path, nrows=0).columns)
+    present = [column for column in schema if column.name in header]
+    absent = [column for column in schema if column.name not in header]
+    required = [column.name for column in absent if not column.nullable]
+    if required:
+        raise ValueError(f"{Path(path).name} is missing required columns: {', '.join(required)}")
+    options = {
+        'usecols': [column.name for column in present],
+        'dtype': schema_dtypes(present),
+    }
+    return options, absent
+
+def iter_csv_chunks(path, memory_budget_mb=None, schema=None, engine=None, **read_csv_kwargs):
+    """
+    Read a CSV file as a sequence of DataFrames that fit in the memory budget.
+
+    The next chunk is only read once the caller asks for it, so processing a
+    chunk fully before moving on keeps at most one chunk in memory.
+
+    Parameters:
+    - path: CSV file path
+    - memory_budget_mb: memory budget for one chunk in MB (defaults to CSV_MEMORY_BUDGET_MB)
+    - schema: optional list of schemas.Column; only these columns are read,
+      with their dtypes, and missing nullable columns come back all blank
+    - engine: 'c' or 'pyarrow' (defaults to CSV_ENGINE)
+    - read_csv_kwargs: extra arguments passed to pd.read_csv, overriding the schema
+
+    Yields:
+    - DataFrame: the next chunk of rows
+    """
+    absent = []
+    if schema is not None:
+        schema_options, absent = schema_read_options(path, schema)
+        read_csv_kwargs = {**schema_options, **read_csv_kwargs}
+
+    if (engine or CSV_ENGINE) == 'pyarrow':
+        chunks = _iter_pyarrow_chunks(path, memory_budget_mb, **read_csv_kwargs)
+    else:
+        chunks = _iter_pandas_chunks(path, memory_budget_mb, **read_csv_kwargs)
+
+    while True:
+        with timed('read'):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        for column in absent:
+            chunk[column.name] = pd.Series(None, index=chunk.index, dtype=column.dtype)
+        yield chunk
+
+def _iter_pandas_chunks(path, memory_budget_mb, **read_csv_kwargs):
+    chunk_rows = estimate_chunk_rows(path, memory_budget_mb, **read_csv_kwargs)
+    logger.debug("Reading %s in chunks of %s rows", path, chunk_rows)
+    with pd.read_csv(path, chunksize=chunk_rows, **read_csv_kwargs) as reader:
+        yield from reader
+
+def _iter_pyarrow_chunks(path, memory_budget_mb, usecols=None, dtype=None):
+    """
+    Read a CSV file in blocks with pyarrow's streaming reader.
+
+    Every column is read as text and cast to its dtype by pandas, so ids are
+    converted exactly as with the default engine. A block holds about the
+    memory budget divided by CHUNK_MEMORY_OVERHEAD of file.
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError as e:
+        raise ImportError("CSV_ENGINE=pyarrow needs pyarrow: pip install 'toast-exports-etl[arrow]'") from e
+
+    memory_budget_mb = memory_budget_mb or CSV_MEMORY_BUDGET_MB
+    block_size = max(1024 * 1024, memory_budget_mb * 1024 * 1024 // CHUNK_MEMORY_OVERHEAD)
+    convert_options = pa_csv.ConvertOptions(
+        column_types={name: pa.string() for name in dtype or {}},
+        strings_can_be_null=True,
+    )
+    if usecols is not None:
+        convert_options.include_columns = list(usecols)
+    logger.debug("Reading %s with pyarrow in blocks of %s bytes", path, block_size)
+    with pa_csv.open_csv(
+        path, read_options=pa_csv.ReadOptions(block_size=block_size), convert_options=convert_options
+    ) as reader:
+        for batch in reader:
+            frame = batch.to_pandas()
+            yield frame.astype(dtype) if dtype else frame
@@ -0,0 +1,250 @@
+"""
+Column schemas of the Toast CSV export files.
+
+Each file's schema lists only the columns the pipeline loads, with the dtype
+it is read as, whether it may be blank, the format it is parsed with and the
+load-ready column it ends up in. Readers use the schema to skip every other
+column and to read codes as categories and text as strings, so nothing
+is type-inferred and 18-digit Toast ids never pass through float64.
+
+A value that does not parse as its column's dtype fails the read, so only
+numbers that are never checked row by row are read as numbers. Ids and
+amounts that the processors validate, dates, durations and free text are
+read as strings and parsed in the transforms, where a bad value rejects
+one row instead of the whole file.
+"""
+from collections import namedtuple
+from toast_exports.transforms.parsing import (
+    TOAST_TIMESTAMP_FORMAT,
+    CHECK_DATE_FORMAT,
+    CHECK_TIME_FORMAT,
+)
+
+# One column of an export file:
+# - name: header in the CSV file
+# - dtype: pandas dtype the column is read as
+# - nullable: whether values may be blank; a column that may not be blank
+#   must also be present in the file, while a missing nullable column is
+#   read as all blank
+# - parse_format: strptime format of date and time columns read as strings
+# - target: load-ready column produced from it, if any
+Column = namedtuple('Column', ['name', 'dtype', 'nullable', 'parse_format', 'target'], defaults=(True, None, None))
+
+# Columns read as category hold a handful of distinct values repeated on every row
+ORDER_DETAILS_SCHEMA = [
+    Column('Location', 'category', False, target='location'),
+    Column('Order Id', 'string', False, target='order_id'),
+    Column('Order #', 'string', False, target='order_number'),
+    Column('Opened', 'string', False, TOAST_TIMESTAMP_FORMAT, 'opened_at'),
+    Column('# of Guests', 'string', target='guest_count'),
+    Column('Tab Names', 'string', target='tab_names'),
+    Column('Server', 'string', target='server'),
+    Column('Table', 'string', target='table_number'),
+    Column('Revenue Center', 'category', target='revenue_center'),
+    Column('Dining Area', 'category', target='dining_area'),
+    Column('Service', 'category', target='service_period'),
+    Column('Dining Options', 'category', target='dining_option'),
+    Column('Discount Amount', 'Float64', target='discount_amount'),
+    Column('Amount', 'string', False, target='subtotal'),
+    Column('Tax', 'string', False, target='tax'),
+    Column('Tip', 'Float64', target='tip'),
+    Column('Gratuity', 'Float64', target='gratuity'),
+    Column('Total', 'string', False, target='total'),
+    Column('Voided', 'string', target='is_voided'),
+    Column('Paid', 'string', True, TOAST_TIMESTAMP_FORMAT, 'paid_at'),
+    Column('Closed', 'string', True, TOAST_TIMESTAMP_FORMAT, 'closed_at'),
+    Column('Duration (Opened to Paid)', 'string', target='duration_minutes'),
+    Column('Order Source', 'category', target='order_source'),
+]
+
+CHECK_DETAILS_SCHEMA = [
+    Column('Customer Id', 'string', target='customer_id'),
+    Column('Customer', 'string', target='customer_name'),
+    Column('Customer Phone', 'string', target='customer_phone'),
+    Column('Customer Email', 'string', target='customer_email'),
+    Column('Location Code', 'string', target='location_code'),
+    Column('Opened Date', 'string', True, CHECK_DATE_FORMAT, 'opened_date'),
+    Column('Opened Time', 'string', True, CHECK_TIME_FORMAT, 'opened_time'),
+    Column('Item Description', 'string', target='item_description'),
+    Column('Tax', 'Float64', target='tax'),
+    Column('Tender', 'category', target='tender'),
+    Column('Check Id', 'string', False, target='check_id'),
+    Column('Check #', 'string', False, target='check_number'),
+    Column('Total', 'string', False, target='total'),
+    Column('Customer Family', 'string', target='customer_family'),
+    Column('Table Size', 'Int64', target='table_size'),
+    Column('Discount', 'Float64', target='discount'),
+    Column('Reason of Discount', 'category', target='discount_reason'),
+    Column('Link', 'string', target='receipt_link'),
+]
+
+ITEM_SELECTION_DETAILS_SCHEMA = [
+    Column('Order Id', 'string', False, target='order_id'),
+    Column('Sent Date', 'string', True, TOAST_TIMESTAMP_FORMAT, 'sent_at'),
+    Column('Order Date', 'string', True, TOAST_TIMESTAMP_FORMAT, 'ordered_at'),
+    Column('Check Id', 'string', False, target='check_id'),
+    Column('Item Selection Id', 'string', False, target='item_selection_id'),
+    Column('Item Id', 'Int64', target='item_id'),
+    Column('Master Id', 'Int64', target='master_id'),
+    Column('SKU', 'string', target='sku'),
+    Column('PLU', 'string', target='plu'),
+    Column('Menu Item', 'string', False, target='menu_item'),
+    Column('Menu Subgroup(s)', 'category', target='menu_subgroup'),
+    Column('Menu Group', 'category', target='menu_group'),
+    Column('Menu', 'category', target='menu'),
+    Column('Sales Category', 'category', target='sales_category'),
+    Column('Gross Price', 'Float64', target='gross_price'),
+    Column('Discount', 'Float64', target='discount'),
+    Column('Net Price', 'Float64', target='net_price'),
+    Column('Qty', 'string', False, target='quantity'),
+    Column('Tax', 'Float64', target='tax'),
+    Column('Void?', 'string', target='is_voided'),
+    Column('Deferred', 'string', target='is_deferred'),
+    Column('Tax Exempt', 'string', target='is_tax_exempt'),
+    Column('Tax Inclusion Option', 'category', target='tax_inclusion'),
+    Column('Dining Option Tax', 'category', target='dining_option_tax'),
+    Column('Tab Name', 'string', target='tab_name'),
+]
+
+# Modifier ids are written in scientific notation by the export, so they are
+# read as strings and converted exactly by parse_ids
+MODIFIER_SELECTION_DETAILS_SCHEMA = [
+    Column('Sent Date', 'string', True, TOAST_TIMESTAMP_FORMAT, 'sent_at'),
+    Column('Order Date', 'string', True, TOAST_TIMESTAMP_FORMAT, 'ordered_at'),
+    Column('Check Id', 'string', False, target='check_id'),
+    Column('Item Selection Id', 'string', False, target='modifier_selection_id'),
+    Column('Modifier Id', 'string', target='modifier_id'),
+    Column('Master Id', 'string', target='master_id'),
+    Column('Modifier SKU', 'string', target='sku'),
+    Column('Modifier PLU', 'string', target='plu'),
+    Column('Modifier', 'string', False, target='modifier'),
+    Column('Option Group ID', 'string', target='option_group_id'),
+    Column('Option Group Name', 'category', target='option_group_name'),
+    Column('Parent Menu Selection Item ID', 'string', False, target='parent_item_id'),
+    Column('Sales Category', 'category', target='sales_category'),
+    Column('Gross Price', 'Float64', target='gross_price'),
+    Column('Discount', 'Float64', target='discount'),
+    Column('Net Price', 'Float64', target='net_price'),
+    Column('Qty', 'string', False, target='quantity'),
+    Column('Void?', 'string', target='is_voided'),
+    Column('Void Reason ID', 'string', target='void_reason_id'),
+    Column('Void Reason', 'category', target='void_reason'),
+]
+
+PAYMENT_DETAILS_SCHEMA = [
+    Column('Payment Id', 'string', False, target='payment_id'),
+    Column('Order Id', 'string', False, target='order_id'),
+    Column('Paid Date', 'string', False, TOAST_TIMESTAMP_FORMAT, 'paid_at'),
+    Column('Order Date', 'string', True, TOAST_TIMESTAMP_FORMAT, 'ordered_at'),
+    Column('Check Id', 'string', False, target='check_id'),
+    Column('Check #', 'string', target='check_number'),
+    Column('Tab Name', 'string', target='tab_name'),
+    Column('House Acct #', 'string', target='house_account'),
+    Column('Amount', 'string', False, target='amount'),
+    Column('Tip', 'Float64', target='tip'),
+    Column('Gratuity', 'Float64', target='gratuity'),
+    Column('Total', 'string', False, target='total'),
+    Column('Swiped Card Amount', 'Float64', target='swiped_card_amount'),
+    Column('Keyed Card Amount', 'Float64', target='keyed_card_amount'),
+    Column('Amount Tendered', 'Float64', target='amount_tendered'),
+    Column('Refunded', 'category', target='refund_status'),
+    Column('Refund Date', 'string', True, TOAST_TIMESTAMP_FORMAT, 'refunded_at'),
+    Column('Refund Amount', 'Float64', target='refund_amount'),
+    Column('Refund Tip Amount', 'Float64', target='refund_tip_amount'),
+    Column('Void User', 'string', target='void_user'),
+    Column('Void Approver', 'string', target='void_approver'),
+    Column('Void Date', 'string', True, TOAST_TIMESTAMP_FORMAT, 'voided_at'),
+    Column('Status', 'category', False, target='status'),
+    Column('Type', 'category', False, target='payment_type'),
+    Column('Cash Drawer', 'category', target='cash_drawer'),
+    Column('Card Type', 'category', target='card_type'),
+    Column('Other Type', 'category', target='other_type'),
+    Column('Email', 'string', target='email'),
+    Column('Phone', 'string', target='phone'),
+    Column('Last 4 Card Digits', 'string', target='card_last_4'),
+    Column('V/MC/D Fees', 'Float64', target='card_fees'),
+    Column('Room Info', 'string', target='room_info'),
+    Column('Receipt', 'string', target='receipt'),
+    Column('Source', 'category', target='source'),
+]
+
+KITCHEN_TIMINGS_SCHEMA = [
+    Column('Location', 'category', False, target='location'),
+    Column('ID', 'string', False, target='ticket_id'),
+    Column('Server', 'string', target='server'),
+    Column('Check #', 'string', target='check_number'),
+    Column('Table', 'string', target='table_number'),
+    Column('Check Opened', 'string', True, TOAST_TIMESTAMP_FORMAT, 'check_opened_at'),
+    Column('Station', 'category', target='station'),
+    Column('Expediter Level', 'Int64', target='expediter_level'),
+    Column('Fired Date', 'string', False, TOAST_TIMESTAMP_FORMAT, 'fired_at'),
+    Column('Fulfilled Date', 'string', True, TOAST_TIMESTAMP_FORMAT, 'fulfilled_at'),
+    Column('Fulfillment Time', 'string', target='fulfillment_seconds'),
+    Column('Fulfilled By', 'string', target='fulfilled_by'),
+]
+
+CASH_ENTRIES_SCHEMA = [
+    Column('Location', 'category', False, target='location'),
+    Column('Entry Id', 'string', False, target='entry_id'),
+    Column('Created Date', 'string', False, TOAST_TIMESTAMP_FORMAT, 'created_at'),
+    Column('Action', 'category', False, target='action'),
+    Column('Amount', 'string', False, target='amount'),
+    Column('Cash Drawer', 'category', target='cash_drawer'),
+    Column('Payout Reason', 'category', target='payout_reason'),
+    Column('No Sale Reason', 'category', target='no_sale_reason'),
+    Column('Comment', 'string', target='comment'),
+    Column('Employee', 'string', target='employee'),
+    Column('Employee 2', 'string', target='employee_2'),
+]
+
+# Time entries are staged without a transform module, so targets are the
+# time_entries staging columns and the dimension columns they resolve to.
+# Employee and job ids are read as strings and parsed with parse_ids by
+# validate_time_entries, so a bad id rejects its row instead of the read.
+TIME_ENTRIES_SCHEMA = [
+    Column('Location', 'string', False, target='location_id'),
+    Column('Employee Id', 'string', False, target='employee_id'),
+    Column('Employee GUID', 'string', False),
+    Column('Employee External Id', 'string'),
+    Column('Employee', 'string', False),
+    Column('Job Id', 'string', False, target='job_id'),
+    Column('Job GUID', 'string', False),
+    Column('Job Code', 'string'),
+    Column('Job Title', 'string'),
+    Column('In Date', 'string', False, TOAST_TIMESTAMP_FORMAT, 'in_date'),
+    Column('Out Date', 'string', False, TOAST_TIMESTAMP_FORMAT, 'out_date'),
+    Column('Auto Clock-out', 'string', target='auto_clock_out'),
+    Column('Total Hours', 'Float64', target='total_hours'),
+    Column('Unpaid Break Time', 'Float64', target='unpaid_break_time'),
+    Column('Paid Break Time', 'Float64', target='paid_break_time'),
+    Column('Payable Hours', 'Float64', target='payable_hours'),
+    Column('Cash Tips Declared', 'Float64', target='cash_tips_declared'),
+    Column('Non Cash Tips', 'Float64', target='non_cash_tips'),
+    Column('Total Gratuity', 'Float64', target='total_gratuity'),
+    Column('Total Tips', 'Float64', target='total_tips'),
+    Column('Tips Withheld', 'Float64', target='tips_withheld'),
+    Column('Wage', 'Float64', target='wage'),
+    Column('Regular Hours', 'Float64', target='regular_hours'),
+    Column('Overtime Hours', 'Float64', target='overtime_hours'),
+    Column('Regular Pay', 'Float64', target='regular_pay'),
+    Column('Overtime Pay', 'Float64', target='overtime_pay'),
+    Column('Total Pay', 'Float64', target='total_pay'),
+]
+
+# Export file name -> schema
+SCHEMAS = {
+    'OrderDetails.csv': ORDER_DETAILS_SCHEMA,
+    'CheckDetails.csv': CHECK_DETAILS_SCHEMA,
+    'ItemSelectionDetails.csv': ITEM_SELECTION_DETAILS_SCHEMA,
+    'ModifiersSelectionDetails.csv': MODIFIER_SELECTION_DETAILS_SCHEMA,
+    'PaymentDetails.csv': PAYMENT_DETAILS_SCHEMA,
+    'KitchenTimings.csv': KITCHEN_TIMINGS_SCHEMA,
+    'CashEntries.csv': CASH_ENTRIES_SCHEMA,
+    'TimeEntries.csv': TIME_ENTRIES_SCHEMA,
+}
+
+def schema_dtypes(schema):
+    """
+    Return the column -> dtype map of a schema, as passed to pd.read_csv.
+    """
+    return {column.name: column.dtype for column in schema}
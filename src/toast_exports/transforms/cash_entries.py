@@ -0,0 +1,66 @@
+"""
+Vectorized transform of CashEntries.csv into load-ready cash drawer entry columns.
+"""
+import pandas as pd
+from toast_exports.schemas import CASH_ENTRIES_SCHEMA, schema_dtypes
+from toast_exports.transforms.parsing import (
+    parse_timestamps,
+    parse_numbers,
+    parse_ids,
+    normalize_nulls,
+)
+from toast_exports.utils.name_formatter import format_names
+
+# dtypes used when reading the file, from the CashEntries.csv schema. Entry
+# ids and amounts are read as strings and parsed here, so a bad value
+# rejects its row instead of failing the read.
+CASH_ENTRY_DTYPES = schema_dtypes(CASH_ENTRIES_SCHEMA)
+
+# Load-ready columns produced by transform_cash_entries. location, employee
+# and employee_2 are natural keys that the loader maps to surrogate ids;
+# employee and employee_2 are the names as spelled in the file,
+# employee_name and employee_2_name their formatted forms.
+CASH_ENTRY_COLUMNS = [
+    'location',
+    'employee',
+    'employee_2',
+    'employee_name',
+    'employee_2_name',
+    'entry_id',
+    'created_at',
+    'action',
+    'amount',
+    'cash_drawer',
+    'payout_reason',
+    'no_sale_reason',
+    'comment',
+]
+
+def transform_cash_entries(df):
+    """
+    Transform a CashEntries DataFrame into load-ready cash drawer entry columns.
+
+    Employee names are formatted once per distinct name rather than per row.
+
+    Parameters:
+    - df: CashEntries DataFrame read with CASH_ENTRY_DTYPES
+
+    Returns:
+    - DataFrame: one column per CASH_ENTRY_COLUMNS entry, same index as df
+    """
+    transformed = pd.DataFrame({
+        'location': df['Location'],
+        'employee': df['Employee'],
+        'employee_2': df['Employee 2'],
+        'employee_name': format_names(df['Employee']),
+        'employee_2_name': format_names(df['Employee 2']),
+        'entry_id': parse_ids(df['Entry Id']),
+        'created_at': parse_timestamps(df['Created Date']),
+        'action': df['Action'],
+        'amount': parse_numbers(df['Amount']),
+        'cash_drawer': df['Cash Drawer'],
+        'payout_reason': df['Payout Reason'],
+        'no_sale_reason': df['No Sale Reason'],
+        'comment': df['Comment'],
+    }, index=df.index)
+    return normalize_nulls(transformed)
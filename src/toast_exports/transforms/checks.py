@@ -0,0 +1,73 @@
+"""
+Vectorized transform of CheckDetails.csv into load-ready check columns.
+"""
+import pandas as pd
+from toast_exports.schemas import CHECK_DETAILS_SCHEMA, schema_dtypes
+from toast_exports.transforms.parsing import (
+    CHECK_DATE_FORMAT,
+    CHECK_TIME_FORMAT,
+    parse_timestamps,
+    parse_numbers,
+    parse_ids,
+    normalize_nulls,
+)
+
+# dtypes used when reading the file, from the CheckDetails.csv schema. Check ids
+# and totals are read as strings and parsed here, and customer fields stay
+# strings so phone numbers and ids keep leading zeros.
+CHECK_DTYPES = schema_dtypes(CHECK_DETAILS_SCHEMA)
+
+# Load-ready columns produced by transform_check_details. check_id is the
+# Toast check id the loader uses to find the parent order.
+CHECK_COLUMNS = [
+    'check_id',
+    'check_number',
+    'customer_id',
+    'customer_name',
+    'customer_phone',
+    'customer_email',
+    'customer_family',
+    'location_code',
+    'opened_date',
+    'opened_time',
+    'item_description',
+    'table_size',
+    'discount',
+    'discount_reason',
+    'tax',
+    'tender',
+    'total',
+    'receipt_link',
+]
+
+def transform_check_details(df):
+    """
+    Transform a CheckDetails DataFrame into load-ready check columns.
+
+    Parameters:
+    - df: CheckDetails DataFrame read with CHECK_DTYPES
+
+    Returns:
+    - DataFrame: one column per CHECK_COLUMNS entry, same index as df
+    """
+    transformed = pd.DataFrame({
+        'check_id': parse_ids(df['Check Id']),
+        'check_number': df['Check #'],
+        'customer_id': df['Customer Id'],
+        'customer_name': df['Customer'],
+        'customer_phone': df['Customer Phone'],
+        'customer_email': df['Customer Email'],
+        'customer_family': df['Customer Family'],
+        'location_code': df['Location Code'],
+        'opened_date': parse_timestamps(df['Opened Date'], CHECK_DATE_FORMAT).dt.date,
+        'opened_time': parse_timestamps(df['Opened Time'], CHECK_TIME_FORMAT).dt.time,
+        'item_description': df['Item Description'],
+        'table_size': parse_numbers(df['Table Size'], 'Int64'),
+        'discount': parse_numbers(df['Discount']),
+        'discount_reason': df['Reason of Discount'],
+        'tax': parse_numbers(df['Tax']),
+        'tender': df['Tender'],
+        'total': parse_numbers(df['Total']),
+        'receipt_link': df['Link'],
+    }, index=df.index)
+    return normalize_nulls(transformed)
@@ -0,0 +1,90 @@
+"""
+Vectorized transform of ItemSelectionDetails.csv into load-ready item columns.
+"""
+import pandas as pd
+from toast_exports.schemas import ITEM_SELECTION_DETAILS_SCHEMA, schema_dtypes
+from toast_exports.transforms.parsing import (
+    parse_timestamps,
+    parse_booleans,
+    parse_numbers,
+    parse_ids,
+    normalize_nulls,
+)
+
+# dtypes used when reading the file, from the ItemSelectionDetails.csv schema.
+# Toast ids are 18 digits, so they are never read through float64: optional
+# ids are read straight into Int64, and the validated ids and Qty are read
+# as strings and parsed here, so a bad value rejects only its row.
+ITEM_SELECTION_DTYPES = schema_dtypes(ITEM_SELECTION_DETAILS_SCHEMA)
+
+# Load-ready columns produced by transform_item_selections. order_id is the
+# Toast order id, which the loader maps to the orders surrogate key.
+ITEM_SELECTION_COLUMNS = [
+    'order_id',
+    'check_id',
+    'item_selection_id',
+    'item_id',
+    'master_id',
+    'sent_at',
+    'ordered_at',
+    'sku',
+    'plu',
+    'menu_item',
+    'menu_subgroup',
+    'menu_group',
+    'menu',
+    'sales_category',
+    'gross_price',
+    'discount',
+    'net_price',
+    'quantity',
+    'tax',
+    'is_voided',
+    'is_deferred',
+    'is_tax_exempt',
+    'tax_inclusion',
+    'dining_option_tax',
+    'tab_name',
+]
+
+def transform_item_selections(df):
+    """
+    Transform an ItemSelectionDetails DataFrame into load-ready item columns.
+
+    Order-level columns (location, server, table, dining area) are left out;
+    they are already stored on the parent order.
+
+    Parameters:
+    - df: ItemSelectionDetails DataFrame as read from the CSV
+
+    Returns:
+    - DataFrame: one column per ITEM_SELECTION_COLUMNS entry, same index as df
+    """
+    transformed = pd.DataFrame({
+        'order_id': parse_ids(df['Order Id']),
+        'check_id': parse_ids(df['Check Id']),
+        'item_selection_id': parse_ids(df['Item Selection Id']),
+        'item_id': parse_numbers(df['Item Id'], 'Int64'),
+        'master_id': parse_numbers(df['Master Id'], 'Int64'),
+        'sent_at': parse_timestamps(df['Sent Date']),
+        'ordered_at': parse_timestamps(df['Order Date']),
+        'sku': df['SKU'],
+        'plu': df['PLU'],
+        'menu_item': df['Menu Item'],
+        'menu_subgroup': df['Menu Subgroup(s)'],
+        'menu_group': df['Menu Group'],
+        'menu': df['Menu'],
+        'sales_category': df['Sales Category'],
+        'gross_price': parse_numbers(df['Gross Price']),
+        'discount': parse_numbers(df['Discount']),
+        'net_price': parse_numbers(df['Net Price']),
+        'quantity': parse_numbers(df['Qty']),
+        'tax': parse_numbers(df['Tax']),
+        'is_voided': parse_booleans(df['Void?']),
+        'is_deferred': parse_booleans(df['Deferred']),
+        'is_tax_exempt': parse_booleans(df['Tax Exempt']),
+        'tax_inclusion': df['Tax Inclusion Option'],
+        'dining_option_tax': df['Dining Option Tax'],
+        'tab_name': df['Tab Name'],
+    }, index=df.index)
+    return normalize_nulls(transformed)
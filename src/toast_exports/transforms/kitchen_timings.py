@@ -0,0 +1,69 @@
+"""
+Vectorized transform of KitchenTimings.csv into load-ready ticket timing columns.
+"""
+import pandas as pd
+from toast_exports.schemas import KITCHEN_TIMINGS_SCHEMA, schema_dtypes
+from toast_exports.transforms.parsing import (
+    parse_timestamps,
+    parse_duration_seconds,
+    parse_numbers,
+    parse_ids,
+    normalize_nulls,
+)
+from toast_exports.utils.name_formatter import format_names
+
+# dtypes used when reading the file, from the KitchenTimings.csv schema.
+# Ticket ids are read as strings and converted with parse_ids.
+KITCHEN_TIMING_DTYPES = schema_dtypes(KITCHEN_TIMINGS_SCHEMA)
+
+# Load-ready columns produced by transform_kitchen_timings. location, server
+# and fulfilled_by are natural keys that the loader maps to surrogate ids;
+# server and fulfilled_by are the names as spelled in the file, server_name
+# and fulfilled_by_name their formatted forms.
+KITCHEN_TIMING_COLUMNS = [
+    'location',
+    'server',
+    'fulfilled_by',
+    'server_name',
+    'fulfilled_by_name',
+    'ticket_id',
+    'check_number',
+    'table_number',
+    'check_opened_at',
+    'station',
+    'expediter_level',
+    'fired_at',
+    'fulfilled_at',
+    'fulfillment_seconds',
+]
+
+def transform_kitchen_timings(df):
+    """
+    Transform a KitchenTimings DataFrame into load-ready ticket timing columns.
+
+    'Fulfillment Time' strings such as '25 minutes and 39 seconds' are
+    converted to integer seconds with one regex extraction over the column.
+
+    Parameters:
+    - df: KitchenTimings DataFrame read with KITCHEN_TIMING_DTYPES
+
+    Returns:
+    - DataFrame: one column per KITCHEN_TIMING_COLUMNS entry, same index as df
+    """
+    transformed = pd.DataFrame({
+        'location': df['Location'],
+        'server': df['Server'],
+        'fulfilled_by': df['Fulfilled By'],
+        'server_name': format_names(df['Server']),
+        'fulfilled_by_name': format_names(df['Fulfilled By']),
+        'ticket_id': parse_ids(df['ID']),
+        'check_number': df['Check #'],
+        'table_number': df['Table'],
+        'check_opened_at': parse_timestamps(df['Check Opened']),
+        'station': df['Station'],
+        'expediter_level': parse_numbers(df['Expediter Level'], 'Int64'),
+        'fired_at': parse_timestamps(df['Fired Date']),
+        'fulfilled_at': parse_timestamps(df['Fulfilled Date']),
+        'fulfillment_seconds': parse_duration_seconds(df['Fulfillment Time']),
+    }, index=df.index)
+    return normalize_nulls(transformed)
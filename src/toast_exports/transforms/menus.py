@@ -0,0 +1,121 @@
+"""
+Streaming walk of the MenuExport JSON hierarchy into normalized menu entity rows.
+
+The export is a JSON array of menus. Each menu holds menu groups, groups hold
+sub-groups and menu items, items hold modifier groups, and modifier groups
+hold modifiers, which are themselves menu items and may carry further
+modifier groups. Menu items, modifier groups and modifiers are shared, so the
+same GUID can appear many times in one file.
+"""
+import ijson
+
+# Child collection keys at each level, in the order they are tried. V1
+# exports use the first spelling, V2 exports the second.
+GROUP_KEYS = ('groups', 'menuGroups')
+SUBGROUP_KEYS = ('subgroups', 'menuGroups')
+ITEM_KEYS = ('items', 'menuItems')
+MODIFIER_GROUP_KEYS = ('optionGroups', 'modifierGroups')
+MODIFIER_KEYS = ('options', 'items', 'modifierOptions')
+
+# Entity name -> (row columns, number of leading columns that identify a row).
+# Rows are deduplicated on their key columns while streaming.
+MENU_ENTITIES = {
+    'menu_groups': (['guid', 'menu_guid', 'parent_guid', 'name', 'description', 'id_string'], 1),
+    'menu_items': (['guid', 'name', 'description', 'id_string', 'price', 'sku', 'plu'], 1),
+    'menu_group_items': (['group_guid', 'item_guid'], 2),
+    'modifier_groups': (['guid', 'name', 'id_string', 'min_selections', 'max_selections'], 1),
+    'item_modifier_groups': (['item_guid', 'modifier_group_guid'], 2),
+    'modifier_group_options': (['modifier_group_guid', 'item_guid'], 2),
+}
+
+def iter_menus(path):
+    """
+    Stream the top-level menus of a MenuExport file one at a time.
+
+    Only the menu currently being processed is held in memory. Numbers are
+    returned as Decimal, so prices are not rounded through float.
+
+    Parameters:
+    - path: MenuExport JSON file path
+
+    Yields:
+    - dict: one menu and everything below it
+    """
+    with open(path, 'rb') as file:
+        yield from ijson.items(file, 'item')
+
+def iter_menu_entity_rows(path, entity):
+    """
+    Stream the distinct rows of one entity type from a MenuExport file.
+
+    Parameters:
+    - path: MenuExport JSON file path
+    - entity: a MENU_ENTITIES key
+
+    Yields:
+    - tuple: one row per distinct key, in MENU_ENTITIES column order
+    """
+    _, key_length = MENU_ENTITIES[entity]
+    seen = set()
+    for menu in iter_menus(path):
+        for row_entity, row in walk_menu(menu):
+            if row_entity != entity:
+                continue
+            key = row[:key_length]
+            if key in seen:
+                continue
+            seen.add(key)
+            yield row
+
+def walk_menu(menu):
+    """
+    Yield (entity, row) pairs for every group, item, modifier group and link below a menu.
+
+    Nodes without a GUID cannot be stored and are skipped with their children.
+    """
+    menu_guid = menu.get('guid')
+    if not menu_guid:
+        return
+    for group in _children(menu, GROUP_KEYS):
+        yield from _walk_group(group, menu_guid, None)
+
+def _walk_group(group, menu_guid, parent_guid):
+    guid = group.get('guid')
+    if not guid:
+        return
+    yield 'menu_groups', (
+        guid, menu_guid, parent_guid, group.get('name'), group.get('description'), group.get('idString'),
+    )
+    for item in _children(group, ITEM_KEYS):
+        if item.get('guid'):
+            yield 'menu_group_items', (guid, item['guid'])
+            yield from _walk_item(item)
+    for subgroup in _children(group, SUBGROUP_KEYS):
+        yield from _walk_group(subgroup, menu_guid, guid)
+
+def _walk_item(item):
+    guid = item['guid']
+    yield 'menu_items', (
+        guid, item.get('name'), item.get('description'), item.get('idString'),
+        item.get('price'), item.get('sku'), item.get('plu'),
+    )
+    for modifier_group in _children(item, MODIFIER_GROUP_KEYS):
+        modifier_group_guid = modifier_group.get('guid')
+        if not modifier_group_guid:
+            continue
+        yield 'item_modifier_groups', (guid, modifier_group_guid)
+        yield 'modifier_groups', (
+            modifier_group_guid, modifier_group.get('name'), modifier_group.get('idString'),
+            modifier_group.get('minSelections'), modifier_group.get('maxSelections'),
+        )
+        for modifier in _children(modifier_group, MODIFIER_KEYS):
+            if modifier.get('guid'):
+                yield 'modifier_group_options', (modifier_group_guid, modifier['guid'])
+                yield from _walk_item(modifier)
+
+def _children(node, keys):
+    for key in keys:
+        children = node.get(key)
+        if isinstance(children, list):
+            return children
+    return []
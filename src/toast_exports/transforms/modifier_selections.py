@@ -0,0 +1,77 @@
+"""
+Vectorized transform of ModifiersSelectionDetails.csv into load-ready modifier columns.
+"""
+import pandas as pd
+from toast_exports.schemas import MODIFIER_SELECTION_DETAILS_SCHEMA, schema_dtypes
+from toast_exports.transforms.parsing import (
+    parse_timestamps,
+    parse_booleans,
+    parse_numbers,
+    parse_ids,
+    normalize_nulls,
+)
+
+# dtypes used when reading the file, from the ModifiersSelectionDetails.csv
+# schema. Id columns are read as strings and converted with parse_ids:
+# Modifier Id, Master Id and Option Group ID are written in scientific
+# notation by the export, so the default float64 parsing would lose digits.
+MODIFIER_SELECTION_DTYPES = schema_dtypes(MODIFIER_SELECTION_DETAILS_SCHEMA)
+
+# Load-ready columns produced by transform_modifier_selections. check_id and
+# parent_item_id identify the parent item selection the loader links to.
+MODIFIER_SELECTION_COLUMNS = [
+    'modifier_selection_id',
+    'check_id',
+    'parent_item_id',
+    'modifier_id',
+    'master_id',
+    'option_group_id',
+    'option_group_name',
+    'sent_at',
+    'ordered_at',
+    'sku',
+    'plu',
+    'modifier',
+    'sales_category',
+    'gross_price',
+    'discount',
+    'net_price',
+    'quantity',
+    'is_voided',
+    'void_reason_id',
+    'void_reason',
+]
+
+def transform_modifier_selections(df):
+    """
+    Transform a ModifiersSelectionDetails DataFrame into load-ready modifier columns.
+
+    Parameters:
+    - df: ModifiersSelectionDetails DataFrame read with MODIFIER_SELECTION_DTYPES
+
+    Returns:
+    - DataFrame: one column per MODIFIER_SELECTION_COLUMNS entry, same index as df
+    """
+    transformed = pd.DataFrame({
+        'modifier_selection_id': parse_ids(df['Item Selection Id']),
+        'check_id': parse_ids(df['Check Id']),
+        'parent_item_id': parse_ids(df['Parent Menu Selection Item ID']),
+        'modifier_id': parse_ids(df['Modifier Id']),
+        'master_id': parse_ids(df['Master Id']),
+        'option_group_id': parse_ids(df['Option Group ID']),
+        'option_group_name': df['Option Group Name'],
+        'sent_at': parse_timestamps(df['Sent Date']),
+        'ordered_at': parse_timestamps(df['Order Date']),
+        'sku': df['Modifier SKU'],
+        'plu': df['Modifier PLU'],
+        'modifier': df['Modifier'],
+        'sales_category': df['Sales Category'],
+        'gross_price': parse_numbers(df['Gross Price']),
+        'discount': parse_numbers(df['Discount']),
+        'net_price': parse_numbers(df['Net Price']),
+        'quantity': parse_numbers(df['Qty']),
+        'is_voided': parse_booleans(df['Void?']),
+        'void_reason_id': parse_ids(df['Void Reason ID']),
+        'void_reason': df['Void Reason'],
+    }, index=df.index)
+    return normalize_nulls(transformed)
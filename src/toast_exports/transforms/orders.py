@@ -0,0 +1,85 @@
+"""
+Vectorized transform of OrderDetails.csv into load-ready order columns.
+"""
+import pandas as pd
+from toast_exports.transforms.parsing import (
+    parse_timestamps,
+    parse_duration_minutes,
+    parse_booleans,
+    parse_numbers,
+    parse_ids,
+    normalize_nulls,
+)
+from toast_exports.utils.name_formatter import format_names
+
+# Load-ready columns produced by transform_order_details. location and
+# server are natural keys that the loader maps to surrogate ids; server is
+# the name as spelled in the file and server_name its formatted form.
+ORDER_COLUMNS = [
+    'location',
+    'server',
+    'server_name',
+    'order_id',
+    'order_number',
+    'opened_at',
+    'closed_at',
+    'paid_at',
+    'guest_count',
+    'tab_names',
+    'table_number',
+    'revenue_center',
+    'dining_area',
+    'service_period',
+    'dining_option',
+    'discount_amount',
+    'subtotal',
+    'tax',
+    'tip',
+    'gratuity',
+    'total',
+    'is_voided',
+    'duration_minutes',
+    'order_source',
+]
+
+def transform_order_details(df):
+    """
+    Transform an OrderDetails DataFrame into load-ready order columns in one pass.
+
+    Timestamps are parsed with the explicit Toast format, 'Duration (Opened
+    to Paid)' is converted with pd.to_timedelta, booleans are normalized and
+    every missing value comes back as None.
+
+    Parameters:
+    - df: OrderDetails DataFrame as read from the CSV
+
+    Returns:
+    - DataFrame: one column per ORDER_COLUMNS entry, same index as df
+    """
+    transformed = pd.DataFrame({
+        'location': df['Location'],
+        'server': df['Server'],
+        'server_name': format_names(df['Server']),
+        'order_id': parse_ids(df['Order Id']),
+        'order_number': df['Order #'],
+        'opened_at': parse_timestamps(df['Opened']),
+        'closed_at': parse_timestamps(df['Closed']),
+        'paid_at': parse_timestamps(df['Paid']),
+        'guest_count': parse_numbers(df['# of Guests'], 'Int64'),
+        'tab_names': df['Tab Names'],
+        'table_number': df['Table'],
+        'revenue_center': df['Revenue Center'],
+        'dining_area': df['Dining Area'],
+        'service_period': df['Service'],
+        'dining_option': df['Dining Options'],
+        'discount_amount': parse_numbers(df['Discount Amount']),
+        'subtotal': parse_numbers(df['Amount']),
+        'tax': parse_numbers(df['Tax']),
+        'tip': parse_numbers(df['Tip']),
+        'gratuity': parse_numbers(df['Gratuity']),
+        'total': parse_numbers(df['Total']),
+        'is_voided': parse_booleans(df['Voided']),
+        'duration_minutes': parse_duration_minutes(df['Duration (Opened to Paid)']),
+        'order_source': df['Order Source'],
+    }, index=df.index)
+    return normalize_nulls(transformed)
@@ -0,0 +1,118 @@
+"""
+Vectorized parsers for the value formats used across Toast export files.
+
+Every function takes and returns a pandas Series (or DataFrame) and never
+touches the database, so transforms built on them can be unit tested with
+plain DataFrames.
+"""
+from decimal import Decimal, InvalidOperation
+import pandas as pd
+
+# Timestamps in the CSV exports look like '4/10/24 4:26 PM'
+TOAST_TIMESTAMP_FORMAT = '%m/%d/%y %I:%M %p'
+
+# CheckDetails.csv splits them into 'Opened Date' and 'Opened Time', e.g. '4/10/24' and '4:27 PM'
+CHECK_DATE_FORMAT = '%m/%d/%y'
+CHECK_TIME_FORMAT = '%I:%M %p'
+
+# Spelled-out durations in KitchenTimings.csv look like '25 minutes and 39 seconds'
+SPELLED_DURATION_PATTERN = (
+    r'^\s*(?:(?P<hours>\d+)\s+hours?)?'
+    r'(?:\s*(?:,|and)?\s*(?P<minutes>\d+)\s+minutes?)?'
+    r'(?:\s*(?:,|and)?\s*(?P<seconds>\d+)\s+seconds?)?\s*$'
+)
+
+BOOLEAN_VALUES = {
+    True: True,
+    False: False,
+    'True': True,
+    'False': False,
+    'true': True,
+    'false': False,
+    'Yes': True,
+    'No': False,
+}
+
+def parse_timestamps(series, format=TOAST_TIMESTAMP_FORMAT):
+    """
+    Parse a column of Toast timestamps with an explicit format.
+
+    Values that do not match the format become NaT.
+    """
+    return pd.to_datetime(series, format=format, errors='coerce')
+
+def parse_duration_minutes(series):
+    """
+    Convert 'HH:MM:SS' durations to whole minutes, dropping the seconds.
+
+    Values that cannot be parsed become <NA>.
+    """
+    durations = pd.to_timedelta(series, errors='coerce')
+    return (durations.dt.total_seconds() // 60).astype('Int64')
+
+def parse_duration_seconds(series):
+    """
+    Convert spelled-out durations ('1 hour, 2 minutes and 5 seconds') to whole seconds.
+
+    Every unit is optional. Values that do not match become <NA>.
+    """
+    parts = series.astype('string').str.extract(SPELLED_DURATION_PATTERN).astype('Float64')
+    seconds = parts['hours'].fillna(0) * 3600 + parts['minutes'].fillna(0) * 60 + parts['seconds'].fillna(0)
+    return seconds.where(parts.notna().any(axis=1)).astype('Int64')
+
+def parse_booleans(series):
+    """
+    Convert True/False and Yes/No columns to a nullable boolean column.
+
+    Unrecognised values become <NA>.
+    """
+    return series.map(BOOLEAN_VALUES).astype('boolean')
+
+def parse_numbers(series, dtype='Float64'):
+    """
+    Convert a column to a nullable numeric dtype; unparseable values become <NA>.
+
+    For an integer dtype, values with a fractional part are unparseable too.
+    Use parse_ids for Toast ids, which are too long to pass through float64.
+    """
+    numbers = pd.to_numeric(series, errors='coerce')
+    if pd.api.types.is_integer_dtype(dtype):
+        numbers = numbers.where(numbers.isna() | (numbers % 1 == 0))
+    return numbers.astype(dtype)
+
+def parse_ids(series):
+    """
+    Convert a column of Toast ids, read as strings, to Int64 without going through float64.
+
+    Plain digit strings are converted directly. Some exports write ids in
+    scientific notation ('9.000000000690304e+17'); those are converted exactly
+    from their text with Decimal, although the exporter has already rounded
+    them. Anything else becomes <NA>.
+    """
+    text = series.astype('string').str.strip()
+    ids = pd.Series(pd.NA, index=series.index, dtype='Int64')
+    plain = text.str.fullmatch(r'\d+', na=False)
+    ids[plain] = text[plain].astype('Int64')
+    other = text.notna() & ~plain
+    if other.any():
+        ids[other] = text[other].map(_decimal_id).astype('Int64')
+    return ids
+
+def _decimal_id(value):
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        return pd.NA
+    if not number.is_finite() or number != number.to_integral_value():
+        return pd.NA
+    return int(number)
+
+def normalize_nulls(df):
+    """
+    Return an object-typed copy of the frame with NaN, NaT and <NA> replaced by None.
+
+    numpy scalars are converted to the equivalent Python values, so rows can
+    be handed straight to psycopg.
+    """
+    frame = df.astype(object)
+    return frame.where(pd.notna(frame), None)
@@ -0,0 +1,107 @@
+"""
+Vectorized transform of PaymentDetails.csv into load-ready payment columns.
+"""
+import pandas as pd
+from toast_exports.schemas import PAYMENT_DETAILS_SCHEMA, schema_dtypes
+from toast_exports.transforms.parsing import (
+    parse_timestamps,
+    parse_numbers,
+    parse_ids,
+    normalize_nulls,
+)
+
+# dtypes used when reading the file, from the PaymentDetails.csv schema. Ids
+# and the validated amounts are read as strings and parsed here, and card
+# digits and phone numbers stay strings so leading zeros are kept.
+PAYMENT_DTYPES = schema_dtypes(PAYMENT_DETAILS_SCHEMA)
+
+# Load-ready columns produced by transform_payments. order_id and check_id are
+# Toast ids; payment_type, status and card_type are names the loader maps to
+# code table ids.
+PAYMENT_COLUMNS = [
+    'payment_id',
+    'order_id',
+    'check_id',
+    'check_number',
+    'paid_at',
+    'ordered_at',
+    'tab_name',
+    'house_account',
+    'amount',
+    'tip',
+    'gratuity',
+    'total',
+    'swiped_card_amount',
+    'keyed_card_amount',
+    'amount_tendered',
+    'refund_status',
+    'refunded_at',
+    'refund_amount',
+    'refund_tip_amount',
+    'void_user',
+    'void_approver',
+    'voided_at',
+    'status',
+    'payment_type',
+    'cash_drawer',
+    'card_type',
+    'other_type',
+    'email',
+    'phone',
+    'card_last_4',
+    'card_fees',
+    'room_info',
+    'receipt',
+    'source',
+]
+
+def transform_payments(df):
+    """
+    Transform a PaymentDetails DataFrame into load-ready payment columns.
+
+    Order-level columns (location, server, table, dining area) are left out;
+    they are already stored on the parent order.
+
+    Parameters:
+    - df: PaymentDetails DataFrame read with PAYMENT_DTYPES
+
+    Returns:
+    - DataFrame: one column per PAYMENT_COLUMNS entry, same index as df
+    """
+    transformed = pd.DataFrame({
+        'payment_id': parse_ids(df['Payment Id']),
+        'order_id': parse_ids(df['Order Id']),
+        'check_id': parse_ids(df['Check Id']),
+        'check_number': df['Check #'],
+        'paid_at': parse_timestamps(df['Paid Date']),
+        'ordered_at': parse_timestamps(df['Order Date']),
+        'tab_name': df['Tab Name'],
+        'house_account': df['House Acct #'],
+        'amount': parse_numbers(df['Amount']),
+        'tip': parse_numbers(df['Tip']),
+        'gratuity': parse_numbers(df['Gratuity']),
+        'total': parse_numbers(df['Total']),
+        'swiped_card_amount': parse_numbers(df['Swiped Card Amount']),
+        'keyed_card_amount': parse_numbers(df['Keyed Card Amount']),
+        'amount_tendered': parse_numbers(df['Amount Tendered']),
+        'refund_status': df['Refunded'],
+        'refunded_at': parse_timestamps(df['Refund Date']),
+        'refund_amount': parse_numbers(df['Refund Amount']),
+        'refund_tip_amount': parse_numbers(df['Refund Tip Amount']),
+        'void_user': df['Void User'],
+        'void_approver': df['Void Approver'],
+        'voided_at': parse_timestamps(df['Void Date']),
+        'status': df['Status'],
+        'payment_type': df['Type'],
+        'cash_drawer': df['Cash Drawer'],
+        'card_type': df['Card Type'],
+        'other_type': df['Other Type'],
+        'email': df['Email'],
+        'phone': df['Phone'],
+        'card_last_4': df['Last 4 Card Digits'],
+        'card_fees': parse_numbers(df['V/MC/D Fees']),
+        'room_info': df['Room Info'],
+        'receipt': df['Receipt'],
+        'source': df['Source'],
+    }, index=df.index)
+    return normalize_nulls(transformed)
@@ -1,6 +1,16 @@
 """
 Utility functions for formatting names consistently across the application.
+
+Export files repeat the same few dozen employee names over thousands of
+rows, so format_names formats each distinct value of a column once, and
+cached_format_name remembers recent results for code that formats one value
+at a time.
 """
+from functools import lru_cache
+import pandas as pd
+
+# Distinct spellings remembered by cached_format_name
+NAME_CACHE_SIZE = 4096
 
 def format_name(name):
     """
@@ -34,4 +44,25 @@ def format_name(name):
     # Take the last word as the last name, join all other words as first name
     last_name = parts[-1]
     first_name = ' '.join(parts[:-1])
-    return f"{last_name}, {first_name}" 
\ No newline at end of file
+    return f"{last_name}, {first_name}"
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def cached_format_name(name):
+    """
+    format_name with a bounded LRU cache of recently formatted names.
+    """
+    return format_name(name)
+
+def format_names(names):
+    """
+    Format a column of names, formatting each distinct value only once.
+
+    Parameters:
+    - names: Series of names as spelled in an export file
+
+    Returns:
+    - Series: formatted names with the same index; missing names stay missing
+    """
+    distinct = pd.Series(names.dropna().unique())
+    mapping = dict(zip(distinct, distinct.map(cached_format_name)))
+    return names.map(mapping)
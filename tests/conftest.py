@@ -0,0 +1,42 @@
+import pytest
+from unittest.mock import MagicMock
+
+# Staging column types that COPY only accepts whole numbers for
+INTEGER_TYPES = ('SMALLINT', 'INT', 'BIGINT')
+
+
+@pytest.fixture
+def mock_connection():
+    """Create a mock database connection with cursor for testing."""
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    return mock_conn, mock_cursor
+
+
+@pytest.fixture
+def copied_rows(mock_connection):
+    """
+    Return a function listing the rows written with COPY on the mock cursor.
+
+    Given the staging columns as (name, type) pairs, each row is returned as
+    a dict, and every integer column is checked to hold an int or None: a
+    float such as 7.0 is rejected by COPY into an INT column.
+    """
+    _, mock_cursor = mock_connection
+    copy = mock_cursor.copy.return_value.__enter__.return_value
+
+    def rows(staging_columns=None):
+        written = [call.args[0] for call in copy.write_row.call_args_list]
+        if staging_columns is None:
+            return written
+        staged = []
+        for row in written:
+            assert len(row) == len(staging_columns)
+            for (name, column_type), value in zip(staging_columns, row):
+                if column_type in INTEGER_TYPES:
+                    assert value is None or type(value) is int, f"{name} staged as {value!r}"
+            staged.append(dict(zip([name for name, _ in staging_columns], row)))
+        return staged
+
+    return rows
@@ -0,0 +1,106 @@
+import json
+import logging
+import pytest
+from datetime import date
+from unittest.mock import patch, MagicMock
+
+from toast_exports import backfill
+from toast_exports.backfill import find_export_dirs, _load_export
+
+
+@pytest.fixture
+def export_root(tmp_path):
+    """Create a directory of dated exports plus some unrelated entries."""
+    for name in ("20240409", "20240410", "20240411", "not-a-date"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "OrderDetails.csv").write_text("Location\n")
+    (tmp_path / "20240412").write_text("a file, not an export directory")
+    return tmp_path
+
+
+@pytest.fixture
+def worker_state():
+    """Install a mock connection pool and cache as the worker's state."""
+    conn = MagicMock()
+    pool = MagicMock()
+    pool.connection.return_value.__enter__.return_value = conn
+    with patch.object(backfill, '_worker_pool', pool), \
+            patch.object(backfill, '_worker_cache', MagicMock()) as cache:
+        yield conn, cache
+
+
+def test_find_export_dirs_filters_by_date(export_root):
+    """Only YYYYMMDD directories inside the inclusive range are returned, in date order."""
+    export_dirs = find_export_dirs(export_root, date(2024, 4, 10), date(2024, 4, 12))
+
+    assert export_dirs == [
+        (date(2024, 4, 10), export_root / "20240410"),
+        (date(2024, 4, 11), export_root / "20240411"),
+    ]
+
+
+def test_find_export_dirs_without_bounds(export_root):
+    """Without bounds every dated export directory is returned."""
+    assert [export_date for export_date, _ in find_export_dirs(export_root)] == [
+        date(2024, 4, 9), date(2024, 4, 10), date(2024, 4, 11),
+    ]
+
+
+@patch('toast_exports.backfill.run_export')
+def test_load_export_sums_stage_counts(mock_run_export, export_root, worker_state):
+    """Stage counts are summed into the per-day result."""
+    mock_run_export.return_value = {'orders': (30, 2, 1), 'time_entries': (5, 0, 0)}
+
+    result = _load_export(date(2024, 4, 10), export_root / "20240410")
+
+    assert (result['inserted'], result['skipped'], result['errors']) == (35, 2, 1)
+    assert result['bytes'] > 0
+    assert result['error'] is None
+
+
+@patch('toast_exports.backfill.run_export')
+def test_load_export_records_failures(mock_run_export, export_root, worker_state):
+    """A failed day is rolled back and reported instead of stopping the backfill."""
+    conn, cache = worker_state
+    mock_run_export.side_effect = RuntimeError("connection lost")
+
+    result = _load_export(date(2024, 4, 10), export_root / "20240410")
+
+    assert result['error'] == "connection lost"
+    conn.rollback.assert_called_once()
+    cache.invalidate.assert_called_once()
+
+
+def test_write_backfill_report(tmp_path):
+    """The report lists every day and fails if any day failed."""
+    results = [
+        {'export_date': date(2024, 4, 10), 'inserted': 3, 'skipped': 1, 'errors': 0, 'bytes': 10,
+         'error': None, 'seconds': 0.5},
+        {'export_date': date(2024, 4, 11), 'inserted': 0, 'skipped': 0, 'errors': 0, 'bytes': 10,
+         'error': "connection lost", 'seconds': 0.1},
+    ]
+    path = tmp_path / "report.json"
+
+    backfill.write_backfill_report(results, path)
+
+    report = json.loads(path.read_text())
+    assert report['status'] == 'failed'
+    assert (report['inserted'], report['skipped']) == (3, 1)
+    assert [export['export_date'] for export in report['exports']] == ['2024-04-10', '2024-04-11']
+
+
+def test_log_throughput_summary(caplog):
+    """One line per day plus totals, with the counts as structured fields."""
+    results = [
+        {'export_date': date(2024, 4, 10), 'inserted': 3, 'skipped': 1, 'errors': 0, 'bytes': 2_000_000,
+         'error': None, 'seconds': 2.0},
+    ]
+
+    with caplog.at_level(logging.INFO):
+        backfill.log_throughput_summary(results, 2.0)
+
+    day, totals = caplog.records[-2:]
+    assert day.getMessage().split() == ['2024-04-10', '3', '1', '0', '2.00', '2', '1.00', 'ok']
+    assert day.inserted == 3
+    assert totals.getMessage() == "Loaded 1/1 exports, 4 rows in 2.00s (2 rows/s overall)"
+    assert totals.failed_exports == 0
@@ -0,0 +1,91 @@
+import pytest
+import pandas as pd
+from io import StringIO
+from unittest.mock import patch
+
+from toast_exports.db.dimension_cache import DimensionCache
+from toast_exports.file_processors.cash_entries_processor import (
+    CASH_ENTRY_STAGING_COLUMNS,
+    validate_cash_entries,
+    load_cash_entries_bulk,
+)
+from toast_exports.transforms.cash_entries import CASH_ENTRY_DTYPES
+from toast_exports.utils import name_formatter
+
+SAMPLE_CASH_ENTRY_DATA = """Location,Entry Id,Created Date,Action,Amount,Cash Drawer,Payout Reason,No Sale Reason,Comment,Employee,Employee 2
+1234 Elmwood Avenue,900000004019194181,4/10/24 4:28 PM,CASH_PAYMENT,2.0,Bar-1 Receipt,,,Cash payment,Bartender A,
+1234 Elmwood Avenue,900000004028246086,4/10/24 10:26 PM,TIP_OUT,-11.39,Bar-1 Receipt,,,Tips paid out from shift review.,Bartender A,Server B
+1234 Elmwood Avenue,900000004028246087,4/10/24 10:27 PM,NO_SALE,,Bar-1 Receipt,,,Opened drawer,Bartender A,
+"""
+
+
+@pytest.fixture
+def sample_df():
+    """Create a sample CashEntries DataFrame for testing."""
+    return pd.read_csv(StringIO(SAMPLE_CASH_ENTRY_DATA), dtype=CASH_ENTRY_DTYPES)
+
+
+def test_validate_cash_entries_formats_each_name_once(sample_df):
+    """format_name runs once per distinct employee name, not once per row."""
+    name_formatter.cached_format_name.cache_clear()
+    try:
+        with patch.object(name_formatter, 'format_name', side_effect=lambda name: name.upper()) as mock_format:
+            entries, errors = validate_cash_entries(sample_df)
+    finally:
+        name_formatter.cached_format_name.cache_clear()
+
+    assert mock_format.call_count == 2
+    assert list(entries['employee_2_name']) == [None, "SERVER B"]
+    assert errors == [("900000004028246087", "missing or invalid Amount")]
+
+
+def test_load_cash_entries_bulk_refreshes_summary(mock_connection, copied_rows, sample_df):
+    """New entries are merged and the touched drawer days are recomputed."""
+    mock_conn, mock_cursor = mock_connection
+    cache = DimensionCache()
+    cache.update('locations', {"1234 Elmwood Avenue": 1})
+    cache.update('employee_aliases', {"Bartender A": 7, "Server B": 8})
+    mock_cursor.rowcount = 2
+
+    entries, _ = validate_cash_entries(sample_df)
+    result = load_cash_entries_bulk(mock_conn, entries, cache)
+
+    assert result == (2, 0)
+    cash_payment, tip_out = copied_rows(CASH_ENTRY_STAGING_COLUMNS)
+    assert (cash_payment['location_id'], cash_payment['employee_id'], cash_payment['employee_2_id']) == (1, 7, None)
+    assert cash_payment['entry_id'] == 900000004019194181
+    assert cash_payment['amount'] == 2.0
+    assert (tip_out['employee_id'], tip_out['employee_2_id']) == (7, 8)
+    assert tip_out['action'] == "TIP_OUT"
+    assert tip_out['amount'] == -11.39
+    summary_sql = mock_cursor.execute.call_args_list[-1].args[0]
+    assert "INSERT INTO cash_drawer_daily_summary" in summary_sql
+    assert "ON CONFLICT (location_id, cash_drawer, business_date) DO UPDATE" in summary_sql
+
+
+def test_load_cash_entries_bulk_skips_refresh_when_nothing_new(mock_connection, sample_df):
+    """Reloading entries that already exist does not touch the summary."""
+    mock_conn, mock_cursor = mock_connection
+    cache = DimensionCache()
+    cache.update('locations', {"1234 Elmwood Avenue": 1})
+    cache.update('employee_aliases', {"Bartender A": 7, "Server B": 8})
+    mock_cursor.rowcount = 0
+
+    entries, _ = validate_cash_entries(sample_df)
+
+    assert load_cash_entries_bulk(mock_conn, entries, cache) == (0, 2)
+    assert "cash_drawer_daily_summary" not in mock_cursor.execute.call_args_list[-1].args[0]
+
+
+def test_load_cash_entries_bulk_partly_blank_employee_2(mock_connection, copied_rows, sample_df):
+    """A blank Employee 2 on some rows still stages integer ids, not 8.0."""
+    mock_conn, mock_cursor = mock_connection
+    cache = DimensionCache()
+    cache.update('locations', {"1234 Elmwood Avenue": 1})
+    cache.update('employee_aliases', {"Bartender A": 7, "Server B": 8})
+    mock_cursor.rowcount = 2
+
+    entries, _ = validate_cash_entries(sample_df)
+    load_cash_entries_bulk(mock_conn, entries, cache)
+
+    assert [row['employee_2_id'] for row in copied_rows(CASH_ENTRY_STAGING_COLUMNS)] == [None, 8]
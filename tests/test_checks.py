@@ -0,0 +1,73 @@
+import pytest
+import pandas as pd
+from datetime import date, time
+from io import StringIO
+
+from toast_exports.file_processors.checks_processor import (
+    CHECK_STAGING_COLUMNS,
+    validate_checks,
+    load_checks_bulk,
+    process_checks,
+)
+from toast_exports.transforms.checks import CHECK_DTYPES
+
+SAMPLE_CHECK_DATA = """Customer Id,Customer,Customer Phone,Customer Email,Location Code,Opened Date,Opened Time,Item Description,Server,Tax,Tender,Check Id,Check #,Total,Customer Family,Table Size,Discount,Reason of Discount,Link
+,,,,,4/10/24,4:27 PM,"Tenderloin, Tenderloin, Cheese Curds",Bartender A,0.69,Cash,900000004019159010,1,11.69,,1,11.0,Employee Discount - Check (50.00%),http://www.toasttab.com/receipts/zFAL5xUfLveDnRh3/yYBPtztIyXfP2JuX
+,,,,,4/10/24,4:28 PM,"Keystone Light, Can",Bartender A,0.12,Cash,900000004019190488,2,2.0,,1,0.0,,http://www.toasttab.com/receipts/uL4zg76If9qgDZsl/73zj8OcXLxECm5i7
+,,,,,,,,Bartender A,0.0,,900000004026110086,30,0.0,,1,0.0,,
+"""
+
+
+@pytest.fixture
+def sample_df():
+    """Create a sample CheckDetails DataFrame for testing."""
+    return pd.read_csv(StringIO(SAMPLE_CHECK_DATA), dtype=CHECK_DTYPES)
+
+
+def test_validate_checks_parses_dates_and_times(sample_df):
+    """Opened Date and Opened Time are parsed column-wise; blanks become None."""
+    checks, errors = validate_checks(sample_df)
+
+    assert errors == []
+    assert list(checks['opened_date']) == [date(2024, 4, 10), date(2024, 4, 10), None]
+    assert list(checks['opened_time']) == [time(16, 27), time(16, 28), None]
+
+
+def test_load_checks_bulk_copies_and_links_payments(mock_connection, copied_rows, sample_df):
+    """Checks are merged in one statement and waiting payments are linked."""
+    mock_conn, mock_cursor = mock_connection
+    mock_cursor.rowcount = 1
+
+    checks, _ = validate_checks(sample_df)
+    checks = checks.iloc[:2].assign(order_id=[10, 11])
+
+    assert load_checks_bulk(mock_conn, checks) == (1, 1)
+    first, second = copied_rows(CHECK_STAGING_COLUMNS)
+    assert (first['order_id'], first['check_id'], first['check_number']) == (10, 900000004019159010, "1")
+    assert (first['opened_date'], first['opened_time']) == (date(2024, 4, 10), time(16, 27))
+    assert (first['table_size'], first['tax'], first['total']) == (1, 0.69, 11.69)
+    assert first['discount_reason'] == "Employee Discount - Check (50.00%)"
+    assert second['customer_name'] is None
+    merge_sql = mock_cursor.execute.call_args_list[-2].args[0]
+    assert "ON CONFLICT (check_id) DO NOTHING" in merge_sql
+    update_sql = mock_cursor.execute.call_args_list[-1].args[0]
+    assert "UPDATE payments" in update_sql
+    mock_conn.commit.assert_called_once()
+
+
+def test_process_checks_counts_orphans(mock_connection, copied_rows, sample_df, monkeypatch):
+    """Checks without a parent order are not staged and count as errors."""
+    mock_conn, mock_cursor = mock_connection
+    monkeypatch.setattr('toast_exports.file_processors.checks_processor.iter_csv_chunks',
+                        lambda path, memory_budget_mb, schema: iter([sample_df]))
+    mock_cursor.fetchall.return_value = [(900000004019159010, 10), (900000004019190488, 11)]
+    mock_cursor.rowcount = 2
+
+    result = process_checks(mock_conn, "sample_data/20240410")
+
+    assert result == (2, 0, 1)
+    staged = copied_rows(CHECK_STAGING_COLUMNS)
+    assert [(row['order_id'], row['check_id']) for row in staged] == [
+        (10, 900000004019159010), (11, 900000004019190488),
+    ]
+    assert mock_conn.commit.call_count == 2  # parent order lookup, then checks
@@ -0,0 +1,40 @@
+from unittest.mock import patch, MagicMock
+
+from toast_exports import config
+from toast_exports.config import configure_session, make_pool, session_settings
+
+
+def test_session_settings_only_turn_off_synchronous_commit_for_bulk():
+    """Bulk sessions use the configured synchronous_commit, other sessions keep the server default."""
+    with patch.object(config, 'DB_BULK_SYNCHRONOUS_COMMIT', 'off'), \
+            patch.object(config, 'DB_WORK_MEM', '64MB'), \
+            patch.object(config, 'DB_STATEMENT_TIMEOUT', ''):
+        assert session_settings() == {'work_mem': '64MB'}
+        assert session_settings(bulk=True) == {'work_mem': '64MB', 'synchronous_commit': 'off'}
+
+
+def test_session_settings_override_synchronous_commit():
+    """An explicit synchronous_commit wins over the bulk default."""
+    with patch.object(config, 'DB_BULK_SYNCHRONOUS_COMMIT', 'on'):
+        assert session_settings(bulk=True, synchronous_commit='off')['synchronous_commit'] == 'off'
+
+
+def test_configure_session_sets_each_setting():
+    """Each setting is applied with set_config at session level, then committed."""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+
+    configure_session(conn, {'work_mem': '64MB', 'statement_timeout': '5min'})
+
+    assert [call.args[1] for call in cursor.execute.call_args_list] == [
+        ('work_mem', '64MB'), ('statement_timeout', '5min'),
+    ]
+    conn.commit.assert_called_once()
+
+
+def test_make_pool_is_created_closed():
+    """The pool is returned closed, with max_size never below min_size."""
+    pool = make_pool(min_size=2, max_size=1, db_url="postgresql://localhost/test")
+
+    assert pool.closed
+    assert (pool.min_size, pool.max_size) == (2, 2)
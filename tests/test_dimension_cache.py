@@ -0,0 +1,80 @@
+import logging
+from unittest.mock import MagicMock
+
+from toast_exports.db.dimension_cache import DimensionCache, DIMENSION_QUERIES
+
+
+def test_warm_runs_one_select_per_dimension(mock_connection):
+    """Warming issues one SELECT per dimension table."""
+    mock_conn, mock_cursor = mock_connection
+    mock_cursor.fetchall.return_value = [("1234 Elmwood Avenue", 1)]
+
+    cache = DimensionCache()
+    cache.warm(mock_conn)
+
+    assert mock_cursor.execute.call_count == len(DIMENSION_QUERIES)
+    assert cache.get('locations', "1234 Elmwood Avenue") == 1
+
+
+def test_get_counts_hits_and_misses():
+    """Lookups are counted as hits or misses."""
+    cache = DimensionCache()
+    cache.put('employees', "A, Bartender", 7)
+
+    assert cache.get('employees', "A, Bartender") == 7
+    assert cache.get('employees', "A, Cook") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_resolve_only_loads_misses():
+    """The loader is only asked for keys that are not cached, and its results are cached."""
+    cache = DimensionCache()
+    cache.put('jobs', 1, 10)
+    loader = MagicMock(return_value={2: 20})
+
+    ids = cache.resolve('jobs', [1, 2], loader)
+
+    assert ids == {1: 10, 2: 20}
+    loader.assert_called_once_with([2])
+    assert cache.get('jobs', 2) == 20
+
+
+def test_invalidate_drops_cached_ids():
+    """Invalidation forgets ids that a rollback may have discarded."""
+    cache = DimensionCache()
+    cache.put('locations', "1234 Elmwood Avenue", 1)
+
+    cache.invalidate()
+
+    assert cache.get('locations', "1234 Elmwood Avenue") is None
+    assert cache.invalidations == 1
+
+
+def test_fork_keeps_new_ids_until_merged():
+    """Ids put into a fork only reach the parent cache when the fork is merged."""
+    cache = DimensionCache()
+    cache.put('locations', "1234 Elmwood Avenue", 1)
+
+    child = cache.fork()
+    child.put('locations', "55 Main Street", 2)
+    assert child.get('locations', "1234 Elmwood Avenue") == 1
+    assert cache.get('locations', "55 Main Street") is None
+
+    cache.merge(child)
+    assert cache.get('locations', "55 Main Street") == 2
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_log_stats_passes_counters_as_fields(caplog):
+    """Cache counters are lazy log arguments and structured fields."""
+    cache = DimensionCache()
+    cache.put('locations', '1234 Elmwood Avenue', 1)
+    cache.get('locations', '1234 Elmwood Avenue')
+    cache.get('locations', '5678 Oak Street')
+
+    with caplog.at_level(logging.INFO):
+        cache.log_stats()
+
+    record = caplog.records[-1]
+    assert record.getMessage() == "Dimension cache: 1 hits, 1 misses (50.0% hit rate), 0 invalidations"
+    assert (record.cache_hits, record.cache_misses) == (1, 1)
@@ -0,0 +1,29 @@
+from unittest.mock import MagicMock
+
+from toast_exports.db.dimensions import resolve_employee_aliases
+
+
+def test_resolve_employee_aliases_uses_known_spellings():
+    """Spellings already in employee_name_aliases resolve with one lookup."""
+    cursor = MagicMock()
+    cursor.fetchall.return_value = [("Bartender A", 7), ("A, Bartender", 7)]
+
+    assert resolve_employee_aliases(cursor, ["Bartender A", "A, Bartender"]) == {"Bartender A": 7, "A, Bartender": 7}
+    cursor.execute.assert_called_once()
+    assert cursor.execute.call_args.args[1] == (["A, Bartender", "Bartender A"],)
+
+
+def test_resolve_employee_aliases_records_new_spellings():
+    """New spellings are formatted, matched to employees and recorded."""
+    cursor = MagicMock()
+    cursor.fetchall.side_effect = [
+        [("A, Bartender", 7)],  # known aliases
+        [("A, Bartender", 7)],  # employees by formatted name
+    ]
+
+    employee_ids = resolve_employee_aliases(cursor, ["A, Bartender", "Bartender A"])
+
+    assert employee_ids == {"A, Bartender": 7, "Bartender A": 7}
+    insert_sql, params = cursor.execute.call_args.args
+    assert "INSERT INTO employee_name_aliases" in insert_sql
+    assert params == (["Bartender A"], [7])
@@ -0,0 +1,96 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from toast_exports.db.indexes import INDEXES, Index, create_indexes, deferred_indexes, deferrable_indexes, index_sql
+
+
+def test_index_sql():
+    """Covering and BRIN indexes render as CREATE INDEX IF NOT EXISTS."""
+    covering = Index('idx_orders_server_opened', 'orders', ['server_id', 'opened_at'], include=['total'])
+    brin = Index('idx_orders_opened_at_brin', 'orders', ['opened_at'], method='brin')
+
+    assert index_sql(covering) == (
+        "CREATE INDEX IF NOT EXISTS idx_orders_server_opened "
+        "ON orders USING btree (server_id, opened_at) INCLUDE (total)"
+    )
+    assert index_sql(brin, concurrently=True) == (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orders_opened_at_brin ON orders USING brin (opened_at)"
+    )
+
+
+def test_catalog_covers_foreign_keys():
+    """The foreign keys used by joins lead at least one index."""
+    leading = {(index.table, index.columns[0]) for index in INDEXES}
+    for key in [('orders', 'server_id'), ('orders', 'location_id'), ('time_entries', 'job_id'), ('checks', 'order_id')]:
+        assert key in leading
+
+
+def test_deferrable_indexes_keep_load_path():
+    """Indexes the loaders read are never dropped for a bulk load."""
+    deferred = deferrable_indexes()
+    assert 'idx_payments_toast_check_id' not in {index.name for index in deferred}
+    assert {index.table for index in deferrable_indexes(['orders'])} == {'orders'}
+
+
+def test_deferred_indexes_rebuild_after_failure():
+    """Dropped indexes are built again even when the load fails."""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+
+    with pytest.raises(RuntimeError):
+        with deferred_indexes(conn, tables=['time_entries']):
+            raise RuntimeError("load failed")
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    dropped = [s for s in statements if s.startswith("DROP INDEX")]
+    created = [s for s in statements if s.startswith("CREATE INDEX")]
+    assert len(dropped) == len(created) == len(deferrable_indexes(['time_entries']))
+
+
+def test_create_indexes_concurrently_uses_autocommit():
+    """Concurrent builds run outside a transaction and restore the connection's mode."""
+    conn = MagicMock()
+    conn.autocommit = False
+    cursor = conn.cursor.return_value.__enter__.return_value
+
+    def check_autocommit(statement, params=None):
+        assert conn.autocommit is True
+    cursor.execute.side_effect = check_autocommit
+
+    create_indexes(conn, deferrable_indexes(['checks']), concurrently=True)
+
+    assert "CONCURRENTLY" in cursor.execute.call_args.args[0]
+    assert conn.autocommit is False
+
+
+def test_create_indexes_rebuilds_invalid_index():
+    """An invalid index left by a failed concurrent build is dropped and built again."""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = [('idx_checks_order_id',)]
+
+    create_indexes(conn, deferrable_indexes(['checks']), concurrently=True)
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list[1:]]
+    assert statements == [
+        "DROP INDEX CONCURRENTLY IF EXISTS idx_checks_order_id",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_checks_order_id ON checks USING btree (order_id)",
+    ]
+
+
+def test_failed_concurrent_build_drops_invalid_index():
+    """A concurrent build that fails does not leave an invalid index for IF NOT EXISTS to skip."""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = []
+
+    def fail_create(statement, params=None):
+        if statement.startswith("CREATE INDEX"):
+            raise RuntimeError("deadlock detected")
+    cursor.execute.side_effect = fail_create
+
+    with pytest.raises(RuntimeError):
+        create_indexes(conn, deferrable_indexes(['checks']), concurrently=True)
+
+    assert cursor.execute.call_args.args[0] == "DROP INDEX CONCURRENTLY IF EXISTS idx_checks_order_id"
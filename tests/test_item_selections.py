@@ -0,0 +1,67 @@
+import pytest
+import pandas as pd
+from datetime import datetime
+from io import StringIO
+
+from toast_exports.file_processors.item_selections_processor import (
+    ITEM_SELECTION_STAGING_COLUMNS,
+    validate_item_selections,
+    load_item_selections_bulk,
+)
+from toast_exports.transforms.item_selections import ITEM_SELECTION_DTYPES
+
+SAMPLE_ITEM_SELECTION_DATA = """Location,Order Id,Order #,Sent Date,Order Date,Check Id,Server,Table,Dining Area,Service,Dining Option,Item Selection Id,Item Id,Master Id,SKU,PLU,Menu Item,Menu Subgroup(s),Menu Group,Menu,Sales Category,Gross Price,Discount,Net Price,Qty,Tax,Void?,Deferred,Tax Exempt,Tax Inclusion Option,Dining Option Tax,Tab Name
+1234 Elmwood Avenue,900000004019159011,1,4/10/24 4:27 PM,4/10/24 4:26 PM,900000004019159010,Bartender A,,,Dinner,,900000004019157145,900000000019755902,900000000019755903,,,Tenderloin,,Main Dishes,Food,Food,7.0,0.0,3.5,1.0,0.22,False,False,False,Tax Not Included,No Effect,Morgan Brown
+1234 Elmwood Avenue,900000004019159011,1,4/10/24 4:27 PM,4/10/24 4:26 PM,900000004019159010,Bartender A,,,Dinner,,900000004019157149,,,,,Tenderloin,,Main Dishes,Food,Food,7.0,0.0,3.5,1.0,0.22,True,False,False,Tax Not Included,No Effect,Casey Doe
+1234 Elmwood Avenue,900000004019159011,1,4/10/24 4:27 PM,4/10/24 4:26 PM,900000004019159010,Bartender A,,,Dinner,,900000004019157150,900000000019755902,900000000019755903,,,,,Main Dishes,Food,Food,7.0,0.0,3.5,1.0,0.22,False,False,False,Tax Not Included,No Effect,
+"""
+
+
+@pytest.fixture
+def sample_df():
+    """Create a sample ItemSelectionDetails DataFrame for testing."""
+    return pd.read_csv(StringIO(SAMPLE_ITEM_SELECTION_DATA), dtype=ITEM_SELECTION_DTYPES)
+
+
+def test_validate_item_selections_keeps_ids_exact(sample_df):
+    """18-digit ids survive blanks in the same column and flags are booleans."""
+    items, errors = validate_item_selections(sample_df)
+
+    assert list(items['item_selection_id']) == [900000004019157145, 900000004019157149]
+    assert list(items['item_id']) == [900000000019755902, None]
+    assert list(items['is_voided']) == [False, True]
+    assert errors == [("900000004019157150", "missing Menu Item")]
+
+
+def test_load_item_selections_bulk_joins_orders(mock_connection, copied_rows, sample_df):
+    """Items are COPY'd once and merged through a join on the Toast order id."""
+    mock_conn, mock_cursor = mock_connection
+    mock_cursor.fetchone.return_value = (0,)
+    mock_cursor.rowcount = 1
+
+    items, _ = validate_item_selections(sample_df)
+    result = load_item_selections_bulk(mock_conn, items)
+
+    assert result == (1, 1, 0)
+    first, voided = copied_rows(ITEM_SELECTION_STAGING_COLUMNS)
+    assert (first['order_id'], first['check_id']) == (900000004019159011, 900000004019159010)
+    assert (first['item_selection_id'], first['item_id']) == (900000004019157145, 900000000019755902)
+    assert first['ordered_at'] == datetime(2024, 4, 10, 16, 26)
+    assert (first['menu_item'], first['net_price'], first['quantity']) == ("Tenderloin", 3.5, 1.0)
+    assert (first['is_voided'], first['tab_name']) == (False, "Morgan Brown")
+    assert (voided['item_id'], voided['master_id'], voided['is_voided']) == (None, None, True)
+    merge_sql = mock_cursor.execute.call_args_list[-1].args[0]
+    assert "JOIN orders o ON o.order_id = s.order_id" in merge_sql
+    assert "ON CONFLICT (item_selection_id) DO NOTHING" in merge_sql
+    mock_conn.commit.assert_called_once()
+
+
+def test_load_item_selections_bulk_counts_orphans(mock_connection, sample_df):
+    """Items whose order is not loaded are counted separately from skipped duplicates."""
+    mock_conn, mock_cursor = mock_connection
+    mock_cursor.fetchone.return_value = (2,)
+    mock_cursor.rowcount = 0
+
+    items, _ = validate_item_selections(sample_df)
+
+    assert load_item_selections_bulk(mock_conn, items) == (0, 0, 2)
@@ -0,0 +1,86 @@
+import pytest
+import pandas as pd
+from datetime import datetime
+from io import StringIO
+
+from toast_exports.db.dimension_cache import DimensionCache
+from toast_exports.file_processors.kitchen_timings_processor import (
+    KITCHEN_TIMING_STAGING_COLUMNS,
+    validate_kitchen_timings,
+    load_kitchen_timings_bulk,
+)
+from toast_exports.transforms.kitchen_timings import KITCHEN_TIMING_DTYPES
+from toast_exports.transforms.parsing import parse_duration_seconds
+
+SAMPLE_KITCHEN_TIMING_DATA = """Location,ID,Server,Check #,Table,Check Opened,Station,Expediter Level,Fired Date,Fulfilled Date,Fulfillment Time,Fulfilled By
+1234 Elmwood Avenue,900000004019823104,Bartender A,1,,4/10/24 4:26 PM,,1,4/10/24 4:27 PM,4/10/24 4:52 PM,25 minutes and 39 seconds,Manager 1
+1234 Elmwood Avenue,900000004021911234,Bartender A,7,,4/10/24 5:50 PM,,1,4/10/24 5:55 PM,4/10/24 5:55 PM,12 seconds,Manager 1
+1234 Elmwood Avenue,900000004021911235,Bartender A,8,,4/10/24 5:50 PM,,1,4/10/24 5:55 PM,4/10/24 5:59 PM,a while,Manager 1
+"""
+
+
+@pytest.fixture
+def sample_df():
+    """Create a sample KitchenTimings DataFrame for testing."""
+    return pd.read_csv(StringIO(SAMPLE_KITCHEN_TIMING_DATA), dtype=KITCHEN_TIMING_DTYPES)
+
+
+def test_parse_duration_seconds():
+    """Spelled-out durations become whole seconds; anything else is <NA>."""
+    parsed = parse_duration_seconds(pd.Series([
+        "25 minutes and 39 seconds", "1 minute and 49 seconds", "12 seconds",
+        "1 hour, 2 minutes and 5 seconds", "a while", None,
+    ]))
+
+    assert parsed.tolist()[:4] == [1539, 109, 12, 3725]
+    assert parsed[4:].isna().all()
+
+
+def test_validate_kitchen_timings(sample_df):
+    """Unparseable fulfillment times are reported instead of loaded as NULL."""
+    timings, errors = validate_kitchen_timings(sample_df)
+
+    assert list(timings['fulfillment_seconds']) == [1539, 12]
+    assert list(timings['fulfilled_by_name']) == ["1, Manager", "1, Manager"]
+    assert errors == [("900000004021911235", "invalid Fulfillment Time")]
+
+
+def test_load_kitchen_timings_bulk_maps_employees(mock_connection, copied_rows, sample_df):
+    """Server and Fulfilled By resolve through the shared employee mapping."""
+    mock_conn, mock_cursor = mock_connection
+    cache = DimensionCache()
+    cache.update('locations', {"1234 Elmwood Avenue": 1})
+    cache.update('employee_aliases', {"Bartender A": 7, "Manager 1": 9})
+    mock_cursor.rowcount = 2
+
+    timings, _ = validate_kitchen_timings(sample_df)
+    result = load_kitchen_timings_bulk(mock_conn, timings, cache)
+
+    assert result == (2, 0)
+    first, second = copied_rows(KITCHEN_TIMING_STAGING_COLUMNS)
+    assert (first['location_id'], first['server_id'], first['fulfilled_by_id']) == (1, 7, 9)
+    assert (first['ticket_id'], first['check_number']) == (900000004019823104, "1")
+    assert (first['fired_at'], first['fulfilled_at']) == (datetime(2024, 4, 10, 16, 27), datetime(2024, 4, 10, 16, 52))
+    assert (first['expediter_level'], first['fulfillment_seconds']) == (1, 1539)
+    assert second['fulfillment_seconds'] == 12
+    merge_sql = mock_cursor.execute.call_args_list[-1].args[0]
+    assert "ON CONFLICT (ticket_id) DO NOTHING" in merge_sql
+
+
+def test_load_kitchen_timings_bulk_blank_employees(mock_connection, copied_rows, sample_df):
+    """Blank Server and Fulfilled By cells stage as NULL next to integer ids, not 7.0."""
+    mock_conn, mock_cursor = mock_connection
+    cache = DimensionCache()
+    cache.update('locations', {"1234 Elmwood Avenue": 1})
+    cache.update('employee_aliases', {"Bartender A": 7, "Manager 1": 9})
+    mock_cursor.rowcount = 2
+    sample_df.loc[0, 'Fulfilled By'] = None
+    sample_df.loc[1, 'Server'] = None
+
+    timings, _ = validate_kitchen_timings(sample_df)
+    load_kitchen_timings_bulk(mock_conn, timings, cache)
+
+    staged = copied_rows(KITCHEN_TIMING_STAGING_COLUMNS)
+    assert [(row['location_id'], row['server_id'], row['fulfilled_by_id']) for row in staged] == [
+        (1, 7, None), (1, None, 9),
+    ]
@@ -0,0 +1,42 @@
+import json
+import logging
+
+from toast_exports.logs import ErrorSummary, JsonFormatter
+
+
+def test_error_summary_counts_kinds_and_keeps_first_examples():
+    """Errors are counted per kind, keeping only the first few record ids."""
+    summary = ErrorSummary('orders', examples=2)
+    summary.extend([(1, "missing Opened"), (2, "missing Opened"), (3, "missing Opened"), (4, "missing Total")])
+
+    assert summary.counts == {"missing Opened": 3, "missing Total": 1}
+    assert summary.total == 4
+
+
+def test_error_summary_logs_one_line_per_kind(caplog):
+    """Logging a summary costs one record per kind of error, not one per row."""
+    summary = ErrorSummary('orders', examples=2)
+    for order_number in range(1000):
+        summary.add("missing Opened", order_number)
+    summary.add("UniqueViolation", 7, "duplicate key value")
+
+    with caplog.at_level(logging.ERROR):
+        summary.log(logging.getLogger('test'))
+
+    assert [record.getMessage() for record in caplog.records] == [
+        "Error processing 1000 orders: missing Opened (first: 0, 1)",
+        "Error processing 1 orders: UniqueViolation (first: 7); duplicate key value",
+    ]
+    assert caplog.records[0].error_count == 1000
+
+
+def test_json_formatter_includes_extra_fields():
+    """JSON output carries the message, level and any extra fields."""
+    record = logging.LogRecord('toast_exports', logging.ERROR, __file__, 1, "Error processing %d %s", (3, 'orders'), None)
+    record.error_kind = "missing Opened"
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry['message'] == "Error processing 3 orders"
+    assert entry['level'] == 'ERROR'
+    assert entry['error_kind'] == "missing Opened"
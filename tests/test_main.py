@@ -0,0 +1,33 @@
+from datetime import date
+from pathlib import Path
+
+from toast_exports.__main__ import parse_args
+
+
+def test_run_options_after_backfill():
+    """Shared options are accepted after the backfill subcommand."""
+    args = parse_args(['backfill', '--from', '2024-04-01', '--to', '2024-04-30', '--force', '--async-commit',
+                       '--report', 'backfill.json', '--log-format', 'json'])
+
+    assert args.command == 'backfill'
+    assert (args.start, args.end) == (date(2024, 4, 1), date(2024, 4, 30))
+    assert args.force and args.async_commit
+    assert args.report == Path('backfill.json')
+    assert args.log_format == 'json'
+
+
+def test_run_options_before_backfill_are_kept():
+    """Options given before the subcommand are not reset by its defaults."""
+    args = parse_args(['--force', '--log-format', 'json', 'backfill', '--from', '2024-04-01', '--to', '2024-04-30'])
+
+    assert args.force
+    assert args.log_format == 'json'
+    assert not args.async_commit
+
+
+def test_run_options_default_command():
+    """The default command keeps its defaults."""
+    args = parse_args([])
+
+    assert args.command is None
+    assert not args.force
@@ -0,0 +1,126 @@
+import json
+import pytest
+from decimal import Decimal
+from unittest.mock import patch
+
+from toast_exports.file_processors.menu_processor import load_menu_hierarchy, MENU_COLUMN_TYPES, MENU_LINK_PARENTS
+from toast_exports.transforms.menus import MENU_ENTITIES, iter_menu_entity_rows, walk_menu
+
+CHEDDAR = {"guid": "00000000-0000-0000-0000-00000000000c", "name": "Cheddar", "price": 0.5}
+CHEESE = {
+    "guid": "00000000-0000-0000-0000-0000000000c0",
+    "name": "Cheese",
+    "minSelections": 0,
+    "maxSelections": 1,
+    "options": [CHEDDAR],
+}
+BURGER = {"guid": "00000000-0000-0000-0000-0000000000b0", "name": "Burger", "price": 12.99, "optionGroups": [CHEESE]}
+MELT = {"guid": "00000000-0000-0000-0000-0000000000b1", "name": "Melt", "price": 10.5, "optionGroups": [CHEESE]}
+
+SAMPLE_MENUS = [
+    {
+        "guid": "00000000-0000-0000-0000-000000000001",
+        "name": "Food",
+        "groups": [
+            {
+                "guid": "00000000-0000-0000-0000-000000000010",
+                "name": "Main Dishes",
+                "items": [BURGER],
+                "subgroups": [
+                    {"guid": "00000000-0000-0000-0000-000000000011", "name": "Sandwiches", "items": [MELT]},
+                ],
+            },
+        ],
+    },
+    {
+        "guid": "00000000-0000-0000-0000-000000000002",
+        "name": "Late Night",
+        "menuGroups": [
+            {"guid": "00000000-0000-0000-0000-000000000020", "name": "Burgers", "menuItems": [BURGER]},
+        ],
+    },
+]
+
+
+@pytest.fixture
+def menu_file(tmp_path):
+    """Write a MenuExport file with items and modifier groups shared across menus."""
+    path = tmp_path / "MenuExport_test.json"
+    path.write_text(json.dumps(SAMPLE_MENUS))
+    return path
+
+
+def test_walk_menu_links_subgroups_to_parent():
+    """Sub-groups keep their menu and point at the group they sit under."""
+    groups = [row for entity, row in walk_menu(SAMPLE_MENUS[0]) if entity == 'menu_groups']
+
+    assert [(row[0][-2:], row[2]) for row in groups] == [
+        ("10", None),
+        ("11", "00000000-0000-0000-0000-000000000010"),
+    ]
+    assert {row[1] for row in groups} == {"00000000-0000-0000-0000-000000000001"}
+
+
+def test_iter_menu_entity_rows_deduplicates_by_guid(menu_file):
+    """Shared items and modifier groups are emitted once; prices stay Decimal."""
+    items = list(iter_menu_entity_rows(menu_file, 'menu_items'))
+    modifier_groups = list(iter_menu_entity_rows(menu_file, 'modifier_groups'))
+    group_items = list(iter_menu_entity_rows(menu_file, 'menu_group_items'))
+
+    assert [row[1] for row in items] == ["Burger", "Cheddar", "Melt"]
+    assert items[0][4] == Decimal("12.99")
+    assert [row[1] for row in modifier_groups] == ["Cheese"]
+    assert len(group_items) == 3
+
+
+def test_load_menu_hierarchy_copies_each_entity_once(mock_connection, copied_rows, menu_file):
+    """One COPY and one merge per entity type, committed together."""
+    mock_conn, mock_cursor = mock_connection
+    mock_cursor.fetchall.return_value = []
+    mock_cursor.rowcount = 1
+
+    load_menu_hierarchy(mock_conn, menu_file)
+
+    assert mock_cursor.copy.call_count == len(MENU_ENTITIES)
+    assert copied_rows() == [row for entity in MENU_ENTITIES for row in iter_menu_entity_rows(menu_file, entity)]
+    merges = [call.args[0] for call in mock_cursor.execute.call_args_list if str(call.args[0]).lstrip().startswith("INSERT INTO")]
+    assert len(merges) == len(MENU_ENTITIES)
+    assert "ON CONFLICT (guid) DO UPDATE" in merges[0]
+    mock_conn.commit.assert_called_once()
+
+
+def test_menu_column_types_cover_every_entity_column():
+    """Every streamed column has a staging type."""
+    for columns, _ in MENU_ENTITIES.values():
+        assert set(columns) <= set(MENU_COLUMN_TYPES)
+
+
+@patch('toast_exports.file_processors.menu_processor.record_rejects')
+def test_load_menu_hierarchy_drops_subtree_of_missing_menu(mock_record_rejects, mock_connection, menu_file):
+    """A menu that was not loaded loses its groups and links instead of failing the file."""
+    mock_conn, mock_cursor = mock_connection
+    late_night_group = ("00000000-0000-0000-0000-000000000020", "00000000-0000-0000-0000-000000000002", None,
+                        "Burgers", None, None)
+    late_night_link = ("00000000-0000-0000-0000-000000000020", BURGER["guid"])
+    # Rows removed before each merge: groups, group items, item modifier groups, modifier options
+    mock_cursor.fetchall.side_effect = [[late_night_group], [late_night_link], [], []]
+    mock_cursor.rowcount = 1
+
+    inserted_count, skipped_count, error_count = load_menu_hierarchy(mock_conn, menu_file)
+
+    assert error_count == 2
+    statements = [str(call.args[0]) for call in mock_cursor.execute.call_args_list]
+    deletes = [statement for statement in statements if "DELETE FROM" in statement]
+    assert len(deletes) == 4
+    assert "menus m WHERE m.guid = s.menu_guid" in deletes[0] and "WITH RECURSIVE" in deletes[0]
+    for entity, parents in MENU_LINK_PARENTS.items():
+        delete = next(statement for statement in deletes if f"DELETE FROM {entity}_staging" in statement)
+        for column, table in parents:
+            assert f"FROM {table} p WHERE p.guid = s.{column}" in delete
+        # The orphans are removed before the link table is merged
+        assert statements.index(delete) < next(
+            i for i, statement in enumerate(statements) if statement.lstrip().startswith(f"INSERT INTO {entity} ")
+        )
+    rejected = [reject for call in mock_record_rejects.call_args_list for reject in call.args[2]]
+    assert [key for key, _, _ in rejected] == [late_night_group[0], late_night_link[0]]
+    mock_conn.commit.assert_called_once()
@@ -0,0 +1,80 @@
+import json
+import psycopg
+import pytest
+from unittest.mock import patch
+
+from toast_exports.file_processors.menu_processor import (
+    insert_menus_into_db,
+    insert_menus_batch,
+    validate_menu,
+)
+
+VALID_MENU = {"guid": "00000000-0000-0000-0000-000000000001", "name": "Food", "idString": "100"}
+
+
+def test_validate_menu_fills_table_defaults():
+    """Missing optional fields get the menus table defaults instead of NULL."""
+    params, error = validate_menu(VALID_MENU)
+
+    assert error is None
+    assert params['orderableOnline'] is True
+    assert params['daysAvailableBits'] == 127
+
+
+@pytest.mark.parametrize("menu, message", [
+    ({"name": "Food", "idString": "100"}, "missing or invalid guid"),
+    ({**VALID_MENU, "name": None}, "missing name"),
+    ({**VALID_MENU, "idString": "x" * 51}, "idString must be text of at most 50 characters"),
+])
+def test_validate_menu_rejects_bad_records(menu, message):
+    """Records the menus table would refuse are caught before the batch."""
+    assert validate_menu(menu)[1] == message
+
+
+def test_insert_menus_batch_uses_one_executemany(mock_connection):
+    """All menus go in one executemany inside a savepoint."""
+    mock_conn, mock_cursor = mock_connection
+    mock_cursor.rowcount = 2
+    menus = [validate_menu(VALID_MENU)[0], validate_menu({**VALID_MENU, "guid": VALID_MENU["guid"][:-1] + "2"})[0]]
+
+    assert insert_menus_batch(mock_conn, mock_cursor, menus) == (2, [])
+    mock_cursor.executemany.assert_called_once()
+    mock_conn.pipeline.assert_called_once()
+
+
+def test_insert_menus_batch_isolates_failing_rows(mock_connection):
+    """A failed batch is retried row by row and only the bad row is rejected."""
+    mock_conn, mock_cursor = mock_connection
+    mock_cursor.executemany.side_effect = psycopg.DataError("bad value")
+    mock_cursor.rowcount = 1
+    good, _ = validate_menu(VALID_MENU)
+    bad, _ = validate_menu({**VALID_MENU, "guid": VALID_MENU["guid"][:-1] + "2"})
+
+    def execute(sql, params=None):
+        if params is bad:
+            raise psycopg.DataError("bad value")
+    mock_cursor.execute.side_effect = execute
+
+    inserted_count, rejects = insert_menus_batch(mock_conn, mock_cursor, [good, bad])
+
+    assert inserted_count == 1
+    assert [(guid, error) for guid, _, error in rejects] == [(bad['guid'], "bad value")]
+    statements = [call.args[0] for call in mock_cursor.execute.call_args_list if isinstance(call.args[0], str)]
+    assert "ROLLBACK TO SAVEPOINT menus_batch" in statements
+    assert "ROLLBACK TO SAVEPOINT menu_row" in statements
+
+
+@patch('toast_exports.file_processors.menu_processor._load_menu_hierarchy', return_value=(0, 0, 0))
+@patch('toast_exports.file_processors.menu_processor.record_rejects')
+def test_insert_menus_into_db_commits_once(mock_record_rejects, mock_hierarchy, mock_connection, tmp_path):
+    """Invalid menus are rejected and the file is committed once."""
+    mock_conn, mock_cursor = mock_connection
+    mock_cursor.rowcount = 1
+    (tmp_path / "MenuExport_test.json").write_text(json.dumps([VALID_MENU, {"name": "No guid"}]))
+
+    result = insert_menus_into_db(mock_conn, tmp_path)
+
+    assert result == (1, 0, 1)
+    rejects = mock_record_rejects.call_args.args[2]
+    assert [error for _, _, error in rejects] == ["missing or invalid guid"]
+    mock_conn.commit.assert_called_once()
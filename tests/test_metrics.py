@@ -0,0 +1,100 @@
+import json
+import pytest
+
+from toast_exports.metrics import RunMetrics, measure_stage, percentile, timed
+
+
+def test_percentile_uses_nearest_rank():
+    """Percentiles pick the nearest-rank value, and are None without values."""
+    values = [float(n) for n in range(1, 101)]
+
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([3.0], 0.99) == 3.0
+    assert percentile([], 0.50) is None
+
+
+def test_timed_records_nothing_outside_a_stage():
+    """Timers are no-ops when no stage is being measured."""
+    with timed('load'):
+        pass
+
+
+def test_nested_phases_are_not_counted_twice():
+    """Time in a nested phase counts towards the inner phase only."""
+    metrics = RunMetrics()
+    stage = metrics.stage('orders')
+
+    with measure_stage(stage):
+        with timed('load'):
+            with timed('commit'):
+                pass
+
+    assert set(stage.phases) == {'load', 'commit'}
+    assert sum(stage.phases.values()) <= stage.seconds
+    assert stage.status == 'ok'
+
+
+def test_timed_decorates_functions():
+    """timed() also works as a decorator, once per call."""
+    metrics = RunMetrics()
+    stage = metrics.stage('payments')
+
+    @timed('transform')
+    def transform():
+        return 42
+
+    with measure_stage(stage):
+        assert transform() == 42
+        transform()
+
+    assert 'transform' in stage.phases
+
+
+def test_failed_stage_is_marked_failed():
+    """A stage that raises is reported as failed."""
+    stage = RunMetrics().stage('checks')
+
+    with pytest.raises(ValueError):
+        with measure_stage(stage):
+            raise ValueError("bad checks file")
+
+    assert stage.status == 'failed'
+
+
+def test_report_includes_throughput_and_latency(tmp_path):
+    """The JSON report has rows, bytes, query counts and latency percentiles per stage."""
+    metrics = RunMetrics("sample_data/20240410")
+    stage = metrics.stage('orders')
+    stage.seconds = 2.0
+    stage.bytes_read = 1000
+    stage.record_result((90, 10, 1))
+    for latency in (0.001, 0.002, 0.010):
+        stage.record_statement(latency)
+    metrics.finish('ok')
+
+    metrics.write_report(tmp_path / "report.json")
+    report = json.loads((tmp_path / "report.json").read_text())
+
+    orders = report['stages'][0]
+    assert (report['status'], report['inserted'], report['errors']) == ('ok', 90, 1)
+    assert orders['rows_per_second'] == 50.0
+    assert orders['bytes_per_second'] == 500.0
+    assert orders['queries'] == 3
+    assert orders['statement_latency_ms'] == {'p50': 2.0, 'p99': 10.0, 'max': 10.0}
+
+
+def test_prometheus_textfile(tmp_path):
+    """Stage metrics are written as labelled gauges."""
+    metrics = RunMetrics()
+    stage = metrics.stage('orders')
+    stage.record_result((5, 0, 0))
+    stage.record_statement(0.004)
+    metrics.finish('ok')
+
+    metrics.write_prometheus(tmp_path / "toast_etl.prom")
+    lines = (tmp_path / "toast_etl.prom").read_text().splitlines()
+
+    assert "toast_etl_run_success 1" in lines
+    assert 'toast_etl_stage_rows{stage="orders",outcome="inserted"} 5' in lines
+    assert 'toast_etl_stage_statement_latency_seconds{stage="orders",quantile="0.99"} 0.004' in lines
@@ -0,0 +1,113 @@
+from unittest.mock import MagicMock
+
+import psycopg
+import pytest
+
+from toast_exports.db import migrations
+from toast_exports.db.baseline import baseline_schema
+from toast_exports.db.migrations import Migration, ensure_schema, migrate, schema_version
+
+
+def make_conn(values):
+    """A mock connection whose single-value lookups return values in turn."""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchone.side_effect = [(value,) for value in values]
+    return conn, cursor
+
+
+def test_schema_version_of_new_database():
+    """A database without schema_version is at version 0."""
+    conn, cursor = make_conn([])
+    cursor.execute.side_effect = psycopg.errors.UndefinedTable()
+
+    assert schema_version(conn) == 0
+    conn.rollback.assert_called_once()
+
+
+def test_ensure_schema_current_reads_version_and_mode_only(monkeypatch):
+    """A current schema costs two SELECTs and applies nothing."""
+    monkeypatch.setattr(migrations, 'DB_PARTITIONED', False)
+    conn, cursor = make_conn([1, 'false'])
+    apply = MagicMock()
+
+    assert ensure_schema(conn, [Migration(1, "baseline", apply)]) == []
+    assert cursor.execute.call_count == 2
+    apply.assert_not_called()
+
+
+def test_ensure_schema_rejects_other_partitioning(monkeypatch):
+    """PG_PARTITIONED cannot switch the mode the database was created with."""
+    monkeypatch.setattr(migrations, 'DB_PARTITIONED', False)
+    conn, _ = make_conn([1, 'true'])
+
+    with pytest.raises(RuntimeError, match="PG_PARTITIONED=true"):
+        ensure_schema(conn, [Migration(1, "baseline", MagicMock())])
+
+
+def test_migrate_records_partitioning_before_migrations(monkeypatch):
+    """The partitioning mode is recorded once, before any migration reads it."""
+    monkeypatch.setattr(migrations, 'DB_PARTITIONED', True)
+    conn, cursor = make_conn([0])
+    seen = []
+
+    def apply(cur):
+        seen.append(len(cursor.execute.call_args_list))
+
+    migrate(conn, [Migration(1, "baseline", apply)])
+
+    statements = [call.args for call in cursor.execute.call_args_list]
+    record = next(i for i, args in enumerate(statements) if "INSERT INTO schema_settings" in args[0])
+    assert "ON CONFLICT (name) DO NOTHING" in statements[record][0]
+    assert statements[record][1] == ('true',)
+    assert record < seen[0]
+
+
+@pytest.mark.parametrize("recorded, partitioned", [('false', False), ('true', True)])
+def test_baseline_schema_follows_recorded_partitioning(recorded, partitioned):
+    """The frozen baseline partitions orders only when the database says so."""
+    _, cursor = make_conn([recorded])
+
+    baseline_schema(cursor)
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    assert "schema_settings" in statements[0]
+    orders = next(statement for statement in statements if "CREATE TABLE IF NOT EXISTS orders" in statement)
+    checks = next(statement for statement in statements if "CREATE TABLE IF NOT EXISTS checks" in statement)
+    assert ("PARTITION BY RANGE (opened_at)" in orders) == partitioned
+    assert ("CONSTRAINT fk_order" in checks) != partitioned
+
+
+def test_migrate_applies_pending_in_order():
+    """Only migrations newer than the locked re-read are applied, oldest first."""
+    conn, cursor = make_conn([1])
+    order = []
+    migrations = [
+        Migration(3, "third", lambda cur: order.append(3)),
+        Migration(1, "baseline", lambda cur: order.append(1)),
+        Migration(2, "second", lambda cur: order.append(2)),
+    ]
+
+    assert migrate(conn, migrations) == [2, 3]
+    assert order == [2, 3]
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    assert "pg_advisory_lock" in statements[0]
+    assert "pg_advisory_unlock" in statements[-1]
+    recorded = [call.args[1] for call in cursor.execute.call_args_list if "INSERT INTO schema_version" in call.args[0]]
+    assert recorded == [(2, "second"), (3, "third")]
+
+
+def test_migrate_failure_rolls_back_and_unlocks():
+    """A failed migration is rolled back, later ones are not run and the lock is released."""
+    conn, cursor = make_conn([0])
+    later = MagicMock()
+
+    def fail(cur):
+        raise RuntimeError("bad DDL")
+
+    with pytest.raises(RuntimeError):
+        migrate(conn, [Migration(1, "baseline", fail), Migration(2, "second", later)])
+
+    conn.rollback.assert_called_once()
+    later.assert_not_called()
+    assert "pg_advisory_unlock" in cursor.execute.call_args.args[0]
@@ -0,0 +1,65 @@
+import pytest
+import pandas as pd
+from io import StringIO
+
+from toast_exports.file_processors.modifier_selections_processor import (
+    MODIFIER_SELECTION_STAGING_COLUMNS,
+    validate_modifier_selections,
+    load_modifier_selections_bulk,
+)
+from toast_exports.transforms.modifier_selections import MODIFIER_SELECTION_DTYPES
+from toast_exports.transforms.parsing import parse_ids
+
+SAMPLE_MODIFIER_SELECTION_DATA = """Location,Order Id,Order #,Sent Date,Order Date,Check Id,Server,Table,Dining Area,Service,Dining Option,Item Selection Id,Modifier Id,Master Id,Modifier SKU,Modifier PLU,Modifier,Option Group ID,Option Group Name,Parent Menu Selection Item ID,Parent Menu Selection,Sales Category,Gross Price,Discount,Net Price,Qty,Void?,Void Reason ID,Void Reason
+1234 Elmwood Avenue,900000004019159011,1,4/10/24 4:27 PM,4/10/24 4:26 PM,900000004019159010,Bartender A,,,Dinner,,900000004019157144,9.000000000690304e+17,9.000000000690304e+17,,,A.T.T.,9.00000000019797e+17,Sandwich Toppings,900000000019755902,Tenderloin,,0.0,0.0,0.0,1.0,False,,
+1234 Elmwood Avenue,900000004019159011,1,4/10/24 4:27 PM,4/10/24 4:26 PM,900000004019159010,Bartender A,,,Dinner,,900000004019157147,,,,,Side Salad,,,900000000019755902,Tenderloin,,0.0,0.0,0.0,1.0,False,,
+1234 Elmwood Avenue,900000004019159011,1,4/10/24 4:27 PM,4/10/24 4:26 PM,900000004019159010,Bartender A,,,Dinner,,900000004019157148,9.00000000019805e+17,9.00000000019805e+17,,,MAYO,9.00000000019797e+17,Sandwich Toppings,,Tenderloin,,0.0,0.0,0.0,1.0,False,,
+"""
+
+
+@pytest.fixture
+def sample_df():
+    """Create a sample ModifiersSelectionDetails DataFrame for testing."""
+    return pd.read_csv(StringIO(SAMPLE_MODIFIER_SELECTION_DATA), dtype=MODIFIER_SELECTION_DTYPES)
+
+
+def test_parse_ids_never_uses_float64():
+    """Digit strings are exact and scientific notation is converted from its text."""
+    parsed = parse_ids(pd.Series(["900000004019157145", "9.000000000690304e+17", None, "1.5"]))
+
+    assert parsed.dtype == "Int64"
+    assert parsed[0] == 900000004019157145
+    assert parsed[1] == 900000000069030400
+    assert pd.isna(parsed[2])
+    assert pd.isna(parsed[3])
+
+
+def test_validate_modifier_selections(sample_df):
+    """Modifiers without a parent item id are reported, blank ids load as NULL."""
+    modifiers, errors = validate_modifier_selections(sample_df)
+
+    assert list(modifiers['modifier_selection_id']) == [900000004019157144, 900000004019157147]
+    assert list(modifiers['parent_item_id']) == [900000000019755902, 900000000019755902]
+    assert list(modifiers['modifier_id']) == [900000000069030400, None]
+    assert errors == [("900000004019157148", "missing or invalid Parent Menu Selection Item ID")]
+
+
+def test_load_modifier_selections_bulk(mock_connection, copied_rows, sample_df):
+    """Modifiers are COPY'd once and linked to their parent item selection in the merge."""
+    mock_conn, mock_cursor = mock_connection
+    mock_cursor.fetchone.return_value = (1, 1)
+
+    modifiers, _ = validate_modifier_selections(sample_df)
+    result = load_modifier_selections_bulk(mock_conn, modifiers)
+
+    assert result == (1, 0, 1)
+    topping, side = copied_rows(MODIFIER_SELECTION_STAGING_COLUMNS)
+    assert (topping['modifier_selection_id'], topping['check_id']) == (900000004019157144, 900000004019159010)
+    assert (topping['parent_item_id'], topping['modifier_id']) == (900000000019755902, 900000000069030400)
+    assert (topping['option_group_id'], topping['option_group_name']) == (900000000019797000, "Sandwich Toppings")
+    assert (topping['modifier'], topping['quantity'], topping['is_voided']) == ("A.T.T.", 1.0, False)
+    assert (side['modifier_id'], side['option_group_id'], side['void_reason_id']) == (None, None, None)
+    merge_sql = mock_cursor.execute.call_args_list[-1].args[0]
+    assert "i.check_id = s.check_id AND i.item_id = s.parent_item_id" in merge_sql
+    assert "ON CONFLICT (modifier_selection_id) DO NOTHING" in merge_sql
+    mock_conn.commit.assert_called_once()
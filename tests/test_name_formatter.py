@@ -1,4 +1,7 @@
 import pytest
+import pandas as pd
+from unittest.mock import patch
+from utils import name_formatter
 from utils.name_formatter import format_name
 
 def test_format_name():
@@ -26,4 +29,16 @@ def test_format_name():
     
     # Test with multiple spaces between words
     assert format_name("John    Doe") == "Doe, John"
-    assert format_name("Mary   Jane   Smith") == "Smith, Mary Jane" 
\ No newline at end of file
+    assert format_name("Mary   Jane   Smith") == "Smith, Mary Jane" 
+
+def test_format_names_formats_each_distinct_name_once():
+    """Repeated names are formatted once and missing names stay missing."""
+    names = pd.Series(["Bartender A", None, "Bartender A", "Doe, John", "Bartender A"])
+    name_formatter.cached_format_name.cache_clear()
+    with patch.object(name_formatter, 'format_name', wraps=name_formatter.format_name) as mock_format:
+        formatted = name_formatter.format_names(names)
+
+    assert formatted.tolist()[0] == "A, Bartender"
+    assert pd.isna(formatted[1])
+    assert formatted.tolist()[2:] == ["A, Bartender", "Doe, John", "A, Bartender"]
+    assert mock_format.call_count == 2
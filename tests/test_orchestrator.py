@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import pytest
+from unittest.mock import patch, MagicMock
+
+from toast_exports.db.dimension_cache import DimensionCache
+from toast_exports.orchestrator import run_export_concurrent
+
+
+def make_stages(processors, dependencies):
+    """Build STAGES entries for fake processors, one CSV file per stage."""
+    return [
+        (stage, f"{stage}.csv", processor, dependencies.get(stage, []))
+        for stage, processor in processors.items()
+    ]
+
+
+@pytest.fixture
+def export_dir(tmp_path):
+    """Create a dated export directory with one file per fake stage."""
+    data_dir = tmp_path / "20240410"
+    data_dir.mkdir()
+    for stage in ('orders', 'payments', 'checks', 'time_entries'):
+        (data_dir / f"{stage}.csv").write_text("Location\n1234 Elmwood Avenue\n")
+    return data_dir
+
+
+@pytest.fixture
+def pool():
+    """Create a mock connection pool handing out a new mock connection per checkout."""
+    mock_pool = MagicMock()
+    mock_pool.connection.side_effect = lambda: MagicMock()
+    return mock_pool
+
+
+@pytest.fixture(autouse=True)
+def manifest():
+    """Patch the load manifest so every file is treated as new."""
+    with patch('toast_exports.pipeline.load_manifest', return_value={}), \
+            patch('toast_exports.pipeline.record_load') as mock_record_load:
+        yield mock_record_load
+
+
+def test_independent_stages_overlap(export_dir, pool):
+    """Stages without dependencies between them run at the same time."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def waits_for_other(conn, data_dir, cache):
+        barrier.wait()
+        return 1, 0, 0
+
+    stages = make_stages({'orders': waits_for_other, 'time_entries': waits_for_other}, {})
+    with patch('toast_exports.orchestrator.STAGES', stages):
+        results = asyncio.run(run_export_concurrent(pool, export_dir, concurrency=2))
+
+    assert results == {'orders': (1, 0, 0), 'time_entries': (1, 0, 0)}
+
+
+def test_dependencies_run_first(export_dir, pool):
+    """A stage only starts after every stage it depends on has finished."""
+    finished = []
+
+    def processor(stage):
+        def run(conn, data_dir, cache):
+            finished.append(stage)
+            return 1, 0, 0
+        return run
+
+    stages = make_stages(
+        {stage: processor(stage) for stage in ('orders', 'payments', 'checks')},
+        {'payments': ['orders'], 'checks': ['orders', 'payments']},
+    )
+    with patch('toast_exports.orchestrator.STAGES', stages):
+        asyncio.run(run_export_concurrent(pool, export_dir))
+
+    assert finished == ['orders', 'payments', 'checks']
+
+
+def test_failed_stage_skips_dependents(export_dir, pool):
+    """Dependents of a failed stage are skipped, other stages still run, and the failure is raised."""
+    time_entries = MagicMock(return_value=(1, 0, 0))
+    checks = MagicMock(return_value=(1, 0, 0))
+
+    def orders(conn, data_dir, cache):
+        raise ValueError("bad orders file")
+
+    stages = make_stages(
+        {'orders': orders, 'checks': checks, 'time_entries': time_entries},
+        {'checks': ['orders']},
+    )
+    with patch('toast_exports.orchestrator.STAGES', stages):
+        with pytest.raises(ValueError, match="bad orders file"):
+            asyncio.run(run_export_concurrent(pool, export_dir))
+
+    checks.assert_not_called()
+    time_entries.assert_called_once()
+
+
+def test_stage_cache_merged_after_success(export_dir, pool):
+    """Each stage gets a fork of the cache whose ids are merged back once it succeeds."""
+    cache = DimensionCache()
+
+    def orders(conn, data_dir, cache):
+        cache.put('locations', "1234 Elmwood Avenue", 1)
+        return 1, 0, 0
+
+    def payments(conn, data_dir, cache):
+        cache.put('locations', "55 Main Street", 2)
+        raise ValueError("bad payments file")
+
+    stages = make_stages({'orders': orders, 'payments': payments}, {})
+    with patch('toast_exports.orchestrator.STAGES', stages):
+        with pytest.raises(ValueError):
+            asyncio.run(run_export_concurrent(pool, export_dir, cache))
+
+    assert cache.get('locations', "1234 Elmwood Avenue") == 1
+    assert cache.get('locations', "55 Main Street") is None
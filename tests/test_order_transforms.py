@@ -0,0 +1,65 @@
+import pytest
+import pandas as pd
+from io import StringIO
+from datetime import datetime
+
+from toast_exports.transforms.orders import transform_order_details, ORDER_COLUMNS
+from toast_exports.transforms.parsing import (
+    parse_timestamps,
+    parse_duration_minutes,
+    parse_booleans,
+)
+
+SAMPLE_ORDER_DETAILS_DATA = """Location,Order Id,Order #,Checks,Opened,# of Guests,Tab Names,Server,Table,Revenue Center,Dining Area,Service,Dining Options,Discount Amount,Amount,Tax,Tip,Gratuity,Total,Voided,Paid,Closed,Duration (Opened to Paid),Order Source
+1234 Elmwood Avenue,900000004019159011,1,"1, 4",4/10/24 4:26 PM,1,Chris Davis,Bartender A,,Dining Room,,Dinner,,11.0,32.88,2.06,0.0,0.0,34.94,False,4/10/24 5:04 PM,4/10/24 5:04 PM,00:37:52,In Store
+1234 Elmwood Avenue,900000004026110087,30,30,4/10/24 8:15 PM,1,,Bartender A,,Dining Room,,Dinner,,0.0,0.0,0.0,0.0,0.0,0.0,True,,,,In Store
+"""
+
+
+@pytest.fixture
+def sample_df():
+    """Create a sample OrderDetails DataFrame for testing."""
+    return pd.read_csv(StringIO(SAMPLE_ORDER_DETAILS_DATA))
+
+
+def test_parse_timestamps_uses_toast_format():
+    """Toast timestamps parse with the explicit format; anything else is NaT."""
+    parsed = parse_timestamps(pd.Series(["4/10/24 4:26 PM", "4/10/24 12:05 AM", "2024-04-10"]))
+
+    assert parsed[0] == datetime(2024, 4, 10, 16, 26)
+    assert parsed[1] == datetime(2024, 4, 10, 0, 5)
+    assert pd.isna(parsed[2])
+
+
+def test_parse_duration_minutes_drops_seconds():
+    """Durations become whole minutes, matching the previous per-row split(':') logic."""
+    parsed = parse_duration_minutes(pd.Series(["00:37:52", "01:03:44", None, "bad"]))
+
+    assert parsed[0] == 37
+    assert parsed[1] == 63
+    assert pd.isna(parsed[2])
+    assert pd.isna(parsed[3])
+
+
+def test_parse_booleans():
+    """True/False and Yes/No values map to booleans."""
+    parsed = parse_booleans(pd.Series([True, "False", "Yes", "No", None]))
+
+    assert list(parsed[:4]) == [True, False, True, False]
+    assert pd.isna(parsed[4])
+
+
+def test_transform_order_details(sample_df):
+    """The whole frame is converted to load-ready values with None for missing data."""
+    orders = transform_order_details(sample_df)
+
+    assert list(orders.columns) == ORDER_COLUMNS
+    first, voided = orders.iloc[0], orders.iloc[1]
+    assert first['order_id'] == 900000004019159011
+    assert first['server_name'] == "A, Bartender"
+    assert first['opened_at'] == datetime(2024, 4, 10, 16, 26)
+    assert first['duration_minutes'] == 37
+    assert first['table_number'] is None
+    assert voided['is_voided'] is True
+    assert voided['paid_at'] is None
+    assert voided['duration_minutes'] is None
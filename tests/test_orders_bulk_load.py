@@ -0,0 +1,181 @@
+import pytest
+import pandas as pd
+from datetime import datetime
+from io import StringIO
+
+from toast_exports.db.dimension_cache import DimensionCache
+from toast_exports.file_processors.orders_processor import (
+    ORDER_STAGING_COLUMNS,
+    validate_orders,
+    load_orders_bulk,
+    process_orders,
+)
+
+SAMPLE_ORDER_DETAILS_DATA = """Location,Order Id,Order #,Checks,Opened,# of Guests,Tab Names,Server,Table,Revenue Center,Dining Area,Service,Dining Options,Discount Amount,Amount,Tax,Tip,Gratuity,Total,Voided,Paid,Closed,Duration (Opened to Paid),Order Source
+1234 Elmwood Avenue,900000004019159011,1,"1, 4",4/10/24 4:26 PM,1,Chris Davis,Bartender A,,Dining Room,,Dinner,,11.0,32.88,2.06,0.0,0.0,34.94,False,4/10/24 5:04 PM,4/10/24 5:04 PM,00:37:52,In Store
+1234 Elmwood Avenue,900000004019190489,2,2,4/10/24 4:28 PM,1,,Bartender A,,Dining Room,,Dinner,,0.0,1.88,0.12,0.0,0.0,2.0,False,4/10/24 4:28 PM,4/10/24 4:28 PM,00:00:06,In Store
+1234 Elmwood Avenue,900000004019557063,3,3,not a date,1,,Bartender A,,Dining Room,,Dinner,,0.0,1.88,0.12,0.0,0.0,2.0,False,4/10/24 4:42 PM,4/10/24 4:42 PM,00:00:04,In Store
+1234 Elmwood Avenue,900000004021390076,6,6,4/10/24 5:43 PM,1,,,,Dining Room,,Dinner,,0.0,3.29,0.21,0.0,0.0,3.5,False,4/10/24 5:43 PM,4/10/24 5:43 PM,00:00:10,In Store
+"""
+
+
+@pytest.fixture
+def sample_df():
+    """Create a sample OrderDetails DataFrame for testing."""
+    return pd.read_csv(StringIO(SAMPLE_ORDER_DETAILS_DATA))
+
+
+def test_validate_orders_reports_bad_rows(sample_df):
+    """Rows that would break the COPY are split out with a reason."""
+    valid_df, errors = validate_orders(sample_df)
+
+    assert list(valid_df['order_number']) == [1, 2]
+    assert errors == [
+        (3, "missing or invalid Opened date"),
+        (6, "no server specified"),
+    ]
+
+
+def test_load_orders_bulk_copies_and_merges(mock_connection, copied_rows, sample_df):
+    """Valid rows are COPY'd to staging and merged with one INSERT ... SELECT."""
+    mock_conn, mock_cursor = mock_connection
+    mock_cursor.fetchall.side_effect = [
+        [("1234 Elmwood Avenue", 1)],  # locations
+        [("Bartender A", 7)],  # server aliases
+    ]
+    mock_cursor.rowcount = 1
+
+    valid_df, _ = validate_orders(sample_df)
+    inserted_count, skipped_count = load_orders_bulk(mock_conn, valid_df)
+
+    assert (inserted_count, skipped_count) == (1, 1)
+    first, second = copied_rows(ORDER_STAGING_COLUMNS)
+    assert (first['location_id'], first['order_id'], first['server_id']) == (1, 900000004019159011, 7)
+    assert (first['guest_count'], first['tab_names']) == (1, "Chris Davis")
+    assert (first['opened_at'], first['paid_at']) == (datetime(2024, 4, 10, 16, 26), datetime(2024, 4, 10, 17, 4))
+    assert (first['discount_amount'], first['subtotal'], first['total']) == (11.0, 32.88, 34.94)
+    assert (first['is_voided'], first['duration_minutes']) == (False, 37)
+    assert (second['order_id'], second['duration_minutes']) == (900000004019190489, 0)
+    merge_sql = mock_cursor.execute.call_args_list[-1].args[0]
+    assert "ON CONFLICT (order_id) DO NOTHING" in merge_sql
+    assert mock_conn.commit.call_count == 2  # dimensions, then orders
+
+
+def test_load_orders_bulk_rejects_blank_location(mock_connection, copied_rows, sample_df):
+    """A row without a Location is reported instead of staging a NULL location_id."""
+    mock_conn, mock_cursor = mock_connection
+    mock_cursor.fetchall.side_effect = [
+        [("1234 Elmwood Avenue", 1)],  # locations
+        [("Bartender A", 7)],  # server aliases
+    ]
+    mock_cursor.rowcount = 1
+    sample_df.loc[1, 'Location'] = None
+
+    valid_df, errors = validate_orders(sample_df)
+    load_orders_bulk(mock_conn, valid_df)
+
+    assert errors[0] == (2, "missing Location")
+    (staged,) = copied_rows(ORDER_STAGING_COLUMNS)
+    assert (staged['location_id'], staged['server_id']) == (1, 7)
+
+
+def test_load_orders_bulk_rolls_back_on_error(mock_connection, sample_df):
+    """A failed merge rolls back the whole batch."""
+    mock_conn, mock_cursor = mock_connection
+    mock_cursor.fetchall.side_effect = [
+        [("1234 Elmwood Avenue", 1)],  # locations
+        [("Bartender A", 7)],  # server aliases
+    ]
+    mock_cursor.copy.side_effect = RuntimeError("copy failed")
+
+    valid_df, _ = validate_orders(sample_df)
+    with pytest.raises(RuntimeError):
+        load_orders_bulk(mock_conn, valid_df)
+
+    mock_conn.rollback.assert_called_once()
+    mock_conn.commit.assert_called_once()  # only the dimension transaction
+
+
+def test_load_orders_bulk_uses_cached_dimensions(mock_connection, sample_df):
+    """Cached locations and servers are not looked up again."""
+    mock_conn, mock_cursor = mock_connection
+    mock_cursor.rowcount = 2
+    cache = DimensionCache()
+    cache.put('locations', "1234 Elmwood Avenue", 1)
+    cache.put('employee_aliases', "Bartender A", 7)
+
+    valid_df, _ = validate_orders(sample_df)
+    load_orders_bulk(mock_conn, valid_df, cache)
+
+    mock_cursor.fetchall.assert_not_called()
+    assert cache.hits == 2
+
+
+def test_process_orders_loads_each_chunk(mock_connection, sample_df, monkeypatch):
+    """Each chunk is validated and loaded on its own and the counts are summed."""
+    mock_conn, _ = mock_connection
+    chunks = [sample_df.iloc[:2], sample_df.iloc[2:]]
+    monkeypatch.setattr('toast_exports.file_processors.orders_processor.iter_csv_chunks',
+                        lambda path, memory_budget_mb, schema: iter(chunks))
+    loaded = []
+    monkeypatch.setattr('toast_exports.file_processors.orders_processor.load_orders_bulk',
+                        lambda conn, orders, cache: loaded.append(len(orders)) or (len(orders), 0))
+
+    result = process_orders(mock_conn, "sample_data/20240410")
+
+    assert loaded == [2, 0]
+    assert result == (2, 0, 2)
+
+
+def test_process_orders_rejects_malformed_amount_per_row(mock_connection, tmp_path, monkeypatch):
+    """A bad Amount cell rejects its own row instead of failing the read of the whole file."""
+    mock_conn, _ = mock_connection
+    lines = SAMPLE_ORDER_DETAILS_DATA.splitlines()
+    lines[2] = lines[2].replace(",1.88,", ",1.88 USD,")
+    (tmp_path / "OrderDetails.csv").write_text("\n".join(lines[:3]) + "\n")
+    loaded = []
+    monkeypatch.setattr('toast_exports.file_processors.orders_processor.load_orders_bulk',
+                        lambda conn, orders, cache: loaded.append(list(orders['order_id'])) or (len(orders), 0))
+
+    result = process_orders(mock_conn, tmp_path)
+
+    assert loaded == [[900000004019159011]]
+    assert result == (1, 0, 1)
+
+
+def test_process_orders_row_by_row_passes_blanks_as_none(mock_connection, tmp_path):
+    """The row-by-row fallback sends blank cells such as Table as NULL, never <NA>."""
+    mock_conn, mock_cursor = mock_connection
+    lines = SAMPLE_ORDER_DETAILS_DATA.splitlines()
+    (tmp_path / "OrderDetails.csv").write_text("\n".join(lines[:3]) + "\n")
+    mock_cursor.fetchone.return_value = (1,)
+    mock_cursor.fetchall.return_value = [("Bartender A", 7)]  # server aliases
+    mock_cursor.rowcount = 1
+
+    result = process_orders(mock_conn, tmp_path, bulk=False)
+
+    assert result == (2, 0, 0)
+    inserts = [call.args[1] for call in mock_cursor.execute.call_args_list if "INSERT INTO orders" in call.args[0]]
+    assert len(inserts) == 2
+    assert inserts[0][9] is None  # table_number
+    assert not any(value is pd.NA for params in inserts for value in params)
+
+
+def test_process_orders_row_by_row_resolves_servers_by_alias(mock_connection, tmp_path):
+    """Servers are resolved once through their aliases; an order without one is an error."""
+    mock_conn, mock_cursor = mock_connection
+    lines = SAMPLE_ORDER_DETAILS_DATA.splitlines()
+    (tmp_path / "OrderDetails.csv").write_text("\n".join([lines[0], lines[1], lines[4]]) + "\n")
+    mock_cursor.fetchone.return_value = (1,)
+    mock_cursor.fetchall.return_value = [("Bartender A", 7)]  # server aliases
+    mock_cursor.rowcount = 1
+
+    result = process_orders(mock_conn, tmp_path, bulk=False)
+
+    assert result == (1, 0, 1)
+    statements = [call.args[0] for call in mock_cursor.execute.call_args_list]
+    assert not any("INSERT INTO employees" in statement for statement in statements)
+    alias_lookups = [call.args[1] for call in mock_cursor.execute.call_args_list if "FROM employee_name_aliases" in call.args[0]]
+    assert alias_lookups == [(["Bartender A"],)]
+    (insert,) = [call.args[1] for call in mock_cursor.execute.call_args_list if "INSERT INTO orders" in call.args[0]]
+    assert insert[8] == 7  # server_id
@@ -0,0 +1,79 @@
+import logging
+from datetime import date
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from toast_exports.db.create_tables import create_tables
+from toast_exports.db.partitions import (
+    count_order_orphans, detach_partition, ensure_partitions, month_start, next_month, partition_name,
+)
+
+
+def test_partition_months():
+    """Partitions cover whole calendar months, named by year and month."""
+    assert month_start(pd.Timestamp("2024-04-17 18:30")) == date(2024, 4, 1)
+    assert next_month(date(2024, 4, 1)) == date(2024, 5, 1)
+    assert next_month(date(2024, 12, 1)) == date(2025, 1, 1)
+    assert partition_name("orders", date(2024, 4, 1)) == "orders_2024_04"
+
+
+def test_ensure_partitions_creates_missing_months():
+    """Only months without a partition are created, each once."""
+    cursor = MagicMock()
+    cursor.fetchall.return_value = [("orders_2024_04",)]
+    values = pd.Series(pd.to_datetime(["2024-04-01 11:00", "2024-05-02 12:00", "2024-05-30 20:00", None]))
+
+    assert ensure_partitions(cursor, "orders", values) == ["orders_2024_05"]
+    executed = [call.args[0] for call in cursor.execute.call_args_list]
+    assert "pg_advisory_xact_lock" in executed[0]
+    assert len(executed) == 3
+
+
+def test_ensure_partitions_skips_empty_batches():
+    """A batch without dates does not touch the database."""
+    cursor = MagicMock()
+
+    assert ensure_partitions(cursor, "time_entries", [None, pd.NaT]) == []
+    cursor.execute.assert_not_called()
+
+
+def test_create_tables_partitioned():
+    """Partitioned orders and time entries are keyed by their partition column."""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+
+    create_tables(conn, partitioned=True)
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    orders = next(s for s in statements if "CREATE TABLE IF NOT EXISTS orders (" in s)
+    time_entries = next(s for s in statements if "CREATE TABLE IF NOT EXISTS time_entries (" in s)
+    checks = next(s for s in statements if "CREATE TABLE IF NOT EXISTS checks (" in s)
+    assert "PRIMARY KEY (id, opened_at)" in orders
+    assert "PARTITION BY RANGE (opened_at)" in orders
+    assert "PARTITION BY RANGE (in_date)" in time_entries
+    assert "fk_order" not in checks
+
+
+def test_count_order_orphans_reports_tables_with_orphans():
+    """Each child table is checked, and only tables with orphans are reported."""
+    cursor = MagicMock()
+    cursor.fetchone.side_effect = [(0,), (12,), (3,)]
+
+    assert count_order_orphans(cursor) == {'item_selections': 12, 'payments': 3}
+    assert cursor.execute.call_count == 3
+
+
+def test_detach_orders_partition_logs_orphans(caplog):
+    """Detaching an orders month warns about the child rows it left without an order."""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchone.side_effect = [(4,), (0,), (0,)]
+
+    with caplog.at_level(logging.WARNING):
+        detach_partition(conn, 'orders', date(2021, 1, 15))
+
+    conn.commit.assert_called_once()
+    assert [record.getMessage() for record in caplog.records] == [
+        "4 checks rows no longer have an order after detaching orders_2021_01"
+    ]
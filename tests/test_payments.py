@@ -0,0 +1,79 @@
+import pytest
+import pandas as pd
+from datetime import datetime
+from io import StringIO
+
+from toast_exports.db.dimension_cache import DimensionCache
+from toast_exports.file_processors.payments_processor import (
+    validate_payments,
+    load_payments_bulk,
+    PAYMENT_STAGING_COLUMNS,
+)
+from toast_exports.transforms.payments import PAYMENT_DTYPES
+
+SAMPLE_PAYMENT_DATA = """Location,Payment Id,Order Id,Order #,Paid Date,Order Date,Check Id,Check #,Tab Name,Server,Table,Dining Area,Service,Dining Option,House Acct #,Amount,Tip,Gratuity,Total,Swiped Card Amount,Keyed Card Amount,Amount Tendered,Refunded,Refund Date,Refund Amount,Refund Tip Amount,Void User,Void Approver,Void Date,Status,Type,Cash Drawer,Card Type,Other Type,Email,Phone,Last 4 Card Digits,V/MC/D Fees,Room Info,Receipt,Source
+1234 Elmwood Avenue,900000004019193393,900000004019190489,2,4/10/24 4:28 PM,4/10/24 4:28 PM,900000004019190488,2,,Bartender A,,,Dinner,,,2.0,0.0,0.0,2.0,0.0,0.0,20.0,NONE,,,,,,,CAPTURED,Cash,Bar-1 Receipt,,,,,,,,yeFff9QnUVVr4,In Store
+1234 Elmwood Avenue,900000004019558511,900000004019557063,3,4/10/24 4:42 PM,4/10/24 4:42 PM,900000004019557062,3,,Bartender A,,,Dinner,,,2.0,0.5,0.0,2.5,2.5,0.0,2.5,NONE,,,,,,,AUTHORIZED,Credit,,Visa,,,,0042,,,XG4MjeyABboyj,In Store
+1234 Elmwood Avenue,900000004019558512,900000004019557063,3,not a date,4/10/24 4:42 PM,900000004019557062,3,,Bartender A,,,Dinner,,,2.0,0.0,0.0,2.0,0.0,0.0,2.0,NONE,,,,,,,CAPTURED,Cash,Bar-1 Receipt,,,,,,,,XG4MjeyABboyk,In Store
+"""
+
+
+@pytest.fixture
+def sample_df():
+    """Create a sample PaymentDetails DataFrame for testing."""
+    return pd.read_csv(StringIO(SAMPLE_PAYMENT_DATA), dtype=PAYMENT_DTYPES)
+
+
+def test_validate_payments(sample_df):
+    """Card digits keep leading zeros and bad dates are reported."""
+    payments, errors = validate_payments(sample_df)
+
+    assert list(payments['payment_id']) == [900000004019193393, 900000004019558511]
+    assert list(payments['card_last_4']) == [None, "0042"]
+    assert errors == [("900000004019558512", "missing or invalid Paid Date")]
+
+
+def test_load_payments_bulk_resolves_codes_and_joins(mock_connection, copied_rows, sample_df):
+    """Enumerations become code ids and orders/checks are joined in one merge."""
+    mock_conn, mock_cursor = mock_connection
+    cache = DimensionCache()
+    cache.update('payment_types', {"Cash": 1, "Credit": 2})
+    cache.update('payment_statuses', {"CAPTURED": 1, "AUTHORIZED": 2})
+    cache.update('card_types', {"Visa": 3})
+    mock_cursor.fetchone.return_value = (0,)
+    mock_cursor.rowcount = 2
+
+    payments, _ = validate_payments(sample_df)
+    result = load_payments_bulk(mock_conn, payments, cache)
+
+    assert result == (2, 0, 0)
+    cash, credit = copied_rows(PAYMENT_STAGING_COLUMNS)
+    assert (cash['payment_id'], cash['order_id'], cash['check_id']) == (
+        900000004019193393, 900000004019190489, 900000004019190488,
+    )
+    assert cash['paid_at'] == datetime(2024, 4, 10, 16, 28)
+    assert (cash['amount'], cash['total'], cash['amount_tendered']) == (2.0, 2.0, 20.0)
+    assert (cash['type_id'], cash['status_id'], cash['card_type_id']) == (1, 1, None)
+    assert (cash['cash_drawer'], cash['receipt']) == ("Bar-1 Receipt", "yeFff9QnUVVr4")
+    assert (credit['type_id'], credit['status_id'], credit['card_type_id']) == (2, 2, 3)
+    assert (credit['tip'], credit['card_last_4']) == (0.5, "0042")
+    merge_sql = mock_cursor.execute.call_args_list[-1].args[0]
+    assert "JOIN orders o ON o.order_id = s.order_id" in merge_sql
+    assert "LEFT JOIN checks c ON c.check_id = s.check_id" in merge_sql
+    assert mock_conn.commit.call_count == 2
+
+
+def test_load_payments_bulk_rolls_back_on_error(mock_connection, sample_df):
+    """A failed load rolls back and drops cached code ids."""
+    mock_conn, mock_cursor = mock_connection
+    cache = DimensionCache()
+    cache.update('payment_types', {"Cash": 1, "Credit": 2})
+    mock_cursor.fetchall.return_value = [("CAPTURED", 1), ("AUTHORIZED", 2), ("Visa", 3)]
+    mock_cursor.copy.side_effect = Exception("copy failed")
+
+    payments, _ = validate_payments(sample_df)
+    with pytest.raises(Exception, match="copy failed"):
+        load_payments_bulk(mock_conn, payments, cache)
+
+    mock_conn.rollback.assert_called_once()
+    assert cache.invalidations == 1
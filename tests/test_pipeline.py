@@ -0,0 +1,100 @@
+import pytest
+from datetime import date
+from unittest.mock import patch, MagicMock
+
+from toast_exports.db.manifest import file_fingerprint
+from toast_exports.metrics import RunMetrics
+from toast_exports.pipeline import run_export, parse_export_date
+
+
+@pytest.fixture
+def export_dir(tmp_path):
+    """Create a dated export directory with an orders and a time entries file."""
+    data_dir = tmp_path / "20240410"
+    data_dir.mkdir()
+    (data_dir / "OrderDetails.csv").write_text("Location,Order Id\n1234 Elmwood Avenue,1\n")
+    (data_dir / "TimeEntries.csv").write_text("Location,Employee Id\n1234 Elmwood Avenue,4286\n")
+    return data_dir
+
+
+@pytest.fixture
+def processors():
+    """Patch every processor the pipeline calls."""
+    with patch('toast_exports.pipeline.insert_menus_into_db') as menus, \
+            patch('toast_exports.pipeline.process_orders', return_value=(1, 0, 0)) as orders, \
+            patch('toast_exports.pipeline.process_time_entries', return_value=(1, 0, 0)) as time_entries:
+        yield menus, orders, time_entries
+
+
+def test_parse_export_date():
+    """Export dates come from YYYYMMDD directory names."""
+    assert parse_export_date("sample_data/20240410") == date(2024, 4, 10)
+    assert parse_export_date("sample_data/latest") is None
+
+
+def test_file_fingerprint(export_dir):
+    """Fingerprints are a SHA-256 hex digest plus the file size."""
+    content_hash, file_size = file_fingerprint(export_dir / "OrderDetails.csv")
+
+    assert len(content_hash) == 64
+    assert file_size == len("Location,Order Id\n1234 Elmwood Avenue,1\n")
+
+
+@patch('toast_exports.pipeline.record_load')
+@patch('toast_exports.pipeline.load_manifest')
+def test_run_export_skips_unchanged_files(mock_load_manifest, mock_record_load, export_dir, processors):
+    """Only files whose hash differs from the manifest are processed and recorded."""
+    _, process_orders, process_time_entries = processors
+    orders_hash, _ = file_fingerprint(export_dir / "OrderDetails.csv")
+    mock_load_manifest.return_value = {"OrderDetails.csv": orders_hash, "TimeEntries.csv": "stale"}
+    conn = MagicMock()
+
+    results = run_export(conn, export_dir)
+
+    process_orders.assert_not_called()
+    process_time_entries.assert_called_once()
+    assert results['orders'] == (0, 0, 0)
+    assert results['time_entries'] == (1, 0, 0)
+    mock_record_load.assert_called_once()
+    assert mock_record_load.call_args.args[1:3] == (date(2024, 4, 10), "TimeEntries.csv")
+
+
+@patch('toast_exports.pipeline.record_load')
+@patch('toast_exports.pipeline.load_manifest')
+def test_run_export_force_reloads(mock_load_manifest, mock_record_load, export_dir, processors):
+    """force reloads files even when the manifest says they are unchanged."""
+    _, process_orders, _ = processors
+    orders_hash, _ = file_fingerprint(export_dir / "OrderDetails.csv")
+    mock_load_manifest.return_value = {"OrderDetails.csv": orders_hash}
+
+    run_export(MagicMock(), export_dir, force=True)
+
+    process_orders.assert_called_once()
+
+
+@patch('toast_exports.pipeline.record_load')
+@patch('toast_exports.pipeline.load_manifest', return_value={})
+def test_run_export_records_stage_metrics(mock_load_manifest, mock_record_load, export_dir, processors):
+    """Processed stages record their row counts, bytes read and wall time."""
+    metrics = RunMetrics(export_dir)
+
+    run_export(MagicMock(), export_dir, metrics=metrics)
+
+    orders = metrics.stages['orders']
+    assert orders.status == 'ok'
+    assert (orders.inserted, orders.skipped, orders.errors) == (1, 0, 0)
+    assert orders.bytes_read == (export_dir / "OrderDetails.csv").stat().st_size
+    assert 'payments' not in metrics.stages
+
+
+@patch('toast_exports.pipeline.record_load')
+@patch('toast_exports.pipeline.load_manifest', return_value={})
+def test_run_export_does_not_record_files_with_errors(mock_load_manifest, mock_record_load, export_dir, processors):
+    """Files with rejected rows stay out of the manifest so the next run loads them again."""
+    _, process_orders, _ = processors
+    process_orders.return_value = (1, 0, 2)
+
+    run_export(MagicMock(), export_dir)
+
+    recorded = [call.args[2] for call in mock_record_load.call_args_list]
+    assert recorded == ["TimeEntries.csv"]
@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+
+from toast_exports.readers import estimate_chunk_rows, iter_csv_chunks, MIN_CHUNK_ROWS
+from toast_exports.schemas import Column
+
+
+@pytest.fixture
+def large_csv(tmp_path):
+    """Write a CSV with enough rows to need several chunks."""
+    path = tmp_path / "OrderDetails.csv"
+    pd.DataFrame({
+        "Order Id": range(5000),
+        "Server": ["Bartender A"] * 5000,
+    }).to_csv(path, index=False)
+    return path
+
+
+def test_estimate_chunk_rows_scales_with_budget(large_csv):
+    """A bigger memory budget gives bigger chunks, never below the minimum."""
+    small = estimate_chunk_rows(large_csv, memory_budget_mb=1)
+    large = estimate_chunk_rows(large_csv, memory_budget_mb=8)
+
+    assert MIN_CHUNK_ROWS <= small < large
+
+
+def test_iter_csv_chunks_reads_every_row_once(large_csv, monkeypatch):
+    """Chunks cover the file in order without overlap."""
+    monkeypatch.setattr('toast_exports.readers.estimate_chunk_rows', lambda *args, **kwargs: 1500)
+
+    chunks = list(iter_csv_chunks(large_csv, memory_budget_mb=1))
+
+    assert [len(chunk) for chunk in chunks] == [1500, 1500, 1500, 500]
+    assert pd.concat(chunks)["Order Id"].tolist() == list(range(5000))
+
+
+ORDER_SCHEMA = [
+    Column("Order Id", "Int64", False),
+    Column("Server", "string"),
+    Column("Order Source", "category"),
+]
+
+
+@pytest.fixture
+def orders_csv(tmp_path):
+    """Write an export with an id column that has a blank and a column no schema uses."""
+    path = tmp_path / "OrderDetails.csv"
+    path.write_text(
+        "Order Id,Checks,Server\n"
+        "900000004019159011,1,Bartender A\n"
+        ",2,\n"
+        "900000004019190489,3,Server B\n"
+    )
+    return path
+
+
+def test_iter_csv_chunks_reads_schema_columns_with_their_dtypes(orders_csv):
+    """Only schema columns are read, ids stay exact and missing nullable columns are blank."""
+    chunk, = iter_csv_chunks(orders_csv, schema=ORDER_SCHEMA)
+
+    assert list(chunk.columns) == ["Order Id", "Server", "Order Source"]
+    assert chunk["Order Id"].dtype == "Int64"
+    assert chunk["Order Id"].tolist()[::2] == [900000004019159011, 900000004019190489]
+    assert chunk["Server"].dtype == "string"
+    assert chunk["Order Source"].isna().all()
+
+
+def test_iter_csv_chunks_rejects_missing_required_columns(orders_csv):
+    """A file without a column that may not be blank is refused before any row is read."""
+    schema = ORDER_SCHEMA + [Column("Opened", "string", False)]
+
+    with pytest.raises(ValueError, match="Opened"):
+        list(iter_csv_chunks(orders_csv, schema=schema))
+
+
+def test_pyarrow_engine_matches_default_engine(orders_csv):
+    """The pyarrow reader returns the same typed columns as pandas' own parser."""
+    pytest.importorskip("pyarrow")
+
+    default, = iter_csv_chunks(orders_csv, schema=ORDER_SCHEMA, engine="c")
+    arrow, = iter_csv_chunks(orders_csv, schema=ORDER_SCHEMA, engine="pyarrow")
+
+    pd.testing.assert_frame_equal(arrow, default)
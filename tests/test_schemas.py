@@ -0,0 +1,46 @@
+import pytest
+from pathlib import Path
+
+from toast_exports.readers import iter_csv_chunks
+from toast_exports.schemas import SCHEMAS
+from toast_exports.file_processors.cash_entries_processor import validate_cash_entries
+from toast_exports.file_processors.checks_processor import validate_checks
+from toast_exports.file_processors.item_selections_processor import validate_item_selections
+from toast_exports.file_processors.kitchen_timings_processor import validate_kitchen_timings
+from toast_exports.file_processors.modifier_selections_processor import validate_modifier_selections
+from toast_exports.file_processors.orders_processor import validate_orders
+from toast_exports.file_processors.payments_processor import validate_payments
+
+SAMPLE_DIR = Path(__file__).resolve().parent.parent / "sample_data" / "20240410"
+
+VALIDATORS = {
+    'OrderDetails.csv': validate_orders,
+    'CheckDetails.csv': validate_checks,
+    'ItemSelectionDetails.csv': validate_item_selections,
+    'ModifiersSelectionDetails.csv': validate_modifier_selections,
+    'PaymentDetails.csv': validate_payments,
+    'KitchenTimings.csv': validate_kitchen_timings,
+    'CashEntries.csv': validate_cash_entries,
+}
+
+
+@pytest.mark.parametrize("file_name", sorted(VALIDATORS))
+def test_schema_reads_sample_export(file_name):
+    """The sample export reads with its schema and every target column is produced."""
+    schema = SCHEMAS[file_name]
+
+    chunk, = iter_csv_chunks(SAMPLE_DIR / file_name, schema=schema)
+    transformed, errors = VALIDATORS[file_name](chunk)
+
+    assert list(chunk.columns) == [column.name for column in schema]
+    assert errors == []
+    assert {column.target for column in schema if column.target} <= set(transformed.columns)
+
+
+def test_time_entries_schema_keeps_codes_as_text():
+    """Job codes and ids are 18-digit numbers that must not go through float64."""
+    chunk, = iter_csv_chunks(SAMPLE_DIR / "TimeEntries.csv", schema=SCHEMAS["TimeEntries.csv"])
+
+    assert chunk["Job Code"].dtype == "string"
+    assert chunk["Employee Id"].dtype == "string"
+    assert chunk["Job Id"].dtype == "string"
@@ -1,20 +1,21 @@
 import pytest
 import pandas as pd
 import psycopg
-from unittest.mock import patch, mock_open, MagicMock
-import os
-import sys
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
 
-# Add the project root to the path so we can import the modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from file_processors.time_entries_processor import (
+from toast_exports.file_processors.time_entries_processor import (
     process_time_entries,
     import_locations,
     import_jobs,
     import_employees,
-    import_time_entries
+    import_time_entries,
+    validate_time_entries,
+    TIME_ENTRY_STAGING_COLUMNS,
 )
+from toast_exports.db.dimension_cache import DimensionCache
+from toast_exports.schemas import TIME_ENTRIES_SCHEMA
 
 # Sample data for testing
 SAMPLE_TIME_ENTRIES_DATA = """Location,Job Id,Job GUID,Job Code,Job Title,Employee Id,Employee GUID,Employee External Id,Employee,In Date,Out Date,Auto Clock-out,Total Hours,Unpaid Break Time,Paid Break Time,Payable Hours,Cash Tips Declared,Non Cash Tips,Total Gratuity,Total Tips,Tips Withheld,Wage,Regular Hours,Overtime Hours,Regular Pay,Overtime Pay,Total Pay
@@ -24,131 +25,184 @@ SAMPLE_TIME_ENTRIES_DATA = """Location,Job Id,Job GUID,Job Code,Job Title,Employ
 """
 
 
-@pytest.fixture
-def mock_connection():
-    """Create a mock database connection with cursor for testing."""
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-    return mock_conn, mock_cursor
-
-
 @pytest.fixture
 def sample_df():
     """Create a sample DataFrame for testing."""
     return pd.read_csv(pd.io.common.StringIO(SAMPLE_TIME_ENTRIES_DATA))
 
 
+def test_validate_time_entries_rejects_bad_ids():
+    """Ids are parsed exactly from text, and rows with a missing or malformed id are reported."""
+    df = pd.DataFrame({
+        'Employee': ["A, Cook", "B, Server", "C, Manager"],
+        'Employee Id': pd.array(["900000000128688048", "not an id", "4288"], dtype='string'),
+        'Job Id': pd.array(["900000004018475556", "900000004018475556", None], dtype='string'),
+    })
+
+    entries, errors = validate_time_entries(df)
+
+    assert list(entries['Employee Id']) == [900000000128688048]
+    assert list(entries['Job Id']) == [900000004018475556]
+    assert errors == [
+        ("B, Server", "missing or invalid Employee Id"),
+        ("C, Manager", "missing or invalid Job Id"),
+    ]
+
+
 def test_import_locations(mock_connection, sample_df):
-    """Test that locations are correctly imported."""
+    """Distinct locations are resolved in a single statement."""
     mock_conn, mock_cursor = mock_connection
-    
-    # Execute the function
-    import_locations(mock_conn, sample_df)
-    
-    # Check that the correct SQL was executed
-    mock_cursor.execute.assert_any_call(
-        """
-                    INSERT INTO locations (location)
-                    VALUES (%s)
-                    ON CONFLICT DO NOTHING
-                    """, 
-        ('1234 Elmwood Avenue',)
-    )
-    
-    mock_cursor.execute.assert_any_call(
-        """
-                    INSERT INTO locations (location)
-                    VALUES (%s)
-                    ON CONFLICT DO NOTHING
-                    """, 
-        ('5678 Oak Street',)
-    )
-    
-    # Check that commit was called
+    mock_cursor.fetchall.return_value = [('1234 Elmwood Avenue', 1), ('5678 Oak Street', 2)]
+
+    location_ids = import_locations(mock_conn, sample_df)
+
+    assert location_ids == {'1234 Elmwood Avenue': 1, '5678 Oak Street': 2}
+    mock_cursor.execute.assert_called_once()
+    assert mock_cursor.execute.call_args.args[1][0] == ['1234 Elmwood Avenue', '5678 Oak Street']
     mock_conn.commit.assert_called_once()
 
 
+def test_import_locations_skips_cached(mock_connection, sample_df):
+    """Cached locations are not sent to the database again."""
+    mock_conn, mock_cursor = mock_connection
+    cache = DimensionCache()
+    cache.put('locations', '1234 Elmwood Avenue', 1)
+    mock_cursor.fetchall.return_value = [('5678 Oak Street', 2)]
+
+    location_ids = import_locations(mock_conn, sample_df, cache)
+
+    assert location_ids == {'1234 Elmwood Avenue': 1, '5678 Oak Street': 2}
+    assert mock_cursor.execute.call_args.args[1][0] == ['5678 Oak Street']
+    assert cache.get('locations', '5678 Oak Street') == 2
+
+
 def test_import_jobs(mock_connection, sample_df):
-    """Test that jobs are correctly imported."""
+    """Distinct jobs are inserted in one statement and mapped to surrogate ids."""
     mock_conn, mock_cursor = mock_connection
-    
-    # Execute the function
-    import_jobs(mock_conn, sample_df)
-    
-    # Check that the correct SQL was executed for each unique job
-    # Use assert_called to check if the function was called, without checking exact parameters
-    assert mock_cursor.execute.called
-    
-    # Check that commit was called
+    mock_cursor.fetchall.return_value = [(900000004018475556, 1), (900000004018475557, 2)]
+
+    job_ids = import_jobs(mock_conn, sample_df)
+
+    assert job_ids == {900000004018475556: 1, 900000004018475557: 2}
+    job_id_param, job_guid_param, job_code_param, _ = mock_cursor.execute.call_args.args[1]
+    assert job_id_param == [900000004018475556, 900000004018475557]
+    assert job_guid_param == ['b8f86cb1-dac3-404d-9829-dbbd57878b17', 'c8f86cb1-dac3-404d-9829-dbbd57878b18']
+    assert job_code_param == ['900000000128688048', '900000000128688049']
     mock_conn.commit.assert_called_once()
 
 
 def test_import_employees(mock_connection, sample_df):
-    """Test that employees are correctly imported."""
+    """Employees are upserted by Toast id with their names formatted."""
     mock_conn, mock_cursor = mock_connection
-    
-    # Execute the function
-    import_employees(mock_conn, sample_df)
-    
-    # Check that the function was called without checking exact parameters
-    assert mock_cursor.execute.called
-    
-    # Check that commit was called
+    mock_cursor.fetchall.return_value = [(4286, 1), (4287, 2), (4288, 3)]
+    df = sample_df.assign(Employee=['Cook A', 'Server B', 'Manager C'])
+
+    import_employees(mock_conn, df)
+
+    employee_id_param, _, _, employee_name_param = mock_cursor.execute.call_args_list[1].args[1]
+    assert employee_id_param == [4286, 4287, 4288]
+    assert employee_name_param == ['A, Cook', 'B, Server', 'C, Manager']
     mock_conn.commit.assert_called_once()
 
 
-def test_import_time_entries(mock_connection, sample_df):
-    """Test that time entries are correctly imported."""
+def test_import_time_entries(mock_connection, copied_rows, sample_df):
+    """Ids not passed in are looked up once per dimension before staging."""
     mock_conn, mock_cursor = mock_connection
-    
-    # Setup mock cursor to return IDs for foreign keys
-    mock_cursor.fetchone.side_effect = [
-        (1,),  # location_id for first entry
-        (1,),  # employee_id for first entry
-        (1,),  # job_id for first entry
-        (1,),  # location_id for second entry
-        (2,),  # employee_id for second entry
-        (1,),  # job_id for second entry
-        (2,),  # location_id for third entry
-        (3,),  # employee_id for third entry
-        (2,),  # job_id for third entry
+    mock_cursor.fetchall.side_effect = [
+        [('1234 Elmwood Avenue', 1), ('5678 Oak Street', 2)],  # locations
+        [(4286, 1), (4287, 2), (4288, 3)],  # employees
+        [(900000004018475556, 1), (900000004018475557, 2)],  # jobs
+    ]
+    mock_cursor.rowcount = 3
+
+    assert import_time_entries(mock_conn, sample_df) == (3, 0, 0)
+
+    staged = copied_rows(TIME_ENTRY_STAGING_COLUMNS)
+    assert [(row['location_id'], row['employee_id'], row['job_id']) for row in staged] == [
+        (1, 1, 1), (1, 2, 1), (2, 3, 2),
     ]
-    
-    # Execute the function
-    import_time_entries(mock_conn, sample_df)
-    
-    # Check that the correct lookups were performed - using a more general approach
-    assert mock_cursor.execute.called
-    
-    # Check that commit was called
     mock_conn.commit.assert_called_once()
 
 
-@patch('file_processors.time_entries_processor.import_locations')
-@patch('file_processors.time_entries_processor.import_jobs')
-@patch('file_processors.time_entries_processor.import_employees')
-@patch('file_processors.time_entries_processor.import_time_entries')
-@patch('builtins.open', new_callable=mock_open, read_data=SAMPLE_TIME_ENTRIES_DATA)
-@patch('pandas.read_csv')
-def test_process_time_entries(mock_read_csv, mock_file, mock_import_time_entries, 
-                             mock_import_employees, mock_import_jobs, mock_import_locations, 
+def test_import_employees_resolves_distinct_employees_once(mock_connection, sample_df):
+    """Repeated employees are upserted in a single statement and mapped to surrogate ids."""
+    mock_conn, mock_cursor = mock_connection
+    repeated_df = pd.concat([sample_df, sample_df], ignore_index=True)
+    mock_cursor.fetchall.return_value = [(4286, 1), (4287, 2), (4288, 3)]
+
+    employee_ids = import_employees(mock_conn, repeated_df)
+
+    assert employee_ids == {4286: 1, 4287: 2, 4288: 3}
+    assert mock_cursor.execute.call_count == 3  # advisory lock, the upsert, then the aliases
+    employee_id_param = mock_cursor.execute.call_args_list[1].args[1][0]
+    assert employee_id_param == [4286, 4287, 4288]
+
+
+def test_import_employees_records_name_aliases(mock_connection, sample_df):
+    """Names as spelled in TimeEntries are recorded as aliases of the upserted employees."""
+    mock_conn, mock_cursor = mock_connection
+    mock_cursor.fetchall.return_value = [(4286, 1), (4287, 2), (4288, 3)]
+    cache = DimensionCache()
+    df = sample_df.assign(Employee=['A, Cook', 'B, Server', 'C, Manager'])
+
+    import_employees(mock_conn, df, cache)
+
+    alias_sql, (aliases, alias_employee_ids) = mock_cursor.execute.call_args.args
+    assert "INSERT INTO employee_name_aliases" in alias_sql
+    assert aliases == ['A, Cook', 'B, Server', 'C, Manager']
+    assert alias_employee_ids == [1, 2, 3]
+    assert cache.get('employee_aliases', 'B, Server') == 2
+    mock_conn.commit.assert_called_once()
+
+
+def test_import_time_entries_batches_rows(mock_connection, copied_rows, sample_df):
+    """Resolved time entries are staged with one COPY and merged in one statement."""
+    mock_conn, mock_cursor = mock_connection
+    mock_cursor.rowcount = 3
+
+    inserted_count, skipped_count, error_count = import_time_entries(
+        mock_conn,
+        sample_df,
+        location_ids={'1234 Elmwood Avenue': 1, '5678 Oak Street': 2},
+        employee_ids={4286: 1, 4287: 2, 4288: 3},
+        job_ids={900000004018475556: 1, 900000004018475557: 2},
+    )
+
+    assert (inserted_count, skipped_count, error_count) == (3, 0, 0)
+    cook, server, manager = copied_rows(TIME_ENTRY_STAGING_COLUMNS)
+    assert (cook['in_date'], cook['out_date']) == (datetime(2024, 4, 10, 15, 57), datetime(2024, 4, 10, 21, 1))
+    assert (cook['auto_clock_out'], cook['payable_hours'], cook['total_pay']) == (False, 5.07, 70.98)
+    assert (server['unpaid_break_time'], server['cash_tips_declared'], server['total_tips']) == (0.5, 25.0, 100.0)
+    assert (manager['location_id'], manager['job_id'], manager['wage']) == (2, 2, 20.0)
+    merge_sql = mock_cursor.execute.call_args_list[-1].args[0]
+    assert "ON CONFLICT (employee_id, in_date) DO NOTHING" in merge_sql
+    mock_conn.commit.assert_called_once()
+
+
+@patch('toast_exports.file_processors.time_entries_processor.import_locations')
+@patch('toast_exports.file_processors.time_entries_processor.import_jobs')
+@patch('toast_exports.file_processors.time_entries_processor.import_employees')
+@patch('toast_exports.file_processors.time_entries_processor.import_time_entries')
+@patch('toast_exports.file_processors.time_entries_processor.iter_csv_chunks')
+def test_process_time_entries(mock_iter_csv_chunks, mock_import_time_entries,
+                             mock_import_employees, mock_import_jobs, mock_import_locations,
                              mock_connection, sample_df):
-    """Test the main process_time_entries function."""
+    """Each chunk is resolved and loaded, and the counts are summed across chunks."""
     mock_conn, _ = mock_connection
-    mock_read_csv.return_value = sample_df
-    
-    # Execute the function
-    process_time_entries(mock_conn)
-    
-    # Check that the file was opened correctly
-    mock_file.assert_called_once_with('./samaple-data/20240410/TimeEntries.csv', 'r')
-    
-    # Check that all the import functions were called with the correct arguments
-    mock_import_locations.assert_called_once()
-    mock_import_jobs.assert_called_once()
-    mock_import_employees.assert_called_once()
-    mock_import_time_entries.assert_called_once()
+    mock_iter_csv_chunks.return_value = iter([sample_df.iloc[:2], sample_df.iloc[2:]])
+    mock_import_time_entries.side_effect = [(2, 0, 0), (0, 1, 0)]
+
+    result = process_time_entries(mock_conn, data_dir='exports/20240410', memory_budget_mb=16)
+
+    assert result == (2, 1, 0)
+    path, budget = mock_iter_csv_chunks.call_args.args
+    assert path == Path('exports/20240410') / 'TimeEntries.csv'
+    assert budget == 16
+    assert mock_iter_csv_chunks.call_args.kwargs == {'schema': TIME_ENTRIES_SCHEMA}
+    assert mock_import_locations.call_count == 2
+    assert mock_import_jobs.call_count == 2
+    assert mock_import_employees.call_count == 2
+    assert mock_import_time_entries.call_count == 2
 
 
 def test_end_to_end_data_integrity(mock_connection):
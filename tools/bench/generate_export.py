@@ -0,0 +1,368 @@
+"""
+Generate a synthetic Toast export directory at benchmark scale.
+
+The files in sample_data/20240410 are the schema template. Every generated
+row is a template row with its keys, timestamps and amounts replaced, so
+column sets, names and categorical values match a real export. The keys are
+consistent across files:
+
+- every item selection belongs to a generated order and its check
+- every modifier selection points at a generated item selection on the same
+  check, with a selection id just above its parent's
+- time entries reuse the template's employees and jobs
+- the MenuExport holds the template's menus, groups, items and modifier
+  groups, plus generated items when more are asked for
+
+Rows are generated and appended in chunks of orders, so memory stays flat
+up to millions of rows. On average an order has 3 item selections and an
+item 0.5 modifiers, so --orders 3400000 gives about 10M item selections.
+
+Usage:
+    python tools/bench/generate_export.py OUT_DIR [--orders N] [--menu-items N] [--seed S]
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+TEMPLATE_DIR = Path(__file__).resolve().parents[2] / 'sample_data' / '20240410'
+
+# Id ranges kept far apart so generated ids never collide between files
+ORDER_ID_BASE = 910_000_000_000_000_000
+ITEM_SELECTION_ID_BASE = 920_000_000_000_000_000
+TIME_ENTRY_ID_BASE = 930_000_000_000_000_000
+
+# Modifier selection ids are their parent's id plus 1..MAX_MODIFIERS_PER_ITEM
+MAX_MODIFIERS_PER_ITEM = 9
+SELECTION_ID_STRIDE = MAX_MODIFIERS_PER_ITEM + 1
+
+MEAN_ITEMS_PER_ORDER = 3
+MEAN_MODIFIERS_PER_ITEM = 0.5
+ORDERS_PER_TIME_ENTRY = 20
+
+# Orders open between 10:00 and 23:59 and stay open up to three hours
+FIRST_ORDER_SECOND = 10 * 3600
+LAST_ORDER_SECOND = 24 * 3600 - 60
+MAX_ORDER_SECONDS = 3 * 3600
+
+TAX_RATE = 0.0625
+
+def load_template(template_dir=TEMPLATE_DIR):
+    """
+    Read the template export files as text, so values are written back unchanged.
+
+    Returns:
+    - dict: file stem -> DataFrame of template rows
+    """
+    names = ['OrderDetails', 'ItemSelectionDetails', 'ModifiersSelectionDetails', 'TimeEntries']
+    return {name: pd.read_csv(Path(template_dir) / f'{name}.csv', dtype=str) for name in names}
+
+def time_labels(export_date):
+    """
+    Return Toast-formatted timestamps ('4/10/24 4:26 PM') for every minute of the export day and the next.
+    """
+    labels = []
+    for day in (export_date, export_date + timedelta(days=1)):
+        prefix = f"{day.month}/{day.day}/{day:%y}"
+        for minute in range(24 * 60):
+            hour = minute // 60
+            labels.append(f"{prefix} {(hour % 12) or 12}:{minute % 60:02d} {'AM' if hour < 12 else 'PM'}")
+    return np.array(labels, dtype=object)
+
+def format_durations(seconds):
+    """
+    Format durations in seconds as HH:MM:SS.
+    """
+    seconds = pd.Series(seconds)
+    return (
+        (seconds // 3600).astype(str).str.zfill(2) + ':' +
+        (seconds // 60 % 60).astype(str).str.zfill(2) + ':' +
+        (seconds % 60).astype(str).str.zfill(2)
+    ).to_numpy()
+
+def sample_rows(rng, template, count):
+    """
+    Draw count template rows with replacement.
+    """
+    return template.iloc[rng.integers(0, len(template), count)].reset_index(drop=True)
+
+def money(values):
+    return np.round(values, 2)
+
+def price_value(text):
+    """
+    Return a template price as a float, 0.0 when it is missing.
+    """
+    value = pd.to_numeric(text, errors='coerce')
+    return 0.0 if pd.isna(value) else float(value)
+
+def generate_orders(rng, template, labels, first, count):
+    """
+    Generate one chunk of OrderDetails rows.
+
+    Returns:
+    - tuple: (OrderDetails DataFrame, dict of per-order arrays used by the item selections)
+    """
+    numbers = np.arange(first, first + count) + 1
+    order_ids = ORDER_ID_BASE + numbers * 2
+    opened = rng.integers(FIRST_ORDER_SECOND, LAST_ORDER_SECOND, count)
+    durations = rng.integers(5, MAX_ORDER_SECONDS, count)
+    paid = opened + durations
+    amounts = money(rng.gamma(2.0, 15.0, count))
+    tax = money(amounts * TAX_RATE)
+    tips = money(amounts * rng.choice([0.0, 0.15, 0.18, 0.2], count))
+
+    orders = sample_rows(rng, template, count)
+    orders['Order Id'] = order_ids
+    orders['Order #'] = numbers
+    orders['Checks'] = numbers
+    orders['Opened'] = labels[opened // 60]
+    orders['# of Guests'] = rng.integers(1, 7, count)
+    orders['Discount Amount'] = 0.0
+    orders['Amount'] = amounts
+    orders['Tax'] = tax
+    orders['Tip'] = tips
+    orders['Gratuity'] = 0.0
+    orders['Total'] = money(amounts + tax + tips)
+    orders['Voided'] = 'False'
+    orders['Paid'] = labels[paid // 60]
+    orders['Closed'] = labels[paid // 60]
+    orders['Duration (Opened to Paid)'] = format_durations(durations)
+    return orders, {
+        'order_id': order_ids,
+        'check_id': order_ids - 1,
+        'number': numbers,
+        'opened': labels[opened // 60],
+        'sent': labels[(opened + 60) // 60],
+    }
+
+def generate_item_selections(rng, template, orders, first_selection):
+    """
+    Generate the item selections of one chunk of orders.
+
+    Returns:
+    - DataFrame: ItemSelectionDetails rows
+    """
+    per_order = 1 + rng.poisson(MEAN_ITEMS_PER_ORDER - 1, len(orders['order_id']))
+    order_index = np.repeat(np.arange(len(per_order)), per_order)
+    count = len(order_index)
+
+    items = sample_rows(rng, template, count)
+    items['Order Id'] = orders['order_id'][order_index]
+    items['Order #'] = orders['number'][order_index]
+    items['Check Id'] = orders['check_id'][order_index]
+    items['Order Date'] = orders['opened'][order_index]
+    items['Sent Date'] = orders['sent'][order_index]
+    items['Item Selection Id'] = (
+        ITEM_SELECTION_ID_BASE + (first_selection + np.arange(count)) * SELECTION_ID_STRIDE
+    )
+    return items
+
+def generate_modifier_selections(rng, template, items):
+    """
+    Generate modifier selections for a chunk of item selections.
+
+    Each modifier copies its parent's order, check and dates, names the
+    parent's item id, and takes a selection id just above its parent's, which
+    is how the modifier loader matches a modifier to its item selection.
+    """
+    per_item = np.minimum(rng.poisson(MEAN_MODIFIERS_PER_ITEM, len(items)), MAX_MODIFIERS_PER_ITEM)
+    item_index = np.repeat(np.arange(len(items)), per_item)
+    # Position of each modifier among its parent's modifiers, from 1
+    starts = np.repeat(np.cumsum(per_item) - per_item, per_item)
+    offsets = np.arange(len(item_index)) - starts + 1
+
+    parents = items.iloc[item_index].reset_index(drop=True)
+    modifiers = sample_rows(rng, template, len(item_index))
+    for column in ('Location', 'Order Id', 'Order #', 'Sent Date', 'Order Date', 'Check Id', 'Server', 'Service'):
+        modifiers[column] = parents[column]
+    modifiers['Item Selection Id'] = parents['Item Selection Id'].to_numpy() + offsets
+    modifiers['Parent Menu Selection Item ID'] = parents['Item Id']
+    modifiers['Parent Menu Selection'] = parents['Menu Item']
+    return modifiers
+
+def generate_time_entries(rng, template, labels, first, count):
+    """
+    Generate one chunk of TimeEntries rows for the template's employees.
+    """
+    clock_in = rng.integers(6 * 3600, 16 * 3600, count)
+    shift = rng.integers(2 * 3600, 9 * 3600, count)
+    hours = np.round(shift / 3600, 2)
+    wages = pd.to_numeric(template['Wage'], errors='coerce').fillna(10.0).to_numpy()
+    wage = wages[rng.integers(0, len(wages), count)]
+
+    entries = sample_rows(rng, template, count)
+    entries['Id'] = TIME_ENTRY_ID_BASE + np.arange(first, first + count)
+    entries['GUID'] = [str(uuid.UUID(bytes=rng.bytes(16), version=4)) for _ in range(count)]
+    entries['In Date'] = labels[clock_in // 60]
+    entries['Out Date'] = labels[(clock_in + shift) // 60]
+    entries['Auto Clock-out'] = 'No'
+    for column in ('Total Hours', 'Payable Hours', 'Regular Hours'):
+        entries[column] = hours
+    entries['Unpaid Break Time'] = 0.0
+    entries['Paid Break Time'] = 0.0
+    entries['Overtime Hours'] = 0.0
+    entries['Wage'] = wage
+    entries['Regular Pay'] = money(hours * wage)
+    entries['Overtime Pay'] = 0.0
+    entries['Total Pay'] = money(hours * wage)
+    return entries
+
+def build_menus(template, menu_items, seed):
+    """
+    Build a MenuExport (V2 key names) from the menus, groups, items and modifiers in the template.
+
+    Item names and prices come from ItemSelectionDetails and modifier groups
+    from ModifiersSelectionDetails, attached to the items they modify. If
+    menu_items is larger than the template's item count, numbered copies of
+    template items are added until it is reached.
+
+    Returns:
+    - list: menu dicts
+    """
+    guid_rng = random.Random(seed)
+
+    def new_guid():
+        return str(uuid.UUID(int=guid_rng.getrandbits(128), version=4))
+
+    items = template['ItemSelectionDetails'].dropna(subset=['Menu', 'Menu Group', 'Menu Item'])
+    items = items.drop_duplicates(['Menu', 'Menu Group', 'Menu Item'])
+    modifiers = template['ModifiersSelectionDetails'].dropna(subset=['Option Group Name', 'Modifier'])
+
+    modifier_groups = {}
+    for (parent_name, group_name), group in modifiers.groupby(['Parent Menu Selection', 'Option Group Name']):
+        options = [
+            {'guid': new_guid(), 'name': name, 'price': price_value(price)}
+            for name, price in group.drop_duplicates('Modifier')[['Modifier', 'Gross Price']].itertuples(index=False)
+        ]
+        modifier_groups.setdefault(parent_name, []).append({
+            'guid': new_guid(),
+            'name': group_name,
+            'minSelections': 0,
+            'maxSelections': len(options),
+            'modifierOptions': options,
+        })
+
+    rows = [
+        (menu, group, name, price, name)
+        for menu, group, name, price in items[['Menu', 'Menu Group', 'Menu Item', 'Gross Price']].itertuples(index=False)
+    ]
+    template_count = len(rows)
+    for copy in range(max(0, (menu_items or 0) - template_count)):
+        menu, group, name, price, _ = rows[copy % template_count]
+        rows.append((menu, group, f"{name} {copy // template_count + 2}", price, name))
+
+    menus = {}
+    for menu_name, group_name, item_name, price, template_name in rows:
+        menu = menus.setdefault(menu_name, {
+            'guid': new_guid(), 'name': menu_name, 'idString': menu_name[:50], 'menuGroups': {},
+        })
+        group = menu['menuGroups'].setdefault(group_name, {
+            'guid': new_guid(), 'name': group_name, 'idString': group_name[:50], 'menuItems': [],
+        })
+        group['menuItems'].append({
+            'guid': new_guid(),
+            'name': item_name,
+            'price': price_value(price),
+            'modifierGroups': modifier_groups.get(template_name, []),
+        })
+    for menu in menus.values():
+        menu['menuGroups'] = list(menu['menuGroups'].values())
+    return list(menus.values())
+
+def write_menus(path, menus):
+    """
+    Write menus as a JSON array, one menu at a time.
+    """
+    with open(path, 'w') as file:
+        file.write('[')
+        for position, menu in enumerate(menus):
+            if position:
+                file.write(',\n')
+            file.write(json.dumps(menu))
+        file.write(']\n')
+
+def append_csv(frame, path, columns):
+    frame[columns].to_csv(path, mode='a', header=not path.exists(), index=False)
+
+def generate_export(out_dir, orders, template_dir=TEMPLATE_DIR, export_date=None, seed=0,
+                    menu_items=None, chunk_orders=100_000):
+    """
+    Write a synthetic export directory.
+
+    Parameters:
+    - out_dir: directory to write; name it YYYYMMDD to load it with the load manifest
+    - orders: number of orders to generate
+    - template_dir: export directory used as the schema template
+    - export_date: business date of the export (defaults to the date in the out_dir name, or today)
+    - seed: random seed; the same seed and sizes give the same files
+    - menu_items: menu items in the MenuExport (defaults to the template's items)
+    - chunk_orders: orders generated and written per chunk
+
+    Returns:
+    - dict: file name -> rows written
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if export_date is None:
+        try:
+            export_date = datetime.strptime(out_dir.name, '%Y%m%d').date()
+        except ValueError:
+            export_date = date.today()
+
+    template = load_template(template_dir)
+    rng = np.random.default_rng(seed)
+    labels = time_labels(export_date)
+    paths = {name: out_dir / f'{name}.csv' for name in template}
+    for path in paths.values():
+        path.unlink(missing_ok=True)
+    counts = {path.name: 0 for path in paths.values()}
+
+    for first in range(0, orders, chunk_orders):
+        count = min(chunk_orders, orders - first)
+        order_rows, order_keys = generate_orders(rng, template['OrderDetails'], labels, first, count)
+        items = generate_item_selections(
+            rng, template['ItemSelectionDetails'], order_keys, counts['ItemSelectionDetails.csv']
+        )
+        modifiers = generate_modifier_selections(rng, template['ModifiersSelectionDetails'], items)
+        for name, frame in (
+            ('OrderDetails', order_rows), ('ItemSelectionDetails', items), ('ModifiersSelectionDetails', modifiers),
+        ):
+            append_csv(frame, paths[name], template[name].columns)
+            counts[paths[name].name] += len(frame)
+
+    time_entry_count = max(1, orders // ORDERS_PER_TIME_ENTRY)
+    for first in range(0, time_entry_count, chunk_orders):
+        count = min(chunk_orders, time_entry_count - first)
+        entries = generate_time_entries(rng, template['TimeEntries'], labels, first, count)
+        append_csv(entries, paths['TimeEntries'], template['TimeEntries'].columns)
+        counts['TimeEntries.csv'] += len(entries)
+
+    menus = build_menus(template, menu_items, seed)
+    menu_path = out_dir / f'MenuExport_{export_date:%Y%m%d}.json'
+    write_menus(menu_path, menus)
+    counts[menu_path.name] = sum(len(group['menuItems']) for menu in menus for group in menu['menuGroups'])
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('out_dir', type=Path, help="export directory to write, e.g. bench_data/20240410")
+    parser.add_argument('--orders', type=int, default=10000, help="number of orders to generate")
+    parser.add_argument('--menu-items', type=int, default=None, help="menu items in the MenuExport")
+    parser.add_argument('--seed', type=int, default=0, help="random seed")
+    parser.add_argument('--template', type=Path, default=TEMPLATE_DIR, help="export directory used as the template")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate_export(args.out_dir, args.orders, args.template, seed=args.seed, menu_items=args.menu_items)
+    for name, rows in counts.items():
+        print(f"{name:<32} {rows:>10,} rows")
+    print(f"generated in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark the vectorized OrderDetails transform against the per-row path.
+
+The per-row path reproduces the conversions process_orders used to make for
+every row (three scalar pd.to_datetime calls and a split(':') duration
+parse) without any database work, so only the transform cost is compared.
+
+Usage:
+    python tools/bench/order_transform_bench.py [--rows N] [--repeat R]
+"""
+import argparse
+import time
+from pathlib import Path
+import pandas as pd
+from toast_exports.transforms.orders import transform_order_details
+from toast_exports.utils.name_formatter import format_name
+
+SAMPLE_ORDER_DETAILS = Path(__file__).resolve().parents[2] / 'sample_data' / '20240410' / 'OrderDetails.csv'
+
+def per_row_transform(df):
+    """
+    Convert OrderDetails one row at a time, as the row-by-row loader does.
+    """
+    rows = []
+    for _, row in df.iterrows():
+        server_name = format_name(row['Server'])
+        opened_at = pd.to_datetime(row['Opened'])
+        closed_at = pd.to_datetime(row['Closed']) if pd.notna(row['Closed']) else None
+        paid_at = pd.to_datetime(row['Paid']) if pd.notna(row['Paid']) else None
+        duration_minutes = None
+        if pd.notna(row['Duration (Opened to Paid)']):
+            hours, minutes, seconds = map(int, row['Duration (Opened to Paid)'].split(':'))
+            duration_minutes = hours * 60 + minutes
+        rows.append((server_name, int(row['Order Id']), opened_at, closed_at, paid_at, duration_minutes))
+    return rows
+
+def build_frame(rows):
+    """
+    Repeat the sample OrderDetails rows until the frame has the requested size.
+    """
+    sample = pd.read_csv(SAMPLE_ORDER_DETAILS)
+    repeats = -(-rows // len(sample))
+    return pd.concat([sample] * repeats, ignore_index=True).head(rows)
+
+def best_time(func, df, repeat):
+    """
+    Return the fastest of several timed runs, in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10000, help="number of order rows to transform")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per implementation")
+    args = parser.parse_args()
+
+    df = build_frame(args.rows)
+    per_row = best_time(per_row_transform, df, args.repeat)
+    vectorized = best_time(transform_order_details, df, args.repeat)
+
+    print(f"rows:        {len(df)}")
+    print(f"per-row:     {per_row:.3f}s ({len(df) / per_row:,.0f} rows/s)")
+    print(f"vectorized:  {vectorized:.3f}s ({len(df) / vectorized:,.0f} rows/s)")
+    print(f"speedup:     {per_row / vectorized:.1f}x")
+
+if __name__ == "__main__":
+    main()
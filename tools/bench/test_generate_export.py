@@ -0,0 +1,41 @@
+import pandas as pd
+
+from generate_export import generate_export
+from toast_exports.file_processors.item_selections_processor import validate_item_selections
+from toast_exports.file_processors.modifier_selections_processor import validate_modifier_selections
+from toast_exports.file_processors.orders_processor import validate_orders
+from toast_exports.transforms.item_selections import ITEM_SELECTION_DTYPES
+from toast_exports.transforms.menus import iter_menu_entity_rows
+from toast_exports.transforms.modifier_selections import MODIFIER_SELECTION_DTYPES
+
+
+def test_generated_export_has_consistent_keys(tmp_path):
+    """Generated files validate cleanly and their keys line up across files."""
+    data_dir = tmp_path / "20240410"
+    counts = generate_export(data_dir, orders=500, menu_items=200, chunk_orders=120)
+
+    orders, order_errors = validate_orders(pd.read_csv(data_dir / "OrderDetails.csv"))
+    items, item_errors = validate_item_selections(
+        pd.read_csv(data_dir / "ItemSelectionDetails.csv", dtype=ITEM_SELECTION_DTYPES)
+    )
+    modifiers, modifier_errors = validate_modifier_selections(
+        pd.read_csv(data_dir / "ModifiersSelectionDetails.csv", dtype=MODIFIER_SELECTION_DTYPES)
+    )
+
+    assert (order_errors, item_errors, modifier_errors) == ([], [], [])
+    assert counts['OrderDetails.csv'] == len(orders) == 500
+    assert orders['order_id'].is_unique
+    assert items['item_selection_id'].is_unique
+    assert set(items['order_id']) <= set(orders['order_id'].astype('Int64'))
+
+    # Each modifier's parent is an item selection on the same check, just below it
+    parents = modifiers.merge(
+        items[['item_selection_id', 'check_id', 'item_id']],
+        left_on=modifiers['modifier_selection_id'].astype('Int64') // 10 * 10,
+        right_on='item_selection_id',
+    )
+    assert len(parents) == len(modifiers)
+    assert (parents['check_id_x'].astype('Int64') == parents['check_id_y']).all()
+    assert (parents['parent_item_id'].astype('Int64') == parents['item_id']).all()
+
+    assert sum(1 for _ in iter_menu_entity_rows(data_dir / "MenuExport_20240410.json", 'menu_group_items')) == 200
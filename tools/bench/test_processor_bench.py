@@ -0,0 +1,111 @@
+"""
+End-to-end benchmarks of the file processors against a local Postgres.
+
+Each processor loads a synthetic export (see generate_export.py) into empty
+tables, so every round does the same inserts. The tables are dropped and
+recreated first, so BENCH_DB_URL must point at a scratch database; without
+it, or without pytest-benchmark, the suite is skipped.
+
+Usage:
+    BENCH_DB_URL=postgresql://postgres@localhost/toast_bench pytest tools/bench --benchmark-autosave
+    BENCH_DB_URL=... pytest tools/bench --benchmark-compare --benchmark-compare-fail=min:15%
+
+--benchmark-compare-fail fails the run when a processor is slower than the
+last saved run by more than the given margin. BENCH_MIN_ROWS_PER_SEC sets
+an absolute throughput floor as well.
+
+Settings (environment):
+- BENCH_DB_URL: scratch database to load into
+- BENCH_ORDERS: orders in the synthetic export (default 10000)
+- BENCH_ROUNDS: timed rounds per processor (default 3)
+- BENCH_MIN_ROWS_PER_SEC: fail a processor below this rows/second (default 0, off)
+"""
+import os
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+import psycopg
+from generate_export import generate_export
+from toast_exports.db.drop_tables import drop_tables
+from toast_exports.db.migrations import ensure_schema
+from toast_exports.file_processors.item_selections_processor import process_item_selections
+from toast_exports.file_processors.menu_processor import insert_menus_into_db
+from toast_exports.file_processors.modifier_selections_processor import process_modifier_selections
+from toast_exports.file_processors.orders_processor import process_orders
+from toast_exports.file_processors.time_entries_processor import process_time_entries
+
+BENCH_DB_URL = os.getenv('BENCH_DB_URL')
+BENCH_ORDERS = int(os.getenv('BENCH_ORDERS', '10000'))
+BENCH_ROUNDS = int(os.getenv('BENCH_ROUNDS', '3'))
+BENCH_MIN_ROWS_PER_SEC = float(os.getenv('BENCH_MIN_ROWS_PER_SEC', '0'))
+
+MENU_TABLES = [
+    'menus', 'menu_groups', 'menu_items', 'menu_group_items',
+    'modifier_groups', 'item_modifier_groups', 'modifier_group_options',
+]
+
+# Benchmark -> (processor, tables emptied before each round, stages loaded once beforehand)
+BENCHMARKS = {
+    'menus': (insert_menus_into_db, MENU_TABLES, []),
+    'orders': (process_orders, ['orders'], []),
+    'item_selections': (process_item_selections, ['item_selections'], ['orders']),
+    'modifier_selections': (process_modifier_selections, ['modifier_selections'], ['orders', 'item_selections']),
+    'time_entries': (process_time_entries, ['time_entries'], []),
+}
+
+
+@pytest.fixture(scope='session')
+def export_dir(tmp_path_factory):
+    """Generate the synthetic export once for the whole run."""
+    data_dir = tmp_path_factory.mktemp('bench') / '20240410'
+    generate_export(data_dir, BENCH_ORDERS)
+    return data_dir
+
+
+@pytest.fixture(scope='session')
+def conn():
+    """Connect to the scratch database and recreate the schema."""
+    if not BENCH_DB_URL:
+        pytest.skip("BENCH_DB_URL is not set")
+    try:
+        connection = psycopg.connect(BENCH_DB_URL, connect_timeout=5)
+    except psycopg.OperationalError as e:
+        pytest.skip(f"benchmark database unavailable: {e}")
+    with connection:
+        drop_tables(connection)
+        ensure_schema(connection)
+        yield connection
+
+
+def table_is_empty(conn, table):
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT NOT EXISTS (SELECT 1 FROM {table})")
+        empty = cursor.fetchone()[0]
+    conn.commit()
+    return empty
+
+
+@pytest.mark.parametrize('stage', list(BENCHMARKS))
+def test_processor_throughput(benchmark, conn, export_dir, stage):
+    processor, tables, parents = BENCHMARKS[stage]
+
+    def setup():
+        with conn.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {', '.join(tables)} CASCADE")
+        conn.commit()
+        for parent in parents:
+            if table_is_empty(conn, parent):
+                BENCHMARKS[parent][0](conn, export_dir)
+
+    inserted, skipped, errors = benchmark.pedantic(
+        processor, args=(conn, export_dir), setup=setup, rounds=BENCH_ROUNDS, iterations=1
+    )
+
+    rows_per_second = (inserted + skipped) / benchmark.stats.stats.min
+    benchmark.extra_info.update({'rows': inserted + skipped, 'rows_per_second': round(rows_per_second)})
+    assert inserted > 0
+    assert errors == 0
+    assert rows_per_second >= BENCH_MIN_ROWS_PER_SEC, (
+        f"{stage} loaded {rows_per_second:,.0f} rows/s, below the {BENCH_MIN_ROWS_PER_SEC:,.0f} rows/s floor"
+    )